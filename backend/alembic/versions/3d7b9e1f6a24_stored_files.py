@@ -0,0 +1,38 @@
+"""stored files
+
+Revision ID: 3d7b9e1f6a24
+Revises: e5a92c7f1d08
+Create Date: 2026-10-17 13:48:52.207316
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '3d7b9e1f6a24'
+down_revision: Union[str, None] = 'e5a92c7f1d08'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('stored_files',
+    sa.Column('sha256', sa.String(length=64), nullable=False),
+    sa.Column('size', sa.BigInteger(), nullable=False),
+    sa.Column('content_type', sa.String(length=255), nullable=False),
+    sa.Column('storage_url', sa.Text(), nullable=False),
+    sa.Column('extracted_text', sa.Text(), nullable=True),
+    sa.Column('vision_results', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('sha256')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('stored_files')
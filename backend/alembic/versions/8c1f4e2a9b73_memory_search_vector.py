@@ -0,0 +1,40 @@
+"""memory search vector
+
+Revision ID: 8c1f4e2a9b73
+Revises: 354efaaba29d
+Create Date: 2026-10-17 10:12:41.218604
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '8c1f4e2a9b73'
+down_revision: Union[str, None] = '354efaaba29d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('memories', sa.Column(
+        'search_vector',
+        postgresql.TSVECTOR(),
+        sa.Computed(
+            "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('english', coalesce(narrative_text, '')), 'B')",
+            persisted=True,
+        ),
+        nullable=True,
+    ))
+    op.create_index(
+        'ix_memories_search_vector', 'memories', ['search_vector'],
+        unique=False, postgresql_using='gin',
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_memories_search_vector', table_name='memories', postgresql_using='gin')
+    op.drop_column('memories', 'search_vector')
@@ -0,0 +1,40 @@
+"""hot path indexes
+
+Revision ID: b47d0e93c5a1
+Revises: 8c1f4e2a9b73
+Create Date: 2026-10-17 11:03:17.540921
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'b47d0e93c5a1'
+down_revision: Union[str, None] = '8c1f4e2a9b73'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_memories_user_created_active', 'memories', ['user_id', 'created_at', 'id'],
+        unique=False, postgresql_where=sa.text('is_deleted = false'),
+    )
+    op.create_index(op.f('ix_memory_objects_memory_id'), 'memory_objects', ['memory_id'], unique=False)
+    op.create_index(op.f('ix_memory_objects_object_id'), 'memory_objects', ['object_id'], unique=False)
+    op.create_index('ix_memory_emotions_memory_id_emotion', 'memory_emotions', ['memory_id', 'emotion'], unique=False)
+    op.create_index(op.f('ix_memory_people_memory_id'), 'memory_people', ['memory_id'], unique=False)
+    op.create_index('ix_mood_entries_user_id_recorded_at', 'mood_entries', ['user_id', 'recorded_at'], unique=False)
+    op.create_index(op.f('ix_cognitive_exercises_user_id'), 'cognitive_exercises', ['user_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_cognitive_exercises_user_id'), table_name='cognitive_exercises')
+    op.drop_index('ix_mood_entries_user_id_recorded_at', table_name='mood_entries')
+    op.drop_index(op.f('ix_memory_people_memory_id'), table_name='memory_people')
+    op.drop_index('ix_memory_emotions_memory_id_emotion', table_name='memory_emotions')
+    op.drop_index(op.f('ix_memory_objects_object_id'), table_name='memory_objects')
+    op.drop_index(op.f('ix_memory_objects_memory_id'), table_name='memory_objects')
+    op.drop_index('ix_memories_user_created_active', table_name='memories')
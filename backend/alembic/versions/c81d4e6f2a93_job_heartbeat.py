@@ -0,0 +1,27 @@
+"""job heartbeat
+
+Revision ID: c81d4e6f2a93
+Revises: f2b85d4c7e19
+Create Date: 2026-10-17 18:02:11.204518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'c81d4e6f2a93'
+down_revision: Union[str, None] = 'f2b85d4c7e19'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('jobs', sa.Column('heartbeat_at', sa.DateTime(timezone=True), nullable=True))
+    # Jobs already running keep their claim time as the last heartbeat
+    op.execute("UPDATE jobs SET heartbeat_at = started_at WHERE status = 'running'")
+
+
+def downgrade() -> None:
+    op.drop_column('jobs', 'heartbeat_at')
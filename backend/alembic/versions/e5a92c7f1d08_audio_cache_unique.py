@@ -0,0 +1,32 @@
+"""audio cache unique key
+
+Revision ID: e5a92c7f1d08
+Revises: b47d0e93c5a1
+Create Date: 2026-10-17 12:26:09.871342
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5a92c7f1d08'
+down_revision: Union[str, None] = 'b47d0e93c5a1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Rows written before audio was actually stored only hold a placeholder URL
+    op.execute("DELETE FROM audio_cache WHERE audio_url = 'cached'")
+    op.drop_index('ix_audio_cache_text_hash', table_name='audio_cache')
+    op.create_unique_constraint(
+        'audio_cache_text_hash_provider_voice_id_key', 'audio_cache',
+        ['text_hash', 'provider', 'voice_id'],
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint('audio_cache_text_hash_provider_voice_id_key', 'audio_cache', type_='unique')
+    op.create_index('ix_audio_cache_text_hash', 'audio_cache', ['text_hash'], unique=False)
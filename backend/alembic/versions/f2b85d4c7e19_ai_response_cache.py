@@ -0,0 +1,35 @@
+"""ai response cache
+
+Revision ID: f2b85d4c7e19
+Revises: a6c3f08d2e51
+Create Date: 2026-10-17 16:34:05.762198
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2b85d4c7e19'
+down_revision: Union[str, None] = 'a6c3f08d2e51'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('ai_response_cache',
+    sa.Column('cache_key', sa.String(length=64), nullable=False),
+    sa.Column('call_site', sa.String(length=100), nullable=False),
+    sa.Column('value', sa.Text(), nullable=False),
+    sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('cache_key')
+    )
+    op.create_index(op.f('ix_ai_response_cache_expires_at'), 'ai_response_cache', ['expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_ai_response_cache_expires_at'), table_name='ai_response_cache')
+    op.drop_table('ai_response_cache')
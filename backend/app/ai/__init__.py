@@ -1,49 +1,149 @@
 from __future__ import annotations
 
-"""AI provider factory and registry."""
+"""AI provider factory and registry.
+
+Each capability is served by a stack of wrappers around the concrete providers:
+single-flight (coalescing) -> response cache -> deadlines and hedging ->
+resilience (retries, circuit breakers, failover to the other vendor) ->
+per-vendor admission limiter -> provider SDK.
+"""
 
 from .base import LLMProvider, VisionProvider, TTSProvider, ImageGenerationProvider
+from .cache import CachingLLMProvider, CachingVisionProvider, get_cache_backend
+from .deadlines import DeadlineLLMProvider, DeadlineTTSProvider, DeadlineVisionProvider
+from .limiter import (
+    LimitedLLMProvider,
+    LimitedTTSProvider,
+    LimitedVisionProvider,
+    get_limiter,
+)
+from .resilience import (
+    Candidate,
+    ResilientLLMProvider,
+    ResilientTTSProvider,
+    ResilientVisionProvider,
+)
+from .singleflight import SingleFlightLLMProvider, SingleFlightTTSProvider, SingleFlightVisionProvider
 from ..config import settings
 
 _providers: dict = {}
 
 
+def _cache_options(resilient) -> dict:
+    # Keyed by the configured primary; an answer served by a fallback is stored
+    # under the same identity, as it stands in for the primary's
+    primary = resilient.candidates[0]
+    return {
+        "backend": get_cache_backend(),
+        "ttls": settings.AI_CACHE_TTLS,
+        "default_ttl": settings.AI_CACHE_DEFAULT_TTL_SECONDS,
+        "identity": (primary.name, primary.provider.inner.model),
+    }
+
+
+def _client_options() -> dict:
+    # We retry (and fail over) ourselves, so the SDKs shouldn't retry underneath
+    return {"timeout": settings.AI_PROVIDER_TIMEOUT_SECONDS, "max_retries": 0}
+
+
+def _make_llm(name: str) -> LLMProvider:
+    if name == "anthropic":
+        from .anthropic_provider import AnthropicLLMProvider
+        return AnthropicLLMProvider(api_key=settings.ANTHROPIC_API_KEY, **_client_options())
+    from .openai_provider import OpenAILLMProvider
+    return OpenAILLMProvider(api_key=settings.OPENAI_API_KEY, **_client_options())
+
+
+def _make_vision(name: str) -> VisionProvider:
+    if name == "anthropic":
+        from .anthropic_provider import AnthropicVisionProvider
+        return AnthropicVisionProvider(api_key=settings.ANTHROPIC_API_KEY, **_client_options())
+    from .openai_provider import OpenAIVisionProvider
+    return OpenAIVisionProvider(api_key=settings.OPENAI_API_KEY, **_client_options())
+
+
+def _make_tts(name: str) -> TTSProvider:
+    if name == "openai":
+        from .openai_provider import OpenAITTSProvider
+        return OpenAITTSProvider(api_key=settings.OPENAI_API_KEY, **_client_options())
+    from .elevenlabs_provider import ElevenLabsTTSProvider
+    return ElevenLabsTTSProvider(
+        api_key=settings.ELEVENLABS_API_KEY,
+        default_voice_id=settings.ELEVENLABS_VOICE_ID,
+        http2=settings.ELEVENLABS_HTTP2,
+        max_connections=settings.ELEVENLABS_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.ELEVENLABS_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=settings.ELEVENLABS_KEEPALIVE_EXPIRY_SECONDS,
+        timeout=settings.AI_PROVIDER_TIMEOUT_SECONDS,
+    )
+
+
+_API_KEYS = {
+    "openai": lambda: settings.OPENAI_API_KEY,
+    "anthropic": lambda: settings.ANTHROPIC_API_KEY,
+    "elevenlabs": lambda: settings.ELEVENLABS_API_KEY,
+}
+
+
+def _candidates(primary: str, fallbacks: list[str], make, limited) -> list[Candidate]:
+    """The configured provider first, then configured fallbacks that have an API key.
+
+    Each is wrapped in its vendor's limiter (shared by all capabilities).
+    """
+    names = [primary]
+    if settings.AI_FAILOVER_ENABLED:
+        names += [name for name in fallbacks if name != primary and _API_KEYS[name]()]
+    return [
+        Candidate(name, limited(make(name), get_limiter(name)), primary=name == primary)
+        for name in names
+    ]
+
+
+def _primary(name: str, choices: tuple[str, ...]) -> str:
+    # Unknown names fall back to the historical default (the first choice)
+    return name if name in choices else choices[0]
+
+
 def get_llm_provider() -> LLMProvider:
     if "llm" not in _providers:
-        name = settings.LLM_PROVIDER
-        if name == "anthropic":
-            from .anthropic_provider import AnthropicLLMProvider
-            _providers["llm"] = AnthropicLLMProvider(api_key=settings.ANTHROPIC_API_KEY)
-        else:
-            from .openai_provider import OpenAILLMProvider
-            _providers["llm"] = OpenAILLMProvider(api_key=settings.OPENAI_API_KEY)
+        primary = _primary(settings.LLM_PROVIDER, ("openai", "anthropic"))
+        resilient = ResilientLLMProvider(
+            _candidates(primary, settings.AI_LLM_FALLBACKS, _make_llm, LimitedLLMProvider)
+        )
+        provider: LLMProvider = DeadlineLLMProvider(resilient, hedge=resilient.rotated())
+        if settings.AI_CACHE_ENABLED:
+            provider = CachingLLMProvider(provider, **_cache_options(resilient))
+        if settings.AI_SINGLE_FLIGHT_ENABLED:
+            provider = SingleFlightLLMProvider(provider)
+        _providers["llm"] = provider
     return _providers["llm"]
 
 
 def get_vision_provider() -> VisionProvider:
     if "vision" not in _providers:
-        name = settings.VISION_PROVIDER
-        if name == "anthropic":
-            from .anthropic_provider import AnthropicVisionProvider
-            _providers["vision"] = AnthropicVisionProvider(api_key=settings.ANTHROPIC_API_KEY)
-        else:
-            from .openai_provider import OpenAIVisionProvider
-            _providers["vision"] = OpenAIVisionProvider(api_key=settings.OPENAI_API_KEY)
+        primary = _primary(settings.VISION_PROVIDER, ("openai", "anthropic"))
+        resilient = ResilientVisionProvider(
+            _candidates(primary, settings.AI_VISION_FALLBACKS, _make_vision, LimitedVisionProvider)
+        )
+        provider: VisionProvider = DeadlineVisionProvider(resilient, hedge=resilient.rotated())
+        if settings.AI_CACHE_ENABLED:
+            provider = CachingVisionProvider(provider, **_cache_options(resilient))
+        if settings.AI_SINGLE_FLIGHT_ENABLED:
+            provider = SingleFlightVisionProvider(provider)
+        _providers["vision"] = provider
     return _providers["vision"]
 
 
 def get_tts_provider() -> TTSProvider:
     if "tts" not in _providers:
-        name = settings.TTS_PROVIDER
-        if name == "openai":
-            from .openai_provider import OpenAITTSProvider
-            _providers["tts"] = OpenAITTSProvider(api_key=settings.OPENAI_API_KEY)
-        else:
-            from .elevenlabs_provider import ElevenLabsTTSProvider
-            _providers["tts"] = ElevenLabsTTSProvider(
-                api_key=settings.ELEVENLABS_API_KEY,
-                default_voice_id=settings.ELEVENLABS_VOICE_ID,
-            )
+        primary = _primary(settings.TTS_PROVIDER, ("elevenlabs", "openai"))
+        resilient = ResilientTTSProvider(
+            _candidates(primary, settings.AI_TTS_FALLBACKS, _make_tts, LimitedTTSProvider)
+        )
+        provider: TTSProvider = DeadlineTTSProvider(resilient, hedge=resilient.rotated())
+        if settings.AI_SINGLE_FLIGHT_ENABLED:
+            provider = SingleFlightTTSProvider(provider)
+        _providers["tts"] = provider
     return _providers["tts"]
 
 
@@ -52,3 +152,11 @@ def get_image_provider() -> ImageGenerationProvider:
         from .openai_provider import OpenAIImageProvider
         _providers["image"] = OpenAIImageProvider(api_key=settings.OPENAI_API_KEY)
     return _providers["image"]
+
+
+async def close_providers() -> None:
+    """Close every instantiated provider's HTTP pool and reset the registry."""
+    providers = list(_providers.values())
+    _providers.clear()
+    for provider in providers:
+        await provider.aclose()
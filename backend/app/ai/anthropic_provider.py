@@ -6,14 +6,26 @@ from typing import AsyncIterator
 
 import anthropic
 
+from ..utils.image import split_data_uri
 from .base import LLMProvider, VisionProvider
 
 
 class AnthropicLLMProvider(LLMProvider):
-    def __init__(self, api_key: str, model: str = "claude-sonnet-4-5-20250929"):
-        self.client = anthropic.AsyncAnthropic(api_key=api_key)
+    def __init__(
+        self,
+        api_key: str,
+        model: str = "claude-sonnet-4-5-20250929",
+        timeout: float = 60.0,
+        max_retries: int = 2,
+    ):
+        self.client = anthropic.AsyncAnthropic(
+            api_key=api_key, timeout=timeout, max_retries=max_retries
+        )
         self.model = model
 
+    async def aclose(self) -> None:
+        await self.client.close()
+
     async def generate_text(self, prompt: str, system: str | None = None, **kwargs) -> str:
         params = {"model": self.model, "max_tokens": kwargs.get("max_tokens", 1024)}
         if system:
@@ -35,14 +47,24 @@ class AnthropicLLMProvider(LLMProvider):
 
 
 class AnthropicVisionProvider(VisionProvider):
-    def __init__(self, api_key: str, model: str = "claude-sonnet-4-5-20250929"):
-        self.client = anthropic.AsyncAnthropic(api_key=api_key)
+    def __init__(
+        self,
+        api_key: str,
+        model: str = "claude-sonnet-4-5-20250929",
+        timeout: float = 60.0,
+        max_retries: int = 2,
+    ):
+        self.client = anthropic.AsyncAnthropic(
+            api_key=api_key, timeout=timeout, max_retries=max_retries
+        )
         self.model = model
 
+    async def aclose(self) -> None:
+        await self.client.close()
+
     async def analyze_image(self, image_b64: str, prompt: str, **kwargs) -> str:
-        # Strip data URI prefix if present
-        if "," in image_b64:
-            image_b64 = image_b64.split(",", 1)[1]
+        # Strip data URI prefix if present, keeping its media type
+        media_type, image_b64 = split_data_uri(image_b64)
         response = await self.client.messages.create(
             model=self.model,
             max_tokens=1024,
@@ -54,7 +76,7 @@ class AnthropicVisionProvider(VisionProvider):
                             "type": "image",
                             "source": {
                                 "type": "base64",
-                                "media_type": "image/jpeg",
+                                "media_type": media_type,
                                 "data": image_b64,
                             },
                         },
@@ -17,6 +17,14 @@ class LLMProvider(ABC):
     ) -> AsyncIterator[str]:
         ...
 
+    @property
+    def name(self) -> str:
+        """Provider name recorded with generated content (e.g. ``ai_model_used``)."""
+        return self.__class__.__name__
+
+    async def aclose(self) -> None:
+        """Release pooled connections; called from the app lifespan on shutdown."""
+
 
 class VisionProvider(ABC):
     @abstractmethod
@@ -25,6 +33,9 @@ class VisionProvider(ABC):
     ) -> str:
         ...
 
+    async def aclose(self) -> None:
+        return None
+
 
 class TTSProvider(ABC):
     @abstractmethod
@@ -37,9 +48,15 @@ class TTSProvider(ABC):
     ) -> AsyncIterator[bytes]:
         ...
 
+    async def aclose(self) -> None:
+        return None
+
 
 class ImageGenerationProvider(ABC):
     @abstractmethod
     async def generate_image(self, prompt: str, **kwargs) -> str:
         """Returns a URL or base64 of the generated image."""
         ...
+
+    async def aclose(self) -> None:
+        return None
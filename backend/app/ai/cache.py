@@ -0,0 +1,254 @@
+from __future__ import annotations
+
+"""Response cache for LLM and vision calls.
+
+``CachingLLMProvider`` / ``CachingVisionProvider`` wrap a provider and memoise
+its completions, keyed on the provider, model, system prompt, rendered prompt
+(and image) and call options. How long a response may be reused is decided per
+call site (see ``ai.context``), from ``AI_CACHE_TTLS``; sites with no TTL are
+never cached. Storage is pluggable: an in-process LRU or a database table shared
+by all workers.
+"""
+
+import hashlib
+import json
+import logging
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict, defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator, Optional
+
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert
+
+from ..config import settings
+from ..database import async_session
+from ..models.session import AIResponseCache
+from .base import LLMProvider, VisionProvider
+from .context import current_call_site
+
+logger = logging.getLogger(__name__)
+
+
+class CacheBackend(ABC):
+    @abstractmethod
+    async def get(self, key: str) -> Optional[str]:
+        ...
+
+    @abstractmethod
+    async def set(self, key: str, value: str, ttl_seconds: float, call_site: str) -> None:
+        ...
+
+    async def clear(self) -> None:
+        return None
+
+
+class MemoryCacheBackend(CacheBackend):
+    """TTL + LRU map in this process."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        # key -> (expires_at, value)
+        self._entries: OrderedDict = OrderedDict()
+
+    async def get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: str, ttl_seconds: float, call_site: str) -> None:
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = (time.monotonic() + ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def clear(self) -> None:
+        self._entries.clear()
+
+
+class DatabaseCacheBackend(CacheBackend):
+    """Rows in ``ai_response_cache``, shared by every API and worker process."""
+
+    # Expired rows are swept after this many writes
+    PURGE_EVERY = 100
+
+    def __init__(self):
+        self._writes = 0
+
+    async def get(self, key: str) -> Optional[str]:
+        async with async_session() as session:
+            return (
+                await session.execute(
+                    select(AIResponseCache.value).where(
+                        AIResponseCache.cache_key == key,
+                        AIResponseCache.expires_at > datetime.now(timezone.utc),
+                    )
+                )
+            ).scalar_one_or_none()
+
+    async def set(self, key: str, value: str, ttl_seconds: float, call_site: str) -> None:
+        now = datetime.now(timezone.utc)
+        expires_at = now + timedelta(seconds=ttl_seconds)
+        self._writes += 1
+        async with async_session() as session:
+            await session.execute(
+                insert(AIResponseCache)
+                .values(cache_key=key, value=value, call_site=call_site, expires_at=expires_at)
+                .on_conflict_do_update(
+                    index_elements=["cache_key"],
+                    set_={"value": value, "call_site": call_site, "expires_at": expires_at},
+                )
+            )
+            if self._writes % self.PURGE_EVERY == 0:
+                await session.execute(
+                    delete(AIResponseCache).where(AIResponseCache.expires_at <= now)
+                )
+            await session.commit()
+
+    async def clear(self) -> None:
+        async with async_session() as session:
+            await session.execute(delete(AIResponseCache))
+            await session.commit()
+
+
+class CacheStats:
+    """Hit/miss/bypass counters per call site (process-local)."""
+
+    def __init__(self):
+        self._counts: dict = defaultdict(lambda: {"hits": 0, "misses": 0, "bypassed": 0})
+
+    def record(self, call_site: str, outcome: str) -> None:
+        self._counts[call_site][outcome] += 1
+
+    def snapshot(self) -> dict:
+        return {site: dict(counts) for site, counts in self._counts.items()}
+
+
+stats = CacheStats()
+
+
+def request_key(*parts) -> str:
+    """Stable hash of a request's identifying parts."""
+    raw = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+class _CachingMixin:
+    def __init__(
+        self,
+        inner,
+        backend: CacheBackend,
+        ttls: dict,
+        default_ttl: float,
+        identity: tuple = (),
+    ):
+        """``identity`` (provider name, model) goes into every key, so switching
+        the configured provider or model never serves the old one's answers."""
+        self.inner = inner
+        self.backend = backend
+        self.identity = identity
+        self.ttls = ttls
+        self.default_ttl = default_ttl
+
+    def _policy(self) -> tuple[str, float]:
+        site = current_call_site() or "default"
+        return site, self.ttls.get(site, self.default_ttl)
+
+    async def _lookup(self, site: str, key: str) -> Optional[str]:
+        try:
+            value = await self.backend.get(key)
+        except Exception:
+            # A broken cache must never break the feature it speeds up
+            logger.exception("AI cache read failed")
+            value = None
+        stats.record(site, "hits" if value is not None else "misses")
+        return value
+
+    async def _store(self, site: str, key: str, value: str, ttl: float) -> None:
+        try:
+            await self.backend.set(key, value, ttl, site)
+        except Exception:
+            logger.exception("AI cache write failed")
+
+    async def aclose(self) -> None:
+        await self.inner.aclose()
+
+
+class CachingLLMProvider(_CachingMixin, LLMProvider):
+    @property
+    def name(self) -> str:
+        return self.inner.name
+
+    async def generate_text(self, prompt: str, system: str | None = None, **kwargs) -> str:
+        site, ttl = self._policy()
+        if ttl <= 0:
+            stats.record(site, "bypassed")
+            return await self.inner.generate_text(prompt, system=system, **kwargs)
+        key = request_key("llm", *self.identity, system, prompt, kwargs)
+        cached = await self._lookup(site, key)
+        if cached is not None:
+            return cached
+        text = await self.inner.generate_text(prompt, system=system, **kwargs)
+        await self._store(site, key, text, ttl)
+        return text
+
+    async def generate_text_stream(
+        self, prompt: str, system: str | None = None, **kwargs
+    ) -> AsyncIterator[str]:
+        # Shares entries with generate_text: a hit is replayed as a single chunk,
+        # a completed stream is stored for both.
+        site, ttl = self._policy()
+        if ttl <= 0:
+            stats.record(site, "bypassed")
+            async for token in self.inner.generate_text_stream(prompt, system=system, **kwargs):
+                yield token
+            return
+        key = request_key("llm", *self.identity, system, prompt, kwargs)
+        cached = await self._lookup(site, key)
+        if cached is not None:
+            yield cached
+            return
+        parts = []
+        async for token in self.inner.generate_text_stream(prompt, system=system, **kwargs):
+            parts.append(token)
+            yield token
+        await self._store(site, key, "".join(parts), ttl)
+
+
+class CachingVisionProvider(_CachingMixin, VisionProvider):
+    async def analyze_image(self, image_b64: str, prompt: str, **kwargs) -> str:
+        site, ttl = self._policy()
+        if ttl <= 0:
+            stats.record(site, "bypassed")
+            return await self.inner.analyze_image(image_b64, prompt, **kwargs)
+        image_hash = hashlib.sha256(image_b64.encode()).hexdigest()
+        key = request_key("vision", *self.identity, image_hash, prompt, kwargs)
+        cached = await self._lookup(site, key)
+        if cached is not None:
+            return cached
+        text = await self.inner.analyze_image(image_b64, prompt, **kwargs)
+        await self._store(site, key, text, ttl)
+        return text
+
+
+_backend: Optional[CacheBackend] = None
+
+
+def get_cache_backend() -> CacheBackend:
+    """Get or create the configured cache backend singleton."""
+    global _backend
+    if _backend is None:
+        if settings.AI_CACHE_BACKEND == "database":
+            _backend = DatabaseCacheBackend()
+        else:
+            _backend = MemoryCacheBackend(max_entries=settings.AI_CACHE_MAX_ENTRIES)
+    return _backend
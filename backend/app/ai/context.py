@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+"""Per-call context for AI requests.
+
+Services label each provider call with the feature it serves, e.g.
+``with ai_call_site("daily_prompt"): await llm.generate_text(...)``. The provider
+wrappers read the label to pick per-feature policy (cache TTLs and the like)
+without threading extra arguments through every call.
+
+Requests also carry a priority class, declared per endpoint with the
+``ai_priority_class`` router dependency (and set to "batch" for background
+jobs). The provider limiters serve queued interactive calls first.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+# Highest priority first
+PRIORITIES = ("interactive", "standard", "batch")
+
+_call_site: ContextVar[Optional[str]] = ContextVar("ai_call_site", default=None)
+_priority: ContextVar[str] = ContextVar("ai_priority", default="standard")
+
+
+@contextmanager
+def ai_call_site(name: str) -> Iterator[None]:
+    token = _call_site.set(name)
+    try:
+        yield
+    finally:
+        _call_site.reset(token)
+
+
+def current_call_site() -> Optional[str]:
+    return _call_site.get()
+
+
+def set_ai_priority(priority: str) -> None:
+    """Set the priority class for the rest of the current task."""
+    if priority not in PRIORITIES:
+        raise ValueError(f"Unknown AI priority class: {priority}")
+    _priority.set(priority)
+
+
+@contextmanager
+def ai_priority(priority: str) -> Iterator[None]:
+    if priority not in PRIORITIES:
+        raise ValueError(f"Unknown AI priority class: {priority}")
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def current_priority() -> str:
+    return _priority.get()
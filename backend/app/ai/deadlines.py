@@ -0,0 +1,302 @@
+from __future__ import annotations
+
+"""Per-call-site deadlines and hedged requests.
+
+Every call is bounded by its call site's budget (``AI_DEADLINES``, falling back
+to ``AI_DEFAULT_DEADLINE_SECONDS``); when it runs out the provider call is
+cancelled and ``AIDeadlineExceeded`` raised. For streams that budget bounds each
+wait for the next chunk, including the first, and ``AI_STREAM_DEADLINES`` bounds
+the stream as a whole.
+
+Call sites listed in ``AI_HEDGE_SITES`` are also hedged: once a call has taken
+longer than that site's recent p95 latency, a second request is sent (to the
+next provider when there is one) and whichever succeeds first wins. Streams are
+hedged on their time to first chunk; the winner's stream is used to the end.
+"""
+
+import asyncio
+import math
+import time
+from collections import defaultdict, deque
+from typing import AsyncIterator, Awaitable, Callable, Optional, TypeVar
+
+from ..config import settings
+from .base import LLMProvider, TTSProvider, VisionProvider
+from .context import current_call_site
+from .errors import AIDeadlineExceeded
+
+T = TypeVar("T")
+
+
+class LatencyTracker:
+    """Rolling window of successful call durations per (capability, call site)."""
+
+    def __init__(self, window: int):
+        self._samples: dict = defaultdict(lambda: deque(maxlen=window))
+        self.hedges_sent: dict = defaultdict(int)
+        self.hedges_won: dict = defaultdict(int)
+
+    def record(self, key: str, seconds: float) -> None:
+        self._samples[key].append(seconds)
+
+    def percentile(self, key: str, q: float) -> Optional[float]:
+        samples = self._samples.get(key)
+        if not samples or len(samples) < settings.AI_HEDGE_MIN_SAMPLES:
+            return None
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, math.ceil(q * len(ordered)) - 1)]
+
+    def snapshot(self) -> dict:
+        return {
+            key: {
+                "samples": len(samples),
+                "p50": round(sorted(samples)[len(samples) // 2], 3),
+                "p95": round(sorted(samples)[max(0, math.ceil(0.95 * len(samples)) - 1)], 3),
+                "hedges_sent": self.hedges_sent[key],
+                "hedges_won": self.hedges_won[key],
+            }
+            for key, samples in self._samples.items()
+            if samples
+        }
+
+
+latency = LatencyTracker(window=settings.AI_LATENCY_WINDOW)
+
+
+def _site() -> str:
+    return current_call_site() or "default"
+
+
+def _deadline(site: str) -> float:
+    return settings.AI_DEADLINES.get(site, settings.AI_DEFAULT_DEADLINE_SECONDS)
+
+
+def _stream_deadline(site: str) -> float:
+    return settings.AI_STREAM_DEADLINES.get(site, settings.AI_DEFAULT_STREAM_DEADLINE_SECONDS)
+
+
+def _hedge_delay(key: str, site: str, hedge) -> Optional[float]:
+    if hedge is None or site not in settings.AI_HEDGE_SITES:
+        return None
+    return latency.percentile(key, settings.AI_HEDGE_PERCENTILE)
+
+
+async def _hedged(
+    key: str,
+    site: str,
+    primary: Callable[[], Awaitable[T]],
+    hedge: Optional[Callable[[], Awaitable[T]]],
+) -> T:
+    started = time.monotonic()
+    delay = _hedge_delay(key, site, hedge)
+
+    first = asyncio.ensure_future(primary())
+    tasks = {first}
+    try:
+        if delay is not None:
+            await asyncio.wait(tasks, timeout=max(delay, settings.AI_HEDGE_MIN_DELAY_SECONDS))
+            if not first.done():
+                latency.hedges_sent[key] += 1
+                tasks.add(asyncio.ensure_future(hedge()))
+        error: BaseException | None = None
+        while tasks:
+            done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    if task is first:
+                        latency.record(key, time.monotonic() - started)
+                    else:
+                        latency.hedges_won[key] += 1
+                    return task.result()
+                error = task.exception()
+        raise error
+    finally:
+        # The loser (or both, if the deadline hit) is cancelled
+        for task in tasks:
+            task.cancel()
+
+
+async def _call(
+    capability: str,
+    primary: Callable[[], Awaitable[T]],
+    hedge: Optional[Callable[[], Awaitable[T]]] = None,
+) -> T:
+    site = _site()
+    deadline = _deadline(site)
+    call = _hedged(f"{capability}:{site}", site, primary, hedge)
+    if deadline <= 0:
+        return await call
+    try:
+        return await asyncio.wait_for(call, deadline)
+    except asyncio.TimeoutError:
+        raise AIDeadlineExceeded(capability, site, deadline)
+
+
+_END = object()
+
+
+async def _close_streams(pending: dict) -> None:
+    for task in pending:
+        task.cancel()
+    await asyncio.gather(*pending, return_exceptions=True)
+    for stream in pending.values():
+        await stream.aclose()
+
+
+async def _first_part(
+    key: str,
+    site: str,
+    primary: Callable[[], AsyncIterator[T]],
+    hedge: Optional[Callable[[], AsyncIterator[T]]],
+) -> tuple[AsyncIterator[T], object]:
+    """Open the stream and wait for its first chunk, hedged like a plain call.
+
+    Returns the winning stream and its first chunk (``_END`` if it was empty);
+    the other stream, if any, is closed.
+    """
+    started = time.monotonic()
+    delay = _hedge_delay(key, site, hedge)
+    first = primary().__aiter__()
+    pending = {asyncio.ensure_future(first.__anext__()): first}
+    try:
+        if delay is not None:
+            await asyncio.wait(pending, timeout=max(delay, settings.AI_HEDGE_MIN_DELAY_SECONDS))
+            if not any(task.done() for task in pending):
+                latency.hedges_sent[key] += 1
+                second = hedge().__aiter__()
+                pending[asyncio.ensure_future(second.__anext__())] = second
+        error: BaseException | None = None
+        while pending:
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                stream = pending.pop(task)
+                exc = task.exception()
+                if exc is not None and not isinstance(exc, StopAsyncIteration):
+                    error = exc
+                    continue
+                if stream is first:
+                    latency.record(key, time.monotonic() - started)
+                else:
+                    latency.hedges_won[key] += 1
+                return stream, _END if exc is not None else task.result()
+        raise error
+    finally:
+        await _close_streams(pending)
+
+
+async def _stream(
+    capability: str,
+    primary: Callable[[], AsyncIterator[T]],
+    hedge: Optional[Callable[[], AsyncIterator[T]]] = None,
+) -> AsyncIterator[T]:
+    site = _site()
+    per_chunk = _deadline(site)
+    total = _stream_deadline(site)
+    started = time.monotonic()
+
+    def budget() -> tuple[Optional[float], float]:
+        """Seconds left for the next wait, and the deadline that sets it."""
+        limits = []
+        if per_chunk > 0:
+            limits.append((per_chunk, per_chunk))
+        if total > 0:
+            limits.append((total - (time.monotonic() - started), total))
+        return min(limits) if limits else (None, 0.0)
+
+    iterator = None
+    try:
+        timeout, deadline = budget()
+        try:
+            iterator, part = await asyncio.wait_for(
+                _first_part(f"{capability}:{site}:first_chunk", site, primary, hedge), timeout
+            )
+        except asyncio.TimeoutError:
+            raise AIDeadlineExceeded(capability, site, deadline)
+        while part is not _END:
+            yield part
+            timeout, deadline = budget()
+            try:
+                part = await asyncio.wait_for(iterator.__anext__(), timeout)
+            except StopAsyncIteration:
+                return
+            except asyncio.TimeoutError:
+                raise AIDeadlineExceeded(capability, site, deadline)
+    finally:
+        if iterator is not None:
+            await iterator.aclose()
+
+
+class DeadlineLLMProvider(LLMProvider):
+    def __init__(self, inner: LLMProvider, hedge: Optional[LLMProvider] = None):
+        self.inner = inner
+        self.hedge = hedge
+
+    @property
+    def name(self) -> str:
+        return self.inner.name
+
+    async def generate_text(self, prompt: str, system: str | None = None, **kwargs) -> str:
+        return await _call(
+            "llm",
+            lambda: self.inner.generate_text(prompt, system=system, **kwargs),
+            self.hedge and (lambda: self.hedge.generate_text(prompt, system=system, **kwargs)),
+        )
+
+    async def generate_text_stream(
+        self, prompt: str, system: str | None = None, **kwargs
+    ) -> AsyncIterator[str]:
+        async for token in _stream(
+            "llm",
+            lambda: self.inner.generate_text_stream(prompt, system=system, **kwargs),
+            self.hedge and (
+                lambda: self.hedge.generate_text_stream(prompt, system=system, **kwargs)
+            ),
+        ):
+            yield token
+
+    async def aclose(self) -> None:
+        await self.inner.aclose()
+
+
+class DeadlineVisionProvider(VisionProvider):
+    def __init__(self, inner: VisionProvider, hedge: Optional[VisionProvider] = None):
+        self.inner = inner
+        self.hedge = hedge
+
+    async def analyze_image(self, image_b64: str, prompt: str, **kwargs) -> str:
+        return await _call(
+            "vision",
+            lambda: self.inner.analyze_image(image_b64, prompt, **kwargs),
+            self.hedge and (lambda: self.hedge.analyze_image(image_b64, prompt, **kwargs)),
+        )
+
+    async def aclose(self) -> None:
+        await self.inner.aclose()
+
+
+class DeadlineTTSProvider(TTSProvider):
+    def __init__(self, inner: TTSProvider, hedge: Optional[TTSProvider] = None):
+        self.inner = inner
+        self.hedge = hedge
+
+    async def synthesize(self, text: str, voice_id: str | None = None, **kwargs) -> bytes:
+        return await _call(
+            "tts",
+            lambda: self.inner.synthesize(text, voice_id=voice_id, **kwargs),
+            self.hedge and (lambda: self.hedge.synthesize(text, voice_id=voice_id, **kwargs)),
+        )
+
+    async def synthesize_stream(
+        self, text: str, voice_id: str | None = None, **kwargs
+    ) -> AsyncIterator[bytes]:
+        async for part in _stream(
+            "tts",
+            lambda: self.inner.synthesize_stream(text, voice_id=voice_id, **kwargs),
+            self.hedge and (
+                lambda: self.hedge.synthesize_stream(text, voice_id=voice_id, **kwargs)
+            ),
+        ):
+            yield part
+
+    async def aclose(self) -> None:
+        await self.inner.aclose()
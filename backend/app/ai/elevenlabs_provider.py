@@ -12,58 +12,64 @@ ELEVENLABS_API_BASE = "https://api.elevenlabs.io/v1"
 
 
 class ElevenLabsTTSProvider(TTSProvider):
-    def __init__(self, api_key: str, default_voice_id: str = "EXAVITQu4vr4xnSDxMaL"):
+    def __init__(
+        self,
+        api_key: str,
+        default_voice_id: str = "EXAVITQu4vr4xnSDxMaL",
+        http2: bool = True,
+        max_connections: int = 20,
+        max_keepalive_connections: int = 10,
+        keepalive_expiry: float = 30.0,
+        timeout: float = 30.0,
+    ):
         self.api_key = api_key
         self.default_voice_id = default_voice_id
+        # One pooled client for the provider's lifetime: keep-alive (and HTTP/2
+        # multiplexing) means only the first utterance pays for TCP + TLS setup.
+        self.client = httpx.AsyncClient(
+            base_url=ELEVENLABS_API_BASE,
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=keepalive_expiry,
+            ),
+            headers={
+                "xi-api-key": api_key,
+                "Content-Type": "application/json",
+                "Accept": "audio/mpeg",
+            },
+            timeout=timeout,
+        )
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
+
+    def _payload(self, text: str, **kwargs) -> dict:
+        return {
+            "text": text,
+            "model_id": "eleven_monolingual_v1",
+            "voice_settings": {
+                "stability": kwargs.get("stability", 0.75),
+                "similarity_boost": kwargs.get("similarity_boost", 0.75),
+            },
+        }
 
     async def synthesize(self, text: str, voice_id: str | None = None, **kwargs) -> bytes:
         vid = voice_id or self.default_voice_id
-        url = f"{ELEVENLABS_API_BASE}/text-to-speech/{vid}"
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                url,
-                json={
-                    "text": text,
-                    "model_id": "eleven_monolingual_v1",
-                    "voice_settings": {
-                        "stability": kwargs.get("stability", 0.75),
-                        "similarity_boost": kwargs.get("similarity_boost", 0.75),
-                    },
-                },
-                headers={
-                    "xi-api-key": self.api_key,
-                    "Content-Type": "application/json",
-                    "Accept": "audio/mpeg",
-                },
-                timeout=30.0,
-            )
-            response.raise_for_status()
-            return response.content
+        response = await self.client.post(
+            f"/text-to-speech/{vid}", json=self._payload(text, **kwargs)
+        )
+        response.raise_for_status()
+        return response.content
 
     async def synthesize_stream(
         self, text: str, voice_id: str | None = None, **kwargs
     ) -> AsyncIterator[bytes]:
         vid = voice_id or self.default_voice_id
-        url = f"{ELEVENLABS_API_BASE}/text-to-speech/{vid}/stream"
-        async with httpx.AsyncClient() as client:
-            async with client.stream(
-                "POST",
-                url,
-                json={
-                    "text": text,
-                    "model_id": "eleven_monolingual_v1",
-                    "voice_settings": {
-                        "stability": kwargs.get("stability", 0.75),
-                        "similarity_boost": kwargs.get("similarity_boost", 0.75),
-                    },
-                },
-                headers={
-                    "xi-api-key": self.api_key,
-                    "Content-Type": "application/json",
-                    "Accept": "audio/mpeg",
-                },
-                timeout=30.0,
-            ) as response:
-                response.raise_for_status()
-                async for chunk in response.aiter_bytes():
-                    yield chunk
+        async with self.client.stream(
+            "POST", f"/text-to-speech/{vid}/stream", json=self._payload(text, **kwargs)
+        ) as response:
+            response.raise_for_status()
+            async for chunk in response.aiter_bytes():
+                yield chunk
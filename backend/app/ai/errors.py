@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+"""Errors raised by the provider wrappers, and classification of SDK errors."""
+
+import asyncio
+
+import httpx
+
+# Names of SDK exceptions (openai / anthropic) that mean "didn't get an answer"
+_TRANSIENT_ERROR_NAMES = {"APIConnectionError", "APITimeoutError", "InternalServerError"}
+
+
+class AIProviderError(Exception):
+    """Base class for AI failures surfaced to the API layer."""
+
+
+class AIUnavailable(AIProviderError):
+    """No provider could serve the request (failures or open circuits)."""
+
+    def __init__(self, capability: str, retry_after: float | None = None):
+        super().__init__(f"{capability} provider unavailable")
+        self.capability = capability
+        self.retry_after = retry_after
+
+
+def status_code_of(exc: BaseException) -> int | None:
+    status = getattr(exc, "status_code", None)
+    if status is None and isinstance(exc, httpx.HTTPStatusError):
+        status = exc.response.status_code
+    return status
+
+
+def is_transient(exc: BaseException) -> bool:
+    """True for failures worth retrying or failing over: timeouts, connection
+    errors, 408/409/429 and 5xx. Other 4xx mean the request itself is bad."""
+    if isinstance(exc, (asyncio.TimeoutError, httpx.TimeoutException, httpx.TransportError)):
+        return True
+    status = status_code_of(exc)
+    if status is not None:
+        return status in (408, 409, 429) or status >= 500
+    return type(exc).__name__ in _TRANSIENT_ERROR_NAMES
+
+
+class AIDeadlineExceeded(AIProviderError):
+    """A call site's latency budget ran out before the provider answered."""
+
+    def __init__(self, capability: str, call_site: str, deadline: float):
+        super().__init__(f"{capability} call '{call_site}' exceeded its {deadline:g}s deadline")
+        self.capability = capability
+        self.call_site = call_site
+        self.deadline = deadline
+
+
+class ProviderOverloaded(AIProviderError):
+    """A provider's admission queue is full, or a request waited too long for a slot."""
+
+    def __init__(self, provider: str, retry_after: float | None = None):
+        super().__init__(f"{provider} is at capacity")
+        self.provider = provider
+        self.retry_after = retry_after
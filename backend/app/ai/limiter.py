@@ -0,0 +1,357 @@
+from __future__ import annotations
+
+"""Adaptive per-provider concurrency and token-rate limiting.
+
+Every request to a vendor (shared across LLM, vision and TTS, since rate limits
+are per account) first takes a slot from that vendor's ``AdaptiveLimiter``:
+
+- at most ``limit`` requests in flight; ``limit`` grows by ~1 per window of
+  successes and halves on a 429 (AIMD), between the configured min and max;
+- a token bucket refilled at ``tokens_per_minute`` (0 = unlimited), charged with
+  an estimate of each request's prompt + completion tokens;
+- on a 429 admissions pause for the response's Retry-After, and the bucket is
+  clamped to the remaining-tokens header when one is present.
+
+Requests that can't start wait in a bounded queue for at most ``max_wait``; a
+full queue or an expired wait raises ``ProviderOverloaded`` (503 + Retry-After).
+
+The queue is ordered by the caller's priority class (``ai_priority``): FIFO
+within a class, interactive before standard before batch. A waiter moves up one
+class for every ``aging_seconds`` it has waited, so low classes can't starve,
+and batch calls never hold more than ``batch_share`` of the slots, so a burst of
+reports can't occupy the capacity patient-facing calls need.
+"""
+
+import asyncio
+import re
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Mapping, Optional
+
+from ..config import settings
+from .base import LLMProvider, TTSProvider, VisionProvider
+from .context import PRIORITIES, current_priority
+from .errors import ProviderOverloaded, status_code_of
+
+# Used when a 429 carries no Retry-After
+DEFAULT_RATE_LIMIT_PAUSE_SECONDS = 1.0
+
+# Rough prompt-token count per character, and per image for vision calls
+CHARS_PER_TOKEN = 4
+IMAGE_TOKENS = 1000
+DEFAULT_COMPLETION_TOKENS = 1024
+
+_REMAINING_TOKEN_HEADERS = ("x-ratelimit-remaining-tokens", "anthropic-ratelimit-tokens-remaining")
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+def parse_duration(value: str) -> Optional[float]:
+    """Parse ``Retry-After``-style values: plain seconds or ``1m30s`` / ``250ms``."""
+    value = value.strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = _DURATION_PART.findall(value)
+    if not parts:
+        return None
+    return sum(float(n) * _DURATION_UNITS[unit] for n, unit in parts)
+
+
+class AdaptiveLimiter:
+    def __init__(
+        self,
+        name: str,
+        max_concurrency: int,
+        min_concurrency: int,
+        tokens_per_minute: int,
+        max_queue: int,
+        max_wait: float,
+        aging_seconds: float = 0.0,
+        batch_share: float = 1.0,
+    ):
+        self.name = name
+        self.max_concurrency = max(1, max_concurrency)
+        self.min_concurrency = max(1, min(min_concurrency, self.max_concurrency))
+        self.limit = float(self.max_concurrency)
+        self.tokens_per_minute = tokens_per_minute
+        self.tokens = float(tokens_per_minute)
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.aging_seconds = aging_seconds
+        self.batch_share = batch_share
+        self.in_flight = 0
+        self.batch_in_flight = 0
+        self.paused_until = 0.0
+        self._refilled_at = time.monotonic()
+        # priority -> FIFO of (future, cost, priority, enqueued_at)
+        self._queues: dict[str, deque] = {priority: deque() for priority in PRIORITIES}
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self.counters = {"admitted": 0, "waited": 0, "rejected": 0, "timed_out": 0, "throttled": 0}
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        if self.tokens_per_minute > 0:
+            self.tokens = min(
+                float(self.tokens_per_minute),
+                self.tokens + (now - self._refilled_at) * self.tokens_per_minute / 60.0,
+            )
+        self._refilled_at = now
+
+    def _cost(self, cost: int) -> int:
+        # A request bigger than the whole bucket still has to be able to run
+        return min(cost, self.tokens_per_minute) if self.tokens_per_minute > 0 else 0
+
+    def _delay(self, cost: int) -> Optional[float]:
+        """Seconds until a request of ``cost`` could start; ``None`` = after a release."""
+        now = time.monotonic()
+        if now < self.paused_until:
+            return self.paused_until - now
+        if self.in_flight >= int(self.limit):
+            return None
+        self._refill()
+        cost = self._cost(cost)
+        if self.tokens < cost:
+            return (cost - self.tokens) * 60.0 / self.tokens_per_minute
+        return 0.0
+
+    def _has_room(self, priority: str) -> bool:
+        if priority != "batch":
+            return True
+        return self.batch_in_flight < max(1, int(self.limit * self.batch_share))
+
+    def _admit(self, cost: int, priority: str) -> None:
+        self.in_flight += 1
+        if priority == "batch":
+            self.batch_in_flight += 1
+        self.tokens -= self._cost(cost)
+        self.counters["admitted"] += 1
+
+    @property
+    def queued(self) -> int:
+        return sum(len(queue) for queue in self._queues.values())
+
+    def retry_after(self) -> float:
+        return max(1.0, self.paused_until - time.monotonic())
+
+    def _rank(self, priority: str, enqueued_at: float, now: float) -> int:
+        """Position of ``priority`` in PRIORITIES, raised one class per ``aging_seconds`` waited."""
+        rank = PRIORITIES.index(priority)
+        if self.aging_seconds > 0:
+            rank -= int((now - enqueued_at) / self.aging_seconds)
+        return max(0, rank)
+
+    def _heads(self) -> list[tuple]:
+        """The first live waiter of each class, in dequeue order."""
+        now = time.monotonic()
+        heads = []
+        for queue in self._queues.values():
+            while queue and queue[0][0].done():
+                queue.popleft()
+            if queue:
+                heads.append(queue[0])
+        return sorted(heads, key=lambda entry: (self._rank(entry[2], entry[3], now), entry[3]))
+
+    def _wake(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        while True:
+            for waiter, cost, priority, _ in self._heads():
+                if not self._has_room(priority):
+                    # Batch is at its share; a lower-ranked class may still go
+                    continue
+                delay = self._delay(cost)
+                if delay is None:
+                    return
+                if delay > 0:
+                    self._timer = asyncio.get_running_loop().call_later(delay, self._wake)
+                    return
+                self._queues[priority].popleft()
+                self._admit(cost, priority)
+                waiter.set_result(None)
+                break
+            else:
+                return
+
+    async def acquire(self, cost: int = 0, priority: str = "standard") -> None:
+        if not self.queued and self._has_room(priority) and self._delay(cost) == 0:
+            self._admit(cost, priority)
+            return
+        if self.queued >= self.max_queue:
+            self.counters["rejected"] += 1
+            raise ProviderOverloaded(self.name, self.retry_after())
+
+        waiter = asyncio.get_running_loop().create_future()
+        entry = (waiter, cost, priority, time.monotonic())
+        self._queues[priority].append(entry)
+        self.counters["waited"] += 1
+        self._wake()
+        try:
+            await asyncio.wait_for(waiter, self.max_wait)
+        except BaseException as e:
+            if waiter.done() and not waiter.cancelled():
+                # Admitted just as we gave up: hand the slot back
+                self.release(priority=priority)
+            elif entry in self._queues[priority]:
+                self._queues[priority].remove(entry)
+            if isinstance(e, asyncio.TimeoutError):
+                self.counters["timed_out"] += 1
+                raise ProviderOverloaded(self.name, self.retry_after())
+            raise
+
+    def release(self, success: bool = True, priority: str = "standard") -> None:
+        self.in_flight -= 1
+        if priority == "batch":
+            self.batch_in_flight -= 1
+        if success:
+            # Additive increase: about +1 per `limit` successful requests
+            self.limit = min(float(self.max_concurrency), self.limit + 1.0 / self.limit)
+        self._wake()
+
+    def release_rate_limited(self, headers: Mapping[str, str], priority: str = "standard") -> None:
+        """Multiplicative decrease after a 429, honouring the provider's headers."""
+        self.counters["throttled"] += 1
+        self.limit = max(float(self.min_concurrency), self.limit / 2)
+        pause = parse_duration(headers.get("retry-after", "")) if headers else None
+        self.paused_until = max(
+            self.paused_until,
+            time.monotonic() + (pause if pause is not None else DEFAULT_RATE_LIMIT_PAUSE_SECONDS),
+        )
+        for header in _REMAINING_TOKEN_HEADERS:
+            remaining = headers.get(header) if headers else None
+            if remaining is not None and self.tokens_per_minute > 0:
+                try:
+                    self.tokens = min(self.tokens, float(remaining))
+                except ValueError:
+                    pass
+        self.release(success=False, priority=priority)
+
+    @asynccontextmanager
+    async def slot(self, cost: int = 0) -> AsyncIterator[None]:
+        priority = current_priority()
+        await self.acquire(cost, priority)
+        try:
+            yield
+        except Exception as e:
+            if status_code_of(e) == 429:
+                response = getattr(e, "response", None)
+                self.release_rate_limited(getattr(response, "headers", None) or {}, priority)
+            else:
+                self.release(success=False, priority=priority)
+            raise
+        except BaseException:
+            self.release(success=False, priority=priority)
+            raise
+        else:
+            self.release(priority=priority)
+
+    def snapshot(self) -> dict:
+        return {
+            "limit": round(self.limit, 2),
+            "in_flight": self.in_flight,
+            "batch_in_flight": self.batch_in_flight,
+            "queued": {priority: len(queue) for priority, queue in self._queues.items()},
+            "tokens_available": round(self.tokens) if self.tokens_per_minute > 0 else None,
+            "paused_for_seconds": round(max(0.0, self.paused_until - time.monotonic()), 1),
+            **self.counters,
+        }
+
+
+_limiters: dict[str, AdaptiveLimiter] = {}
+
+
+def get_limiter(provider_name: str) -> AdaptiveLimiter:
+    if provider_name not in _limiters:
+        _limiters[provider_name] = AdaptiveLimiter(
+            provider_name,
+            max_concurrency=settings.AI_MAX_CONCURRENCY.get(provider_name, 8),
+            min_concurrency=settings.AI_MIN_CONCURRENCY,
+            tokens_per_minute=settings.AI_TOKENS_PER_MINUTE.get(provider_name, 0),
+            max_queue=settings.AI_LIMITER_MAX_QUEUE,
+            max_wait=settings.AI_LIMITER_MAX_WAIT_SECONDS,
+            aging_seconds=settings.AI_PRIORITY_AGING_SECONDS,
+            batch_share=settings.AI_BATCH_MAX_SHARE,
+        )
+    return _limiters[provider_name]
+
+
+def limiter_status() -> dict:
+    return {name: limiter.snapshot() for name, limiter in sorted(_limiters.items())}
+
+
+def _text_cost(*texts: str | None, completion: int = DEFAULT_COMPLETION_TOKENS) -> int:
+    """Estimated tokens: the prompt plus the most the completion may use."""
+    return sum(len(t) for t in texts if t) // CHARS_PER_TOKEN + completion
+
+
+class LimitedLLMProvider(LLMProvider):
+    def __init__(self, inner: LLMProvider, limiter: AdaptiveLimiter):
+        self.inner = inner
+        self.limiter = limiter
+
+    @property
+    def name(self) -> str:
+        return self.inner.name
+
+    async def generate_text(self, prompt: str, system: str | None = None, **kwargs) -> str:
+        cost = _text_cost(
+            prompt, system, completion=kwargs.get("max_tokens", DEFAULT_COMPLETION_TOKENS)
+        )
+        async with self.limiter.slot(cost):
+            return await self.inner.generate_text(prompt, system=system, **kwargs)
+
+    async def generate_text_stream(
+        self, prompt: str, system: str | None = None, **kwargs
+    ) -> AsyncIterator[str]:
+        cost = _text_cost(
+            prompt, system, completion=kwargs.get("max_tokens", DEFAULT_COMPLETION_TOKENS)
+        )
+        async with self.limiter.slot(cost):
+            async for token in self.inner.generate_text_stream(prompt, system=system, **kwargs):
+                yield token
+
+    async def aclose(self) -> None:
+        await self.inner.aclose()
+
+
+class LimitedVisionProvider(VisionProvider):
+    def __init__(self, inner: VisionProvider, limiter: AdaptiveLimiter):
+        self.inner = inner
+        self.limiter = limiter
+
+    async def analyze_image(self, image_b64: str, prompt: str, **kwargs) -> str:
+        cost = _text_cost(prompt) + IMAGE_TOKENS
+        async with self.limiter.slot(cost):
+            return await self.inner.analyze_image(image_b64, prompt, **kwargs)
+
+    async def aclose(self) -> None:
+        await self.inner.aclose()
+
+
+class LimitedTTSProvider(TTSProvider):
+    """TTS takes a concurrency slot only.
+
+    A vendor's token bucket counts LLM/vision tokens; TTS characters are a
+    separate quota, so charging them here would starve the vendor's text calls.
+    """
+
+    def __init__(self, inner: TTSProvider, limiter: AdaptiveLimiter):
+        self.inner = inner
+        self.limiter = limiter
+
+    async def synthesize(self, text: str, voice_id: str | None = None, **kwargs) -> bytes:
+        async with self.limiter.slot():
+            return await self.inner.synthesize(text, voice_id=voice_id, **kwargs)
+
+    async def synthesize_stream(
+        self, text: str, voice_id: str | None = None, **kwargs
+    ) -> AsyncIterator[bytes]:
+        async with self.limiter.slot():
+            async for part in self.inner.synthesize_stream(text, voice_id=voice_id, **kwargs):
+                yield part
+
+    async def aclose(self) -> None:
+        await self.inner.aclose()
@@ -6,14 +6,24 @@ from typing import AsyncIterator
 
 from openai import AsyncOpenAI
 
+from ..utils.image import split_data_uri
 from .base import LLMProvider, VisionProvider, TTSProvider, ImageGenerationProvider
 
 
 class OpenAILLMProvider(LLMProvider):
-    def __init__(self, api_key: str, model: str = "gpt-4"):
-        self.client = AsyncOpenAI(api_key=api_key)
+    def __init__(
+        self,
+        api_key: str,
+        model: str = "gpt-4",
+        timeout: float = 60.0,
+        max_retries: int = 2,
+    ):
+        self.client = AsyncOpenAI(api_key=api_key, timeout=timeout, max_retries=max_retries)
         self.model = model
 
+    async def aclose(self) -> None:
+        await self.client.close()
+
     async def generate_text(self, prompt: str, system: str | None = None, **kwargs) -> str:
         messages = []
         if system:
@@ -40,14 +50,24 @@ class OpenAILLMProvider(LLMProvider):
 
 
 class OpenAIVisionProvider(VisionProvider):
-    def __init__(self, api_key: str, model: str = "gpt-4o"):
-        self.client = AsyncOpenAI(api_key=api_key)
+    def __init__(
+        self,
+        api_key: str,
+        model: str = "gpt-4o",
+        timeout: float = 60.0,
+        max_retries: int = 2,
+    ):
+        self.client = AsyncOpenAI(api_key=api_key, timeout=timeout, max_retries=max_retries)
         self.model = model
 
+    async def aclose(self) -> None:
+        await self.client.close()
+
     async def analyze_image(self, image_b64: str, prompt: str, **kwargs) -> str:
-        # Ensure data URI prefix
+        # Ensure data URI prefix, labelled with the image's real type
         if not image_b64.startswith("data:"):
-            image_b64 = f"data:image/jpeg;base64,{image_b64}"
+            mime_type, _ = split_data_uri(image_b64)
+            image_b64 = f"data:{mime_type};base64,{image_b64}"
         response = await self.client.chat.completions.create(
             model=self.model,
             messages=[
@@ -66,10 +86,19 @@ class OpenAIVisionProvider(VisionProvider):
 
 
 class OpenAITTSProvider(TTSProvider):
-    def __init__(self, api_key: str, model: str = "tts-1"):
-        self.client = AsyncOpenAI(api_key=api_key)
+    def __init__(
+        self,
+        api_key: str,
+        model: str = "tts-1",
+        timeout: float = 60.0,
+        max_retries: int = 2,
+    ):
+        self.client = AsyncOpenAI(api_key=api_key, timeout=timeout, max_retries=max_retries)
         self.model = model
 
+    async def aclose(self) -> None:
+        await self.client.close()
+
     async def synthesize(self, text: str, voice_id: str | None = None, **kwargs) -> bytes:
         voice = voice_id or "alloy"
         response = await self.client.audio.speech.create(
@@ -81,17 +110,23 @@ class OpenAITTSProvider(TTSProvider):
         self, text: str, voice_id: str | None = None, **kwargs
     ) -> AsyncIterator[bytes]:
         voice = voice_id or "alloy"
-        response = await self.client.audio.speech.create(
+        # The streaming-response wrapper hands back the HTTP body as it arrives
+        # instead of buffering the whole MP3 before returning. No chunk size:
+        # a fixed size would hold back the first few KB until they fill it.
+        async with self.client.audio.speech.with_streaming_response.create(
             model=self.model, voice=voice, input=text, **kwargs
-        )
-        # OpenAI TTS doesn't natively stream chunks, yield full content
-        yield response.content
+        ) as response:
+            async for chunk in response.iter_bytes():
+                yield chunk
 
 
 class OpenAIImageProvider(ImageGenerationProvider):
     def __init__(self, api_key: str):
         self.client = AsyncOpenAI(api_key=api_key)
 
+    async def aclose(self) -> None:
+        await self.client.close()
+
     async def generate_image(self, prompt: str, **kwargs) -> str:
         response = await self.client.images.generate(
             model="dall-e-3",
@@ -0,0 +1,277 @@
+from __future__ import annotations
+
+"""Circuit breakers, retries and failover across providers.
+
+``Resilient*Provider`` holds an ordered list of candidate providers for one
+capability. Each call goes to the first candidate whose breaker is closed, is
+retried with jittered exponential backoff on transient errors, and moves on to
+the next candidate when retries run out. Non-transient errors (a bad request)
+are raised straight away. Streams are only retried before their first chunk.
+A candidate whose admission queue is full (``ProviderOverloaded``) is skipped
+without counting against its breaker.
+"""
+
+import asyncio
+import random
+import time
+from typing import AsyncIterator, Awaitable, Callable, TypeVar
+
+from ..config import settings
+from .base import LLMProvider, TTSProvider, VisionProvider
+from .errors import AIUnavailable, ProviderOverloaded, is_transient
+
+T = TypeVar("T")
+
+
+class CircuitBreaker:
+    """Closed -> open after ``failure_threshold`` consecutive failures; after
+    ``reset_seconds`` one trial call is let through (half-open) and its outcome
+    closes or re-opens the circuit."""
+
+    def __init__(self, name: str, failure_threshold: int, reset_seconds: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial_in_flight = False
+
+    def allow(self) -> bool:
+        if self.state == "closed":
+            return True
+        if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_seconds:
+            self.state = "half_open"
+        if self.state == "half_open" and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self.state = "closed"
+        self.failures = 0
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._trial_in_flight = False
+        if self.state == "half_open" or self.failures >= self.failure_threshold:
+            self.state = "open"
+            self.opened_at = time.monotonic()
+
+    def release(self) -> None:
+        """The call ended without a verdict (e.g. a bad request, or cancelled)."""
+        self._trial_in_flight = False
+
+    def retry_after(self) -> float:
+        if self.state != "open":
+            return 0.0
+        return max(0.0, self.reset_seconds - (time.monotonic() - self.opened_at))
+
+    def snapshot(self) -> dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "retry_after_seconds": round(self.retry_after(), 1),
+        }
+
+
+_breakers: dict[str, CircuitBreaker] = {}
+
+
+def get_breaker(capability: str, provider_name: str) -> CircuitBreaker:
+    key = f"{capability}:{provider_name}"
+    if key not in _breakers:
+        _breakers[key] = CircuitBreaker(
+            key,
+            failure_threshold=settings.AI_BREAKER_FAILURE_THRESHOLD,
+            reset_seconds=settings.AI_BREAKER_RESET_SECONDS,
+        )
+    return _breakers[key]
+
+
+def breaker_status() -> dict:
+    return {key: breaker.snapshot() for key, breaker in sorted(_breakers.items())}
+
+
+def backoff_delay(attempt: int) -> float:
+    """Full-jitter exponential backoff for retry number ``attempt`` (1-based)."""
+    cap = min(
+        settings.AI_RETRY_MAX_DELAY_SECONDS,
+        settings.AI_RETRY_BASE_DELAY_SECONDS * 2 ** (attempt - 1),
+    )
+    return random.uniform(0, cap)
+
+
+class Candidate:
+    def __init__(self, name: str, provider, primary: bool):
+        self.name = name
+        self.provider = provider
+        self.primary = primary
+
+
+class _Resilient:
+    capability = ""
+
+    def __init__(self, candidates: list[Candidate]):
+        self.candidates = candidates
+
+    def rotated(self):
+        """The same providers, starting from the second one (for hedged requests).
+
+        With a single provider this is an equivalent wrapper around that provider.
+        """
+        clone = object.__new__(type(self))
+        clone.candidates = self.candidates[1:] + self.candidates[:1]
+        return clone
+
+    def _unavailable(self, overloaded: list[ProviderOverloaded]) -> AIUnavailable:
+        # Closed breakers report 0; only real waits (open circuits, full queues) count
+        waits = [get_breaker(self.capability, c.name).retry_after() for c in self.candidates]
+        waits += [e.retry_after or 0.0 for e in overloaded]
+        waits = [wait for wait in waits if wait > 0]
+        return AIUnavailable(self.capability, retry_after=min(waits) if waits else None)
+
+    async def _call(self, fn: Callable[[Candidate], Awaitable[T]]) -> T:
+        overloaded: list[ProviderOverloaded] = []
+        for candidate in self.candidates:
+            breaker = get_breaker(self.capability, candidate.name)
+            for attempt in range(settings.AI_RETRY_ATTEMPTS + 1):
+                if not breaker.allow():
+                    break
+                try:
+                    result = await fn(candidate)
+                except ProviderOverloaded as e:
+                    breaker.release()
+                    overloaded.append(e)
+                    break
+                except Exception as e:
+                    if not is_transient(e):
+                        breaker.release()
+                        raise
+                    breaker.record_failure()
+                    if attempt < settings.AI_RETRY_ATTEMPTS:
+                        await asyncio.sleep(backoff_delay(attempt + 1))
+                    continue
+                except BaseException:
+                    breaker.release()
+                    raise
+                breaker.record_success()
+                return result
+        raise self._unavailable(overloaded)
+
+    async def _stream(
+        self,
+        fn: Callable[[Candidate], AsyncIterator[T]],
+        wrap: Callable[[T, Candidate], T] | None = None,
+    ) -> AsyncIterator[T]:
+        overloaded: list[ProviderOverloaded] = []
+        for candidate in self.candidates:
+            breaker = get_breaker(self.capability, candidate.name)
+            for attempt in range(settings.AI_RETRY_ATTEMPTS + 1):
+                if not breaker.allow():
+                    break
+                started = False
+                try:
+                    async for part in fn(candidate):
+                        if not started:
+                            started = True
+                            breaker.record_success()
+                        yield wrap(part, candidate) if wrap else part
+                except ProviderOverloaded as e:
+                    # Raised by the limiter before the stream starts
+                    breaker.release()
+                    overloaded.append(e)
+                    break
+                except Exception as e:
+                    if started or not is_transient(e):
+                        # Can't retry once output has been delivered
+                        if not started:
+                            breaker.release()
+                        raise
+                    breaker.record_failure()
+                    if attempt < settings.AI_RETRY_ATTEMPTS:
+                        await asyncio.sleep(backoff_delay(attempt + 1))
+                    continue
+                except BaseException:
+                    if not started:
+                        breaker.release()
+                    raise
+                if not started:
+                    breaker.record_success()
+                return
+        raise self._unavailable(overloaded)
+
+    async def aclose(self) -> None:
+        for candidate in self.candidates:
+            await candidate.provider.aclose()
+
+
+class ResilientLLMProvider(_Resilient, LLMProvider):
+    capability = "llm"
+
+    @property
+    def name(self) -> str:
+        return self.candidates[0].provider.name
+
+    async def generate_text(self, prompt: str, system: str | None = None, **kwargs) -> str:
+        return await self._call(
+            lambda c: c.provider.generate_text(prompt, system=system, **kwargs)
+        )
+
+    async def generate_text_stream(
+        self, prompt: str, system: str | None = None, **kwargs
+    ) -> AsyncIterator[str]:
+        async for token in self._stream(
+            lambda c: c.provider.generate_text_stream(prompt, system=system, **kwargs)
+        ):
+            yield token
+
+
+class ResilientVisionProvider(_Resilient, VisionProvider):
+    capability = "vision"
+
+    async def analyze_image(self, image_b64: str, prompt: str, **kwargs) -> str:
+        return await self._call(lambda c: c.provider.analyze_image(image_b64, prompt, **kwargs))
+
+
+class FallbackAudio(bytes):
+    """Audio produced by a fallback TTS provider, in a different voice.
+
+    Lets callers that cache audio per voice (memory narration) tell it apart.
+    """
+
+    provider: str = ""
+
+
+def _mark_fallback(audio: bytes, candidate: Candidate) -> bytes:
+    if candidate.primary:
+        return audio
+    marked = FallbackAudio(audio)
+    marked.provider = candidate.name
+    return marked
+
+
+class ResilientTTSProvider(_Resilient, TTSProvider):
+    capability = "tts"
+
+    @staticmethod
+    def _voice(candidate: Candidate, voice_id: str | None) -> str | None:
+        # Voice ids are provider-specific; fallbacks use their default voice
+        return voice_id if candidate.primary else None
+
+    async def synthesize(self, text: str, voice_id: str | None = None, **kwargs) -> bytes:
+        async def call(c: Candidate) -> bytes:
+            audio = await c.provider.synthesize(text, voice_id=self._voice(c, voice_id), **kwargs)
+            return _mark_fallback(audio, c)
+
+        return await self._call(call)
+
+    async def synthesize_stream(
+        self, text: str, voice_id: str | None = None, **kwargs
+    ) -> AsyncIterator[bytes]:
+        async for part in self._stream(
+            lambda c: c.provider.synthesize_stream(text, voice_id=self._voice(c, voice_id), **kwargs),
+            wrap=_mark_fallback,
+        ):
+            yield part
@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+"""Request coalescing ("single flight") for provider calls.
+
+Concurrent identical calls share one in-flight provider request: the first
+caller starts it, later callers await the same result. Streams are shared the
+same way, with late joiners replaying what has arrived so far. Nothing is kept
+once the call finishes — that's the response cache's job.
+
+Calls only coalesce within a priority class: a flight runs at its starter's
+priority, so an interactive caller must never join one started by batch work.
+"""
+
+import asyncio
+import hashlib
+from collections import defaultdict
+from typing import AsyncIterator, Awaitable, Callable, TypeVar
+
+from .base import LLMProvider, TTSProvider, VisionProvider
+from .cache import request_key
+from .context import current_call_site, current_priority
+
+T = TypeVar("T")
+
+
+class _Broadcast:
+    """One shared stream: parts so far, and who is still listening."""
+
+    def __init__(self):
+        self.parts: list = []
+        self.done = False
+        self.error: BaseException | None = None
+        self.subscribers = 0
+        self.task: asyncio.Task | None = None
+        self._changed = asyncio.Event()
+
+    def notify(self) -> None:
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    async def wait(self) -> None:
+        await self._changed.wait()
+
+
+class SingleFlight:
+    def __init__(self):
+        self._calls: dict[str, asyncio.Future] = {}
+        self._streams: dict[str, _Broadcast] = {}
+        self._coalesced: dict = defaultdict(int)
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        """Run ``fn()`` unless an identical call is in flight; either way return its result."""
+        future = self._calls.get(key)
+        if future is None:
+            future = asyncio.ensure_future(fn())
+            self._calls[key] = future
+            future.add_done_callback(lambda f: self._forget(self._calls, key, f))
+        else:
+            self._coalesced["calls"] += 1
+        # A caller that gives up must not cancel the call for everyone else
+        return await asyncio.shield(future)
+
+    async def stream(
+        self, key: str, factory: Callable[[], AsyncIterator[T]]
+    ) -> AsyncIterator[T]:
+        """Iterate ``factory()``, sharing one underlying stream among concurrent callers.
+
+        The shared stream is cancelled once every caller has stopped listening.
+        """
+        broadcast = self._streams.get(key)
+        if broadcast is None:
+            broadcast = _Broadcast()
+            self._streams[key] = broadcast
+            broadcast.task = asyncio.ensure_future(self._pump(key, broadcast, factory()))
+        else:
+            self._coalesced["streams"] += 1
+
+        broadcast.subscribers += 1
+        try:
+            i = 0
+            while True:
+                while i < len(broadcast.parts):
+                    yield broadcast.parts[i]
+                    i += 1
+                if broadcast.done:
+                    if broadcast.error is not None:
+                        raise broadcast.error
+                    return
+                await broadcast.wait()
+        finally:
+            broadcast.subscribers -= 1
+            if broadcast.subscribers == 0 and not broadcast.done:
+                broadcast.task.cancel()
+                self._forget(self._streams, key, broadcast)
+
+    async def _pump(self, key: str, broadcast: _Broadcast, source: AsyncIterator) -> None:
+        try:
+            async for part in source:
+                broadcast.parts.append(part)
+                broadcast.notify()
+        except Exception as e:
+            broadcast.error = e
+        finally:
+            await source.aclose()
+            broadcast.done = True
+            broadcast.notify()
+            self._forget(self._streams, key, broadcast)
+
+    @staticmethod
+    def _forget(registry: dict, key: str, entry) -> None:
+        if registry.get(key) is entry:
+            del registry[key]
+        if isinstance(entry, asyncio.Future) and not entry.cancelled():
+            # Mark the error retrieved even if every caller has gone away
+            entry.exception()
+
+    def snapshot(self) -> dict:
+        return {
+            "in_flight": len(self._calls) + len(self._streams),
+            "coalesced": dict(self._coalesced),
+        }
+
+
+flights = SingleFlight()
+
+
+def _key(*parts) -> str:
+    return request_key(current_call_site(), current_priority(), *parts)
+
+
+class SingleFlightLLMProvider(LLMProvider):
+    def __init__(self, inner: LLMProvider):
+        self.inner = inner
+
+    @property
+    def name(self) -> str:
+        return self.inner.name
+
+    async def generate_text(self, prompt: str, system: str | None = None, **kwargs) -> str:
+        key = _key("llm", system, prompt, kwargs)
+        return await flights.do(
+            key, lambda: self.inner.generate_text(prompt, system=system, **kwargs)
+        )
+
+    async def generate_text_stream(
+        self, prompt: str, system: str | None = None, **kwargs
+    ) -> AsyncIterator[str]:
+        key = _key("llm-stream", system, prompt, kwargs)
+        async for token in flights.stream(
+            key, lambda: self.inner.generate_text_stream(prompt, system=system, **kwargs)
+        ):
+            yield token
+
+    async def aclose(self) -> None:
+        await self.inner.aclose()
+
+
+class SingleFlightVisionProvider(VisionProvider):
+    def __init__(self, inner: VisionProvider):
+        self.inner = inner
+
+    async def analyze_image(self, image_b64: str, prompt: str, **kwargs) -> str:
+        image_hash = hashlib.sha256(image_b64.encode()).hexdigest()
+        key = _key("vision", image_hash, prompt, kwargs)
+        return await flights.do(
+            key, lambda: self.inner.analyze_image(image_b64, prompt, **kwargs)
+        )
+
+    async def aclose(self) -> None:
+        await self.inner.aclose()
+
+
+class SingleFlightTTSProvider(TTSProvider):
+    def __init__(self, inner: TTSProvider):
+        self.inner = inner
+
+    async def synthesize(self, text: str, voice_id: str | None = None, **kwargs) -> bytes:
+        key = _key("tts", voice_id, text, kwargs)
+        return await flights.do(
+            key, lambda: self.inner.synthesize(text, voice_id=voice_id, **kwargs)
+        )
+
+    async def synthesize_stream(
+        self, text: str, voice_id: str | None = None, **kwargs
+    ) -> AsyncIterator[bytes]:
+        key = _key("tts-stream", voice_id, text, kwargs)
+        async for part in flights.stream(
+            key, lambda: self.inner.synthesize_stream(text, voice_id=voice_id, **kwargs)
+        ):
+            yield part
+
+    async def aclose(self) -> None:
+        await self.inner.aclose()
@@ -1,3 +1,5 @@
+from typing import Dict, List
+
 from pydantic_settings import BaseSettings
 
 
@@ -21,12 +23,147 @@ class Settings(BaseSettings):
     ANTHROPIC_API_KEY: str = ""
     ELEVENLABS_API_KEY: str = ""
     ELEVENLABS_VOICE_ID: str = "EXAVITQu4vr4xnSDxMaL"
+    ELEVENLABS_HTTP2: bool = True
+    ELEVENLABS_MAX_CONNECTIONS: int = 20
+    ELEVENLABS_MAX_KEEPALIVE_CONNECTIONS: int = 10
+    ELEVENLABS_KEEPALIVE_EXPIRY_SECONDS: float = 30.0
+
+    # Provider resilience: per-attempt timeout, retries with jittered backoff,
+    # per-provider circuit breakers, and failover to other providers (only those
+    # with an API key configured)
+    AI_PROVIDER_TIMEOUT_SECONDS: float = 60.0
+    AI_RETRY_ATTEMPTS: int = 2
+    AI_RETRY_BASE_DELAY_SECONDS: float = 0.25
+    AI_RETRY_MAX_DELAY_SECONDS: float = 2.0
+    AI_BREAKER_FAILURE_THRESHOLD: int = 5
+    AI_BREAKER_RESET_SECONDS: float = 30.0
+    AI_FAILOVER_ENABLED: bool = True
+    AI_LLM_FALLBACKS: List[str] = ["openai", "anthropic"]
+    AI_VISION_FALLBACKS: List[str] = ["openai", "anthropic"]
+    AI_TTS_FALLBACKS: List[str] = ["openai"]
+
+    # Latency budget per call site (seconds, 0 = none); the provider call is
+    # cancelled and the request fails with 504 when it runs out. For streams it
+    # bounds each wait for the next chunk, and AI_STREAM_DEADLINES the whole stream.
+    AI_DEFAULT_DEADLINE_SECONDS: float = 120.0
+    AI_DEADLINES: Dict[str, float] = {
+        "identify_object": 10.0,
+        "analyze_scene": 15.0,
+        "describe_scene": 15.0,
+        "synthesize": 15.0,
+        "narration": 10.0,
+        "daily_prompt": 20.0,
+        "expand_memory": 30.0,
+        "generate_memory": 45.0,
+        "cognitive_report": 60.0,
+        "upload_image": 60.0,
+        "upload_document": 60.0,
+        "upload_audio": 60.0,
+    }
+    AI_DEFAULT_STREAM_DEADLINE_SECONDS: float = 300.0
+    AI_STREAM_DEADLINES: Dict[str, float] = {
+        "synthesize": 120.0,
+        "narration": 60.0,
+        "daily_prompt": 60.0,
+        "expand_memory": 90.0,
+        "generate_memory": 120.0,
+    }
+    # Hedged requests: at these call sites, a call slower than the site's recent
+    # p95 gets a second request (to the next provider, if any); first answer wins.
+    # Streams (narration, /voice/synthesize) are hedged on time to first chunk.
+    AI_HEDGE_SITES: List[str] = []
+    AI_HEDGE_PERCENTILE: float = 0.95
+    AI_HEDGE_MIN_SAMPLES: int = 20
+    AI_HEDGE_MIN_DELAY_SECONDS: float = 0.5
+    AI_LATENCY_WINDOW: int = 200
+
+    # Per-vendor admission control: in-flight cap (adapted between min and max
+    # from 429s), LLM/vision token budget per minute (0 = unlimited; TTS calls
+    # only take an in-flight slot), and a bounded wait queue. Overflow fails
+    # fast with 503.
+    AI_MAX_CONCURRENCY: Dict[str, int] = {"openai": 16, "anthropic": 8, "elevenlabs": 4}
+    AI_MIN_CONCURRENCY: int = 1
+    AI_TOKENS_PER_MINUTE: Dict[str, int] = {"openai": 0, "anthropic": 0, "elevenlabs": 0}
+    AI_LIMITER_MAX_QUEUE: int = 64
+    AI_LIMITER_MAX_WAIT_SECONDS: float = 10.0
+    # Queued calls are served by priority class (interactive > standard > batch);
+    # a waiting call moves up one class per AI_PRIORITY_AGING_SECONDS, and batch
+    # calls hold at most AI_BATCH_MAX_SHARE of a vendor's in-flight slots
+    AI_PRIORITY_AGING_SECONDS: float = 5.0
+    AI_BATCH_MAX_SHARE: float = 0.5
+
+    # LLM/vision response cache: "memory" (per process) or "database" (shared).
+    # Responses are reused only at call sites with a TTL; others always hit the
+    # provider. Override as JSON, e.g. AI_CACHE_TTLS='{"daily_prompt": 600}'.
+    AI_CACHE_ENABLED: bool = True
+    AI_CACHE_BACKEND: str = "memory"
+    AI_CACHE_MAX_ENTRIES: int = 2048
+    AI_CACHE_DEFAULT_TTL_SECONDS: float = 0.0
+    AI_CACHE_TTLS: Dict[str, float] = {
+        "daily_prompt": 3600.0,
+        "cognitive_report": 3600.0,
+        "generate_memory": 300.0,
+        "identify_object": 86400.0,
+        "describe_scene": 3600.0,
+        "analyze_scene": 300.0,
+        "upload_document": 86400.0,
+        "upload_audio": 86400.0,
+    }
+    # Share one in-flight provider request among concurrent identical calls
+    AI_SINGLE_FLIGHT_ENABLED: bool = True
+
+    # File storage: "supabase" or "local"
+    STORAGE_BACKEND: str = "supabase"
+    STORAGE_MAX_WORKERS: int = 4
+    LOCAL_STORAGE_DIR: str = "storage"
+    LOCAL_STORAGE_URL_PATH: str = "/files"
+    LOCAL_STORAGE_BASE_URL: str = ""
 
     # Supabase Storage
     SUPABASE_URL: str = ""
     SUPABASE_SERVICE_KEY: str = ""
     SUPABASE_STORAGE_BUCKET: str = "memory-files"
 
+    # Uploads are spooled here (empty = system temp dir). Async upload jobs read
+    # their files from it, so worker processes must see the same directory.
+    UPLOAD_SPOOL_DIR: str = ""
+    UPLOAD_CONCURRENCY: int = 4
+
+    # PDF/DOCX parsing runs in its own process per document (at most
+    # EXTRACTION_WORKERS at once); a document over the timeout has its process killed
+    EXTRACTION_WORKERS: int = 2
+    EXTRACTION_TIMEOUT_SECONDS: float = 30.0
+    EXTRACTION_MAX_PAGES: int = 50
+
+    # Images are downscaled to this longest side before any vision call
+    VISION_MAX_IMAGE_SIDE: int = 1568
+    VISION_JPEG_QUALITY: int = 85
+
+    # Background jobs: run a worker inside the API process, or only in
+    # separate `python -m app.worker` processes
+    JOB_WORKER_INPROCESS: bool = True
+    JOB_WORKER_CONCURRENCY: int = 2
+    JOB_POLL_INTERVAL_SECONDS: float = 1.0
+    JOB_HEARTBEAT_SECONDS: float = 30.0
+    # A running job with no heartbeat for this long is presumed dead and retried
+    JOB_STALE_SECONDS: float = 120.0
+    JOB_MAX_ATTEMPTS: int = 3
+    JOB_SHUTDOWN_GRACE_SECONDS: float = 30.0
+    JOB_EVENTS_POLL_SECONDS: float = 0.5
+
+    # Emit per-stage Server-Timing headers on slow endpoints
+    DEBUG_TIMINGS: bool = False
+
+    # Synthesized audio cache (content-addressed files on local disk)
+    AUDIO_CACHE_DIR: str = "audio_cache"
+    # Narratives are synthesised sentence-chunk by chunk, a few chunks ahead of playback
+    TTS_CHUNK_MAX_CHARS: int = 400
+    TTS_PIPELINE_CONCURRENCY: int = 3
+
+    # Legacy label -> anchor lookup cache
+    ANCHOR_CACHE_TTL_SECONDS: float = 30.0
+    ANCHOR_CACHE_MAX_ENTRIES: int = 1024
+
     model_config = {"env_file": ".env", "extra": "ignore"}
 
 
@@ -7,6 +7,7 @@ from jose import JWTError, jwt
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from .ai.context import PRIORITIES, set_ai_priority
 from .config import settings
 from .database import async_session
 from .models.user import User
@@ -59,3 +60,18 @@ async def get_optional_user(
         return None
     result = await db.execute(select(User).where(User.id == uuid.UUID(user_id)))
     return result.scalar_one_or_none()
+
+
+def ai_priority_class(priority: str):
+    """Router dependency declaring the priority of an endpoint's AI calls.
+
+    ``@router.post(..., dependencies=[Depends(ai_priority_class("interactive"))])``
+    """
+    if priority not in PRIORITIES:
+        raise ValueError(f"Unknown AI priority class: {priority}")
+
+    async def set_priority() -> None:
+        # Not reset on exit: streamed response bodies run after dependencies close
+        set_ai_priority(priority)
+
+    return set_priority
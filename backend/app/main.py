@@ -1,14 +1,36 @@
+import asyncio
 from contextlib import asynccontextmanager
+from pathlib import Path
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+from fastapi.staticfiles import StaticFiles
 
-from .routers import auth, legacy, memories, objects, upload, vision, voice, toolkit
+from .ai import close_providers, get_tts_provider
+from .ai.errors import AIDeadlineExceeded, AIUnavailable
+from .config import settings
+from .routers import auth, jobs, legacy, memories, objects, status, upload, vision, voice, toolkit
+from .services.document_service import shutdown_extraction_pool
+from .services.job_service import run_worker
+from .services.storage_service import close_storage_backend
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    # Open the TTS connection pool up front so the first narration doesn't pay for it
+    get_tts_provider()
+    stop_worker = asyncio.Event()
+    worker = None
+    if settings.JOB_WORKER_INPROCESS:
+        worker = asyncio.create_task(run_worker(stop_worker))
     yield
+    stop_worker.set()
+    if worker is not None:
+        await worker
+    await close_providers()
+    await close_storage_backend()
+    shutdown_extraction_pool()
 
 
 app = FastAPI(title="Memory Anchors API", lifespan=lifespan)
@@ -21,6 +43,25 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+@app.exception_handler(AIUnavailable)
+async def ai_unavailable_handler(request: Request, exc: AIUnavailable):
+    headers = {"Retry-After": str(max(1, round(exc.retry_after)))} if exc.retry_after else None
+    return JSONResponse(
+        status_code=503,
+        content={"detail": f"The {exc.capability} service is temporarily unavailable"},
+        headers=headers,
+    )
+
+
+@app.exception_handler(AIDeadlineExceeded)
+async def ai_deadline_handler(request: Request, exc: AIDeadlineExceeded):
+    return JSONResponse(
+        status_code=504,
+        content={"detail": f"The {exc.capability} service took too long to respond"},
+    )
+
+
 # Legacy routes (no prefix — keeps frontend working)
 app.include_router(legacy.router, tags=["legacy"])
 
@@ -31,6 +72,17 @@ app.include_router(objects.router, prefix="/api/v1/objects", tags=["objects"])
 app.include_router(vision.router, prefix="/api/v1/vision", tags=["vision"])
 app.include_router(voice.router, prefix="/api/v1/voice", tags=["voice"])
 app.include_router(toolkit.router, prefix="/api/v1/toolkit", tags=["toolkit"])
+app.include_router(jobs.router, prefix="/api/v1/jobs", tags=["jobs"])
+app.include_router(status.router, prefix="/api/v1/ai", tags=["ai"])
 
 # Upload routes (no api/v1 prefix for simplicity with frontend)
 app.include_router(upload.router, tags=["upload"])
+
+# Local storage backend serves its own files
+if settings.STORAGE_BACKEND == "local":
+    Path(settings.LOCAL_STORAGE_DIR).mkdir(parents=True, exist_ok=True)
+    app.mount(
+        settings.LOCAL_STORAGE_URL_PATH,
+        StaticFiles(directory=settings.LOCAL_STORAGE_DIR),
+        name="files",
+    )
@@ -2,7 +2,9 @@ from .base import Base
 from .user import User, CaregiverRelationship
 from .memory import Memory, MemoryObject, MemoryPerson, MemoryEmotion
 from .object import RegisteredObject
-from .session import MoodEntry, CognitiveExercise, AudioCache
+from .session import MoodEntry, CognitiveExercise, AudioCache, AIResponseCache
+from .file import StoredFile
+from .job import Job
 
 __all__ = [
     "Base",
@@ -16,4 +18,7 @@ __all__ = [
     "MoodEntry",
     "CognitiveExercise",
     "AudioCache",
+    "AIResponseCache",
+    "StoredFile",
+    "Job",
 ]
@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+from typing import Any, Dict, Optional
+
+from sqlalchemy import BigInteger, String, Text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import Base, IDMixin, TimestampMixin
+
+
+class StoredFile(Base, IDMixin, TimestampMixin):
+    """One uploaded blob, keyed by content hash, with results derived from it."""
+
+    __tablename__ = "stored_files"
+
+    sha256: Mapped[str] = mapped_column(String(64), nullable=False, unique=True)
+    size: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    content_type: Mapped[str] = mapped_column(String(255), nullable=False)
+    storage_url: Mapped[str] = mapped_column(Text, nullable=False)
+    # Document text or audio transcription, when the file has been processed
+    extracted_text: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    # Parsed vision output per object label: {label: memory_data}
+    vision_results: Mapped[Optional[Dict[str, Any]]] = mapped_column(JSONB, nullable=True)
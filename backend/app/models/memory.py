@@ -4,8 +4,19 @@ import uuid
 from datetime import datetime
 from typing import TYPE_CHECKING, Any, Dict, List, Optional
 
-from sqlalchemy import Boolean, DateTime, Float, ForeignKey, Integer, String, Text
-from sqlalchemy.dialects.postgresql import JSONB, UUID
+from sqlalchemy import (
+    Boolean,
+    Computed,
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+    text,
+)
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR, UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .base import Base, IDMixin, TimestampMixin
@@ -15,8 +26,25 @@ if TYPE_CHECKING:
     from .user import User
 
 
+# Weighted full-text document: title matches rank above narrative matches.
+SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(narrative_text, '')), 'B')"
+)
+
+
 class Memory(Base, IDMixin, TimestampMixin):
     __tablename__ = "memories"
+    __table_args__ = (
+        Index("ix_memories_search_vector", "search_vector", postgresql_using="gin"),
+        Index(
+            "ix_memories_user_created_active",
+            "user_id",
+            "created_at",
+            "id",
+            postgresql_where=text("is_deleted = false"),
+        ),
+    )
 
     user_id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), ForeignKey("users.id"), nullable=False
@@ -37,6 +65,9 @@ class Memory(Base, IDMixin, TimestampMixin):
         DateTime(timezone=True), nullable=True
     )
     is_deleted: Mapped[bool] = mapped_column(Boolean, default=False)
+    search_vector: Mapped[Optional[str]] = mapped_column(
+        TSVECTOR, Computed(SEARCH_VECTOR_SQL, persisted=True), nullable=True, deferred=True
+    )
 
     user: Mapped["User"] = relationship(back_populates="memories")
     objects: Mapped[List["MemoryObject"]] = relationship(
@@ -54,10 +85,10 @@ class MemoryObject(Base, IDMixin):
     __tablename__ = "memory_objects"
 
     memory_id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True), ForeignKey("memories.id"), nullable=False
+        UUID(as_uuid=True), ForeignKey("memories.id"), nullable=False, index=True
     )
     object_id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True), ForeignKey("registered_objects.id"), nullable=False
+        UUID(as_uuid=True), ForeignKey("registered_objects.id"), nullable=False, index=True
     )
     is_primary: Mapped[bool] = mapped_column(Boolean, default=False)
 
@@ -69,7 +100,7 @@ class MemoryPerson(Base, IDMixin):
     __tablename__ = "memory_people"
 
     memory_id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True), ForeignKey("memories.id"), nullable=False
+        UUID(as_uuid=True), ForeignKey("memories.id"), nullable=False, index=True
     )
     person_name: Mapped[str] = mapped_column(String(255), nullable=False)
     relationship_type: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
@@ -79,6 +110,9 @@ class MemoryPerson(Base, IDMixin):
 
 class MemoryEmotion(Base, IDMixin):
     __tablename__ = "memory_emotions"
+    __table_args__ = (
+        Index("ix_memory_emotions_memory_id_emotion", "memory_id", "emotion"),
+    )
 
     memory_id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), ForeignKey("memories.id"), nullable=False
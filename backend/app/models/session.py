@@ -4,7 +4,17 @@ import uuid
 from datetime import datetime
 from typing import TYPE_CHECKING, Optional
 
-from sqlalchemy import DateTime, Float, ForeignKey, Integer, String, Text, func
+from sqlalchemy import (
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+    UniqueConstraint,
+    func,
+)
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -16,6 +26,9 @@ if TYPE_CHECKING:
 
 class MoodEntry(Base, IDMixin):
     __tablename__ = "mood_entries"
+    __table_args__ = (
+        Index("ix_mood_entries_user_id_recorded_at", "user_id", "recorded_at"),
+    )
 
     user_id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), ForeignKey("users.id"), nullable=False
@@ -38,7 +51,7 @@ class CognitiveExercise(Base, IDMixin):
     __tablename__ = "cognitive_exercises"
 
     user_id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True), ForeignKey("users.id"), nullable=False
+        UUID(as_uuid=True), ForeignKey("users.id"), nullable=False, index=True
     )
     exercise_type: Mapped[str] = mapped_column(String(100), nullable=False)
     prompt_text: Mapped[str] = mapped_column(Text, nullable=False)
@@ -51,12 +64,26 @@ class CognitiveExercise(Base, IDMixin):
 
 class AudioCache(Base, IDMixin):
     __tablename__ = "audio_cache"
+    __table_args__ = (
+        UniqueConstraint("text_hash", "provider", "voice_id"),
+    )
 
     memory_id: Mapped[Optional[uuid.UUID]] = mapped_column(
         UUID(as_uuid=True), ForeignKey("memories.id"), nullable=True
     )
-    text_hash: Mapped[str] = mapped_column(String(64), nullable=False, index=True)
+    text_hash: Mapped[str] = mapped_column(String(64), nullable=False)
     provider: Mapped[str] = mapped_column(String(50), nullable=False)
     voice_id: Mapped[str] = mapped_column(String(100), nullable=False)
     audio_url: Mapped[str] = mapped_column(Text, nullable=False)
     duration_ms: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+
+
+class AIResponseCache(Base, IDMixin):
+    __tablename__ = "ai_response_cache"
+
+    cache_key: Mapped[str] = mapped_column(String(64), nullable=False, unique=True)
+    call_site: Mapped[str] = mapped_column(String(100), nullable=False)
+    value: Mapped[str] = mapped_column(Text, nullable=False)
+    expires_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, index=True
+    )
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import asyncio
+import uuid
+from typing import Annotated, Optional
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config import settings
+from ..database import async_session
+from ..dependencies import get_db, get_optional_user
+from ..models.job import Job
+from ..models.user import User
+from ..schemas.job import JobResponse
+from ..services import job_service
+from ..utils.sse import SSE_HEADERS, format_sse
+
+router = APIRouter()
+
+
+def job_accepted(job: Job) -> JSONResponse:
+    """202 response for a newly enqueued job, pointing at its status URL."""
+    return JSONResponse(
+        status_code=202,
+        content=jsonable_encoder(JobResponse(**job_service.job_to_dict(job))),
+        headers={"Location": f"/api/v1/jobs/{job.id}"},
+    )
+
+
+@router.get("/{job_id}", response_model=JobResponse)
+async def get_job(
+    job_id: uuid.UUID,
+    user: Annotated[Optional[User], Depends(get_optional_user)],
+    db: AsyncSession = Depends(get_db),
+):
+    job = await job_service.get_job(db, job_id, user.id if user else None)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job_service.job_to_dict(job)
+
+
+@router.get("/{job_id}/events")
+async def job_events(
+    job_id: uuid.UUID,
+    user: Annotated[Optional[User], Depends(get_optional_user)],
+    db: AsyncSession = Depends(get_db),
+):
+    """Server-Sent Events: a ``status`` event on every change, ending at completion."""
+    user_id = user.id if user else None
+    if not await job_service.get_job(db, job_id, user_id):
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    async def events():
+        # The request's session is closed before the body streams; poll with our own
+        last_status = None
+        async with async_session() as session:
+            while True:
+                job = await job_service.get_job(session, job_id, user_id)
+                if job is None:
+                    return
+                if job.status != last_status:
+                    last_status = job.status
+                    data = JobResponse(**job_service.job_to_dict(job)).model_dump(mode="json")
+                    yield format_sse(data, event="status")
+                if job.status in job_service.TERMINAL_STATUSES:
+                    return
+                # Don't hold a transaction open between polls
+                await session.rollback()
+                await asyncio.sleep(settings.JOB_EVENTS_POLL_SECONDS)
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
@@ -8,17 +8,21 @@ The frontend expects:
   POST /memory      -> create/update with {object_label, title, memory_text, audio_url?}
 """
 
+import json
 from typing import Optional
 
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from sqlalchemy import select
+from sqlalchemy import select, true
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
+from ..database import async_session
 from ..dependencies import get_db
 from ..models.memory import Memory, MemoryObject
 from ..models.object import RegisteredObject
+from ..services.anchor_cache import MISSING, anchor_cache
 
 router = APIRouter()
 
@@ -44,30 +48,66 @@ async def health_check():
     return {"ok": True}
 
 
-@router.get("/memory", response_model=list[LegacyMemoryAnchor])
-async def list_memories(db: AsyncSession = Depends(get_db)):
-    result = await db.execute(
-        select(Memory)
+def _list_query():
+    # One row per memory: the primary object's label (falling back to any linked
+    # object) is picked by a LATERAL subquery instead of hydrating the ORM graph.
+    label = (
+        select(RegisteredObject.label)
+        .select_from(MemoryObject)
+        .join(RegisteredObject, RegisteredObject.id == MemoryObject.object_id)
+        .where(MemoryObject.memory_id == Memory.id)
+        .order_by(MemoryObject.is_primary.desc(), MemoryObject.id)
+        .limit(1)
+        .lateral("primary_object")
+    )
+    return (
+        select(Memory.title, Memory.narrative_text, Memory.audio_url, label.c.label)
+        .outerjoin(label, true())
         .where(Memory.is_deleted == False)
-        .options(selectinload(Memory.objects).selectinload(MemoryObject.registered_object))
     )
-    memories = result.scalars().all()
-    out = []
-    for mem in memories:
-        label = ""
-        for mo in mem.objects:
-            if mo.is_primary and mo.registered_object:
-                label = mo.registered_object.label
-                break
-        if not label and mem.objects and mem.objects[0].registered_object:
-            label = mem.objects[0].registered_object.label
-        out.append(_to_legacy(mem, label))
-    return out
+
+
+LIST_BATCH_SIZE = 500
+
+
+@router.get("/memory", response_model=list[LegacyMemoryAnchor])
+async def list_memories():
+    async def stream():
+        # The request-scoped session is closed before a streaming body is sent,
+        # so the generator owns its own session for the lifetime of the cursor.
+        async with async_session() as session:
+            result = await session.stream(
+                _list_query().execution_options(yield_per=LIST_BATCH_SIZE)
+            )
+            yield "["
+            first = True
+            async for rows in result.partitions():
+                parts = []
+                for title, narrative_text, audio_url, label in rows:
+                    parts.append(json.dumps({
+                        "object_label": label or "",
+                        "title": title,
+                        "memory_text": narrative_text,
+                        "audio_url": audio_url,
+                    }))
+                if parts:
+                    yield ("" if first else ",") + ",".join(parts)
+                    first = False
+            yield "]"
+
+    return StreamingResponse(stream(), media_type="application/json")
 
 
 @router.get("/memory/{object_label}", response_model=LegacyMemoryAnchor)
 async def get_memory(object_label: str, db: AsyncSession = Depends(get_db)):
     label = object_label.lower().strip()
+    cached = anchor_cache.get(None, label)
+    if cached is not MISSING:
+        if cached is None:
+            raise HTTPException(status_code=404, detail=f"No memory found for '{object_label}'")
+        return cached
+
+    generation = anchor_cache.generation
     result = await db.execute(
         select(Memory)
         .join(MemoryObject, MemoryObject.memory_id == Memory.id)
@@ -78,8 +118,11 @@ async def get_memory(object_label: str, db: AsyncSession = Depends(get_db)):
     )
     memory = result.scalar_one_or_none()
     if memory is None:
+        anchor_cache.set(None, label, None, generation=generation)
         raise HTTPException(status_code=404, detail=f"No memory found for '{object_label}'")
-    return _to_legacy(memory, label)
+    anchor = _to_legacy(memory, label)
+    anchor_cache.set(None, label, anchor, memory_id=memory.id, generation=generation)
+    return anchor
 
 
 @router.post("/memory", response_model=LegacyMemoryAnchor)
@@ -120,6 +163,9 @@ async def create_or_update_memory(
         existing.narrative_text = anchor.memory_text
         existing.audio_url = anchor.audio_url
         await db.commit()
+        # The memory may also be cached under other labels it is linked to
+        anchor_cache.invalidate_memory(existing.id)
+        anchor_cache.invalidate_label(label)
         return _to_legacy(existing, label)
 
     memory = Memory(
@@ -134,4 +180,5 @@ async def create_or_update_memory(
     link = MemoryObject(memory_id=memory.id, object_id=obj.id, is_primary=True)
     db.add(link)
     await db.commit()
+    anchor_cache.invalidate_label(label)
     return _to_legacy(memory, label)
@@ -6,7 +6,7 @@ from typing import Annotated, Optional
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..dependencies import get_current_user, get_db
+from ..dependencies import ai_priority_class, get_current_user, get_db
 from ..models.user import User
 from ..schemas.memory import (
     MemoryCreate,
@@ -16,12 +16,14 @@ from ..schemas.memory import (
     MemoryResponse,
     MemoryUpdate,
 )
-from ..services import memory_service
+from ..services import job_service, memory_service
+from ..utils.sse import sse_response
+from .jobs import job_accepted
 
 router = APIRouter()
 
 
-def _to_response(mem) -> MemoryResponse:
+def _to_response(mem, search_snippet: Optional[str] = None) -> MemoryResponse:
     labels = []
     for mo in getattr(mem, "objects", []):
         if mo.registered_object:
@@ -53,6 +55,7 @@ def _to_response(mem) -> MemoryResponse:
         people=people,
         emotions=emotions,
         object_labels=labels,
+        search_snippet=search_snippet,
     )
 
 
@@ -65,15 +68,22 @@ async def list_memories(
     object_label: Optional[str] = None,
     emotion: Optional[str] = None,
     search: Optional[str] = None,
+    cursor: Optional[str] = None,
+    include_total: bool = True,
 ):
-    memories, total = await memory_service.list_memories(
-        db, user.id, page, page_size, object_label, emotion, search
-    )
+    try:
+        memories, total, next_cursor, snippets = await memory_service.list_memories(
+            db, user.id, page, page_size, object_label, emotion, search,
+            cursor=cursor, include_total=include_total,
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
     return MemoryListResponse(
-        items=[_to_response(m) for m in memories],
+        items=[_to_response(m, snippets.get(m.id)) for m in memories],
         total=total,
         page=page,
         page_size=page_size,
+        next_cursor=next_cursor,
     )
 
 
@@ -110,12 +120,27 @@ async def create_memory(
     return _to_response(mem)
 
 
-@router.post("/generate", response_model=MemoryResponse, status_code=201)
+@router.post(
+    "/generate",
+    response_model=MemoryResponse,
+    status_code=201,
+    dependencies=[Depends(ai_priority_class("batch"))],
+)
 async def generate_memory(
     req: MemoryGenerateRequest,
     user: Annotated[User, Depends(get_current_user)],
     db: AsyncSession = Depends(get_db),
+    async_mode: bool = False,
 ):
+    if async_mode:
+        job = await job_service.enqueue_job(
+            db,
+            "generate_memory",
+            {"user_id": str(user.id), **req.model_dump()},
+            user_id=user.id,
+        )
+        return job_accepted(job)
+
     mem = await memory_service.generate_memory(
         db,
         user_id=user.id,
@@ -128,7 +153,23 @@ async def generate_memory(
     return _to_response(mem)
 
 
-@router.post("/{memory_id}/expand")
+@router.post("/generate/stream", dependencies=[Depends(ai_priority_class("standard"))])
+async def generate_memory_stream(
+    req: MemoryGenerateRequest,
+    user: Annotated[User, Depends(get_current_user)],
+):
+    """``/generate`` over Server-Sent Events: ``token`` events, then ``done``."""
+    return sse_response(memory_service.stream_generate_memory(
+        user_id=user.id,
+        object_label=req.object_label,
+        context_hint=req.context_hint,
+        time_period=req.time_period,
+        location=req.location,
+        people=req.people,
+    ))
+
+
+@router.post("/{memory_id}/expand", dependencies=[Depends(ai_priority_class("interactive"))])
 async def expand_memory(
     memory_id: uuid.UUID,
     req: MemoryExpandRequest,
@@ -142,6 +183,21 @@ async def expand_memory(
     return {"expansion": expansion}
 
 
+@router.post("/{memory_id}/expand/stream", dependencies=[Depends(ai_priority_class("interactive"))])
+async def expand_memory_stream(
+    memory_id: uuid.UUID,
+    req: MemoryExpandRequest,
+    user: Annotated[User, Depends(get_current_user)],
+    db: AsyncSession = Depends(get_db),
+):
+    """``/expand`` over Server-Sent Events: ``token`` events, then ``done``."""
+    try:
+        events = await memory_service.stream_expand_memory(db, memory_id, user.id, req.depth)
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Memory not found")
+    return sse_response(events)
+
+
 @router.patch("/{memory_id}", response_model=MemoryResponse)
 async def update_memory(
     memory_id: uuid.UUID,
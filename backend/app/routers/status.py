@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+from typing import Annotated
+
+from fastapi import APIRouter, Depends
+
+from ..ai.cache import stats as cache_stats
+from ..ai.deadlines import latency
+from ..ai.limiter import limiter_status
+from ..ai.resilience import breaker_status
+from ..ai.singleflight import flights
+from ..dependencies import get_current_user
+from ..models.user import User
+
+router = APIRouter()
+
+
+@router.get("/status")
+async def ai_status(user: Annotated[User, Depends(get_current_user)]):
+    """Provider circuit breakers, admission limiters, latency/hedging, cache and
+    coalescing counters (this process only)."""
+    return {
+        "breakers": breaker_status(),
+        "limiters": limiter_status(),
+        "latency": latency.snapshot(),
+        "cache": cache_stats.snapshot(),
+        "single_flight": flights.snapshot(),
+    }
@@ -5,7 +5,7 @@ from typing import Annotated
 from fastapi import APIRouter, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..dependencies import get_current_user, get_db
+from ..dependencies import ai_priority_class, get_current_user, get_db
 from ..models.user import User
 from ..schemas.toolkit import (
     CognitiveReportResponse,
@@ -18,11 +18,16 @@ from ..schemas.toolkit import (
     MoodResponse,
 )
 from ..services import toolkit_service
+from ..utils.sse import sse_response
 
 router = APIRouter()
 
 
-@router.get("/daily-prompt", response_model=DailyPromptResponse)
+@router.get(
+    "/daily-prompt",
+    response_model=DailyPromptResponse,
+    dependencies=[Depends(ai_priority_class("standard"))],
+)
 async def daily_prompt(
     user: Annotated[User, Depends(get_current_user)],
     db: AsyncSession = Depends(get_db),
@@ -30,6 +35,15 @@ async def daily_prompt(
     return await toolkit_service.get_daily_prompt(db, user.id)
 
 
+@router.get("/daily-prompt/stream", dependencies=[Depends(ai_priority_class("standard"))])
+async def daily_prompt_stream(
+    user: Annotated[User, Depends(get_current_user)],
+    db: AsyncSession = Depends(get_db),
+):
+    """``/daily-prompt`` over Server-Sent Events: ``token`` events, then ``done``."""
+    return sse_response(await toolkit_service.stream_daily_prompt(db, user.id))
+
+
 @router.post("/exercises", response_model=ExerciseResult, status_code=201)
 async def submit_exercise(
     req: ExerciseSubmit,
@@ -61,7 +75,11 @@ async def mood_history(
     return MoodHistoryResponse(entries=entries)
 
 
-@router.get("/reports/cognitive", response_model=CognitiveReportResponse)
+@router.get(
+    "/reports/cognitive",
+    response_model=CognitiveReportResponse,
+    dependencies=[Depends(ai_priority_class("batch"))],
+)
 async def cognitive_report(
     user: Annotated[User, Depends(get_current_user)],
     db: AsyncSession = Depends(get_db),
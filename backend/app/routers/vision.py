@@ -5,7 +5,7 @@ from typing import Annotated
 from fastapi import APIRouter, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..dependencies import get_current_user, get_db
+from ..dependencies import ai_priority_class, get_current_user, get_db
 from ..models.user import User
 from ..schemas.vision import (
     DescribeSceneRequest,
@@ -20,7 +20,11 @@ from ..services import vision_service
 router = APIRouter()
 
 
-@router.post("/analyze", response_model=VisionAnalyzeResponse)
+@router.post(
+    "/analyze",
+    response_model=VisionAnalyzeResponse,
+    dependencies=[Depends(ai_priority_class("interactive"))],
+)
 async def analyze(
     req: VisionAnalyzeRequest,
     user: Annotated[User, Depends(get_current_user)],
@@ -30,7 +34,11 @@ async def analyze(
     return result
 
 
-@router.post("/identify-object", response_model=IdentifyObjectResponse)
+@router.post(
+    "/identify-object",
+    response_model=IdentifyObjectResponse,
+    dependencies=[Depends(ai_priority_class("interactive"))],
+)
 async def identify_object(
     req: IdentifyObjectRequest,
     user: Annotated[User, Depends(get_current_user)],
@@ -38,7 +46,11 @@ async def identify_object(
     return await vision_service.identify_object(req.image, req.bbox)
 
 
-@router.post("/describe-scene", response_model=DescribeSceneResponse)
+@router.post(
+    "/describe-scene",
+    response_model=DescribeSceneResponse,
+    dependencies=[Depends(ai_priority_class("interactive"))],
+)
 async def describe_scene(
     req: DescribeSceneRequest,
     user: Annotated[User, Depends(get_current_user)],
@@ -1,13 +1,14 @@
 from __future__ import annotations
 
+import re
 import uuid
 from typing import Annotated, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..dependencies import get_current_user, get_db
+from ..dependencies import ai_priority_class, get_current_user, get_db
 from ..models.user import User
 from ..schemas.voice import (
     SynthesizeMemoryRequest,
@@ -16,11 +17,12 @@ from ..schemas.voice import (
     VoiceProfilesResponse,
 )
 from ..services import voice_service
+from ..services.audio_store import audio_sizes, iter_audio_range
 
 router = APIRouter()
 
 
-@router.post("/synthesize")
+@router.post("/synthesize", dependencies=[Depends(ai_priority_class("interactive"))])
 async def synthesize(
     req: SynthesizeRequest,
     user: Annotated[User, Depends(get_current_user)],
@@ -32,19 +34,87 @@ async def synthesize(
     return StreamingResponse(stream(), media_type="audio/mpeg")
 
 
-@router.post("/synthesize-memory/{memory_id}")
+def _parse_range(header: str, total: int) -> tuple[int, int] | None:
+    """Parse a single ``bytes=start-end`` range; ``None`` if unsatisfiable."""
+    match = re.fullmatch(r"\s*bytes=(\d*)-(\d*)\s*", header)
+    if not match or not (match.group(1) or match.group(2)):
+        return None
+    if match.group(1):
+        start = int(match.group(1))
+        end = int(match.group(2)) if match.group(2) else total - 1
+    else:
+        # Suffix range: the last N bytes
+        start = max(0, total - int(match.group(2)))
+        end = total - 1
+    end = min(end, total - 1)
+    if start > end:
+        return None
+    return start, end
+
+
+async def _memory_audio_response(request: Request, plan: dict) -> Response:
+    keys = voice_service.cached_audio_keys(plan)
+    sizes = await audio_sizes(keys) if keys else None
+    if sizes is None:
+        # Not (fully) cached yet: stream as it is synthesised, no seeking
+        return StreamingResponse(voice_service.stream_memory_audio(plan), media_type="audio/mpeg")
+
+    total = sum(sizes)
+    headers = {"Accept-Ranges": "bytes"}
+    start, end, status = 0, total - 1, 200
+    range_header = request.headers.get("range")
+    if range_header:
+        byte_range = _parse_range(range_header, total)
+        if byte_range is None:
+            return Response(status_code=416, headers={"Content-Range": f"bytes */{total}"})
+        start, end = byte_range
+        status = 206
+        headers["Content-Range"] = f"bytes {start}-{end}/{total}"
+    headers["Content-Length"] = str(end - start + 1)
+    return StreamingResponse(
+        iter_audio_range(keys, sizes, start, end),
+        status_code=status,
+        media_type="audio/mpeg",
+        headers=headers,
+    )
+
+
+@router.post(
+    "/synthesize-memory/{memory_id}",
+    dependencies=[Depends(ai_priority_class("interactive"))],
+)
 async def synthesize_memory(
     memory_id: uuid.UUID,
+    request: Request,
     user: Annotated[User, Depends(get_current_user)],
     db: AsyncSession = Depends(get_db),
     req: Optional[SynthesizeMemoryRequest] = None,
 ):
     voice_id = req.voice_id if req else None
     try:
-        audio = await voice_service.synthesize_memory(db, memory_id, user.id, voice_id)
+        plan = await voice_service.plan_memory_audio(db, memory_id, user.id, voice_id)
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Memory not found")
+    return await _memory_audio_response(request, plan)
+
+
+@router.get(
+    "/synthesize-memory/{memory_id}",
+    dependencies=[Depends(ai_priority_class("interactive"))],
+)
+async def get_memory_audio(
+    memory_id: uuid.UUID,
+    request: Request,
+    user: Annotated[User, Depends(get_current_user)],
+    db: AsyncSession = Depends(get_db),
+    voice_id: Optional[str] = None,
+):
+    """Same audio as the POST route, addressable by URL so players can seek with Range."""
+    try:
+        plan = await voice_service.plan_memory_audio(db, memory_id, user.id, voice_id)
     except ValueError:
         raise HTTPException(status_code=404, detail="Memory not found")
-    return StreamingResponse(iter([audio]), media_type="audio/mpeg")
+    return await _memory_audio_response(request, plan)
 
 
 @router.get("/profiles", response_model=VoiceProfilesResponse)
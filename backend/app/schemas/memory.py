@@ -69,12 +69,14 @@ class MemoryResponse(BaseModel):
     people: List[MemoryPersonSchema] = []
     emotions: List[MemoryEmotionSchema] = []
     object_labels: List[str] = []
+    search_snippet: Optional[str] = None
 
     model_config = {"from_attributes": True}
 
 
 class MemoryListResponse(BaseModel):
     items: List[MemoryResponse]
-    total: int
+    total: Optional[int] = None
     page: int
     page_size: int
+    next_cursor: Optional[str] = None
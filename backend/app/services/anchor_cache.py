@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+"""In-process label -> anchor cache for the legacy detection lookup.
+
+The camera loop asks for the same handful of labels over and over, so lookups are
+served from a small TTL + LRU map. Writes that can change what a label resolves to
+invalidate the affected entries; the TTL bounds staleness across worker processes.
+"""
+
+import time
+import uuid
+from collections import OrderedDict
+from typing import Optional
+
+from ..config import settings
+
+MISSING = object()
+
+
+class AnchorCache:
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        # (scope, label) -> (expires_at, memory_id, anchor | None)
+        self._entries: OrderedDict = OrderedDict()
+        self._generation = 0
+
+    @property
+    def generation(self) -> int:
+        """Counter bumped by every invalidation.
+
+        Readers capture it before querying the database and pass it back to
+        ``set`` so a result read before a concurrent write is never cached.
+        """
+        return self._generation
+
+    def get(self, scope: Optional[uuid.UUID], label: str):
+        """Return the cached anchor dict, ``None`` for a cached miss, or ``MISSING``."""
+        key = (scope, label)
+        entry = self._entries.get(key)
+        if entry is None:
+            return MISSING
+        expires_at, _, anchor = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return MISSING
+        self._entries.move_to_end(key)
+        return anchor
+
+    def set(
+        self,
+        scope: Optional[uuid.UUID],
+        label: str,
+        anchor: Optional[dict],
+        memory_id: Optional[uuid.UUID] = None,
+        generation: Optional[int] = None,
+    ) -> None:
+        if self.max_entries <= 0 or self.ttl_seconds <= 0:
+            return
+        if generation is not None and generation != self._generation:
+            return
+        key = (scope, label)
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, memory_id, anchor)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate_label(self, label: str) -> None:
+        """Drop every scope's entry for ``label`` (new link, new memory, upload)."""
+        label = label.lower().strip()
+        self._generation += 1
+        for key in [k for k in self._entries if k[1] == label]:
+            del self._entries[key]
+
+    def invalidate_memory(self, memory_id: uuid.UUID) -> None:
+        """Drop entries that resolved to ``memory_id`` (edit, expand, delete)."""
+        self._generation += 1
+        for key in [k for k, v in self._entries.items() if v[1] == memory_id]:
+            del self._entries[key]
+
+    def clear(self) -> None:
+        self._generation += 1
+        self._entries.clear()
+
+
+anchor_cache = AnchorCache(
+    max_entries=settings.ANCHOR_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.ANCHOR_CACHE_TTL_SECONDS,
+)
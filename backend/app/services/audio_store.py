@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+"""Content-addressed store for synthesized audio on local disk."""
+
+import asyncio
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+from typing import AsyncIterator
+
+from ..config import settings
+
+READ_BLOCK_SIZE = 64 * 1024
+
+
+def audio_key(text_hash: str, provider: str, voice_id: str) -> str:
+    """Relative path for one (text, provider, voice) rendering.
+
+    The voice id comes from the client, so it is hashed into the name rather than
+    used as a path component.
+    """
+    digest = hashlib.sha256(f"{provider}\0{voice_id}\0{text_hash}".encode()).hexdigest()
+    return f"{digest[:2]}/{digest}.mp3"
+
+
+def audio_path(key: str) -> Path:
+    return Path(settings.AUDIO_CACHE_DIR) / key
+
+
+def _read(key: str) -> bytes | None:
+    try:
+        return audio_path(key).read_bytes()
+    except FileNotFoundError:
+        return None
+
+
+def _write(key: str, data: bytes) -> None:
+    path = audio_path(key)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Write-then-rename so a concurrent reader never sees a partial file
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+async def read_audio(key: str) -> bytes | None:
+    return await asyncio.to_thread(_read, key)
+
+
+async def write_audio(key: str, data: bytes) -> None:
+    await asyncio.to_thread(_write, key, data)
+
+
+async def audio_sizes(keys: list[str]) -> list[int] | None:
+    """Byte size of each stored file, or ``None`` if any of them is missing."""
+
+    def sizes() -> list[int] | None:
+        try:
+            return [audio_path(key).stat().st_size for key in keys]
+        except FileNotFoundError:
+            return None
+
+    return await asyncio.to_thread(sizes)
+
+
+def _read_block(key: str, offset: int, length: int) -> bytes:
+    with open(audio_path(key), "rb") as f:
+        f.seek(offset)
+        return f.read(length)
+
+
+async def iter_audio_range(
+    keys: list[str], sizes: list[int], start: int, end: int
+) -> AsyncIterator[bytes]:
+    """Yield bytes ``start..end`` (inclusive) of the concatenation of ``keys``."""
+    offset = 0
+    for key, size in zip(keys, sizes):
+        file_start, file_end = offset, offset + size - 1
+        offset += size
+        if file_end < start or file_start > end:
+            continue
+        pos = max(start, file_start) - file_start
+        stop = min(end, file_end) - file_start + 1
+        while pos < stop:
+            block = await asyncio.to_thread(
+                _read_block, key, pos, min(READ_BLOCK_SIZE, stop - pos)
+            )
+            if not block:
+                return
+            pos += len(block)
+            yield block
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+"""Document text extraction off the event loop, one worker process per document."""
+
+import asyncio
+import multiprocessing
+from functools import partial
+from typing import Optional
+
+from ..config import settings
+from ..utils.documents import extract_docx_text, extract_pdf_text
+
+# forkserver children start from a clean server process rather than forking the
+# API process (threads, open connections) for every document
+_context = multiprocessing.get_context(
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+if _context.get_start_method() == "forkserver":
+    # Parsers are imported once by the server instead of by every child
+    _context.set_forkserver_preload(["app.utils.documents", "pypdf", "docx"])
+
+_slots: Optional[asyncio.Semaphore] = None
+_running: set = set()
+
+
+def _get_slots() -> asyncio.Semaphore:
+    global _slots
+    if _slots is None:
+        _slots = asyncio.Semaphore(settings.EXTRACTION_WORKERS)
+    return _slots
+
+
+def shutdown_extraction_pool() -> None:
+    """Kill extractions still running (on shutdown)."""
+    for process in list(_running):
+        process.kill()
+
+
+def _child(conn, fn) -> None:
+    try:
+        result = (True, fn())
+    except Exception as e:
+        result = (False, e)
+    try:
+        conn.send(result)
+    except Exception:
+        # The exception itself may not pickle; its message is enough
+        conn.send((False, RuntimeError(str(result[1]))))
+    finally:
+        conn.close()
+
+
+def _receive(conn):
+    try:
+        return conn.recv()
+    except EOFError:
+        # The process exited without answering: killed, or it crashed (e.g. out
+        # of memory on a hostile file)
+        return False, RuntimeError("extraction process died")
+
+
+async def _run(fn) -> str:
+    async with _get_slots():
+        receiver, sender = _context.Pipe(duplex=False)
+        process = _context.Process(target=_child, args=(sender, fn), daemon=True)
+        process.start()
+        # Only the child holds the write end now, so its exit unblocks ``recv``
+        sender.close()
+        _running.add(process)
+        receive = asyncio.ensure_future(asyncio.to_thread(_receive, receiver))
+        try:
+            ok, value = await asyncio.wait_for(
+                asyncio.shield(receive), timeout=settings.EXTRACTION_TIMEOUT_SECONDS
+            )
+        finally:
+            # On timeout or cancellation the parser would keep going after we
+            # stop waiting; kill this document's process (and only this one)
+            if process.is_alive():
+                process.kill()
+            await asyncio.to_thread(process.join)
+            await receive
+            _running.discard(process)
+            receiver.close()
+    if not ok:
+        raise value
+    return value
+
+
+async def extract_pdf(path: str, max_chars: int) -> str:
+    """Extract text from a PDF, stopping at ``max_chars`` or ``EXTRACTION_MAX_PAGES``."""
+    return await _run(partial(extract_pdf_text, path, settings.EXTRACTION_MAX_PAGES, max_chars))
+
+
+async def extract_docx(path: str, max_chars: int) -> str:
+    """Extract text from a DOCX, stopping at ``max_chars``."""
+    return await _run(partial(extract_docx_text, path, max_chars))
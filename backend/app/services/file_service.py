@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+"""Content-addressed bookkeeping for uploaded files.
+
+Each distinct upload (by SHA-256) is stored once, and the text or vision output
+derived from it is kept alongside so re-uploads skip both storage and the AI call.
+"""
+
+from typing import Iterable, Optional
+
+from sqlalchemy import func, literal, select
+from sqlalchemy.dialects.postgresql import JSONB, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models.file import StoredFile
+
+
+async def get_stored_files(db: AsyncSession, hashes: Iterable[str]) -> dict[str, StoredFile]:
+    """Return the already-stored files among ``hashes``, keyed by hash."""
+    hashes = set(hashes)
+    if not hashes:
+        return {}
+    result = await db.execute(select(StoredFile).where(StoredFile.sha256.in_(hashes)))
+    return {f.sha256: f for f in result.scalars().all()}
+
+
+def cached_vision_result(stored: Optional[StoredFile], label: str) -> Optional[dict]:
+    if stored is None or not stored.vision_results:
+        return None
+    return stored.vision_results.get(label)
+
+
+async def record_stored_file(
+    db: AsyncSession,
+    sha256: str,
+    size: int,
+    content_type: str,
+    storage_url: str,
+    extracted_text: Optional[str] = None,
+    vision_result: Optional[dict] = None,
+    label: Optional[str] = None,
+) -> None:
+    """Insert or update the row for ``sha256``; the caller commits.
+
+    An existing row keeps its storage URL; new derived results are merged in.
+    """
+    vision_results = {label: vision_result} if vision_result is not None and label else None
+    stmt = insert(StoredFile).values(
+        sha256=sha256,
+        size=size,
+        content_type=content_type,
+        storage_url=storage_url,
+        extracted_text=extracted_text,
+        vision_results=vision_results,
+    )
+    empty = literal({}, JSONB)
+    await db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=["sha256"],
+            set_={
+                "extracted_text": func.coalesce(
+                    stmt.excluded.extracted_text, StoredFile.extracted_text
+                ),
+                "vision_results": func.coalesce(StoredFile.vision_results, empty).op("||")(
+                    func.coalesce(stmt.excluded.vision_results, empty)
+                ),
+                "updated_at": func.now(),
+            },
+        )
+    )
@@ -0,0 +1,284 @@
+from __future__ import annotations
+
+"""Background jobs — a Postgres-backed queue for slow AI work.
+
+Jobs are rows in ``jobs``. Any number of workers (the in-process one started by
+the app, or ``python -m app.worker`` processes) claim them with
+``SELECT ... FOR UPDATE SKIP LOCKED``, so each job runs once. Running jobs
+refresh ``heartbeat_at`` every ``JOB_HEARTBEAT_SECONDS``; a job whose worker died
+(no heartbeat for ``JOB_STALE_SECONDS``) is picked up again, up to
+``JOB_MAX_ATTEMPTS``; the memory-creating handlers key their memory on the job
+id, so a retry after the memory was committed doesn't create it twice.
+"""
+
+import asyncio
+import logging
+import os
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Optional
+
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..ai.context import ai_priority
+from ..config import settings
+from ..database import async_session
+from ..models.job import Job
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATUSES = {"succeeded", "failed"}
+
+JobHandler = Callable[[uuid.UUID, dict], Awaitable[dict]]
+
+_handlers: dict[str, JobHandler] = {}
+
+# Set when this process enqueues a job, so a local worker starts it right away
+# instead of waiting for its next poll.
+_wakeup = asyncio.Event()
+
+
+def job_handler(kind: str):
+    """Register ``fn(job_id, payload) -> result`` as the handler for jobs of ``kind``.
+
+    A job whose worker died is run again, so handlers must be idempotent; the
+    job id is the same on every attempt, which makes it a natural key for that.
+    """
+
+    def register(fn: JobHandler) -> JobHandler:
+        _handlers[kind] = fn
+        return fn
+
+    return register
+
+
+async def enqueue_job(
+    db: AsyncSession, kind: str, payload: dict, user_id: Optional[uuid.UUID] = None
+) -> Job:
+    if kind not in _handlers:
+        raise ValueError(f"Unknown job kind: {kind}")
+    job = Job(kind=kind, status="queued", user_id=user_id, payload=payload, attempts=0)
+    db.add(job)
+    await db.commit()
+    _wakeup.set()
+    return job
+
+
+async def get_job(
+    db: AsyncSession, job_id: uuid.UUID, user_id: Optional[uuid.UUID] = None
+) -> Job | None:
+    """Fetch a job visible to ``user_id``: its own jobs, or any job without an owner."""
+    job = await db.get(Job, job_id, populate_existing=True)
+    if job is None or (job.user_id is not None and job.user_id != user_id):
+        return None
+    return job
+
+
+def job_to_dict(job: Job) -> dict:
+    return {
+        "id": job.id,
+        "kind": job.kind,
+        "status": job.status,
+        "result": job.result,
+        "error": job.error,
+        "attempts": job.attempts,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+    }
+
+
+async def claim_job() -> Job | None:
+    """Atomically take the oldest runnable job, or return ``None``."""
+    now = datetime.now(timezone.utc)
+    stale_before = now - timedelta(seconds=settings.JOB_STALE_SECONDS)
+    stale = and_(Job.status == "running", Job.heartbeat_at < stale_before)
+    async with async_session() as session:
+        # Give up on jobs whose workers keep dying
+        await session.execute(
+            update(Job)
+            .where(stale, Job.attempts >= settings.JOB_MAX_ATTEMPTS)
+            .values(status="failed", error="Worker stopped responding", finished_at=now)
+        )
+        job = (
+            await session.execute(
+                select(Job)
+                .where(or_(Job.status == "queued", stale))
+                .order_by(Job.created_at)
+                .limit(1)
+                .with_for_update(skip_locked=True)
+            )
+        ).scalar_one_or_none()
+        if job is not None:
+            job.status = "running"
+            job.attempts += 1
+            job.started_at = now
+            job.heartbeat_at = now
+        await session.commit()
+        return job
+
+
+async def _finish_job(job_id: uuid.UUID, **values: Any) -> None:
+    async with async_session() as session:
+        await session.execute(
+            update(Job)
+            .where(Job.id == job_id)
+            .values(finished_at=datetime.now(timezone.utc), **values)
+        )
+        await session.commit()
+
+
+async def _heartbeat(job_id: uuid.UUID) -> None:
+    """Keep a running job's claim fresh so other workers don't take it for stale."""
+    while True:
+        await asyncio.sleep(settings.JOB_HEARTBEAT_SECONDS)
+        try:
+            async with async_session() as session:
+                await session.execute(
+                    update(Job)
+                    .where(Job.id == job_id, Job.status == "running")
+                    .values(heartbeat_at=datetime.now(timezone.utc))
+                )
+                await session.commit()
+        except Exception:
+            logger.warning("Could not refresh heartbeat of job %s", job_id, exc_info=True)
+
+
+async def _acquire_unless_stopped(limit: asyncio.Semaphore, stop: asyncio.Event) -> bool:
+    """Wait for a free slot; ``False`` (holding nothing) if ``stop`` is set first."""
+    acquire = asyncio.ensure_future(limit.acquire())
+    wait_stop = asyncio.ensure_future(stop.wait())
+    await asyncio.wait({acquire, wait_stop}, return_when=asyncio.FIRST_COMPLETED)
+    wait_stop.cancel()
+    if not acquire.done():
+        acquire.cancel()
+        return False
+    if stop.is_set():
+        limit.release()
+        return False
+    return True
+
+
+async def run_job(job: Job) -> None:
+    handler = _handlers.get(job.kind)
+    try:
+        if handler is None:
+            raise ValueError(f"Unknown job kind: {job.kind}")
+        # Nobody is waiting on a background job's provider calls
+        with ai_priority("batch"):
+            result = await handler(job.id, job.payload)
+    except Exception as e:
+        logger.exception("Job %s (%s) failed", job.id, job.kind)
+        await _finish_job(job.id, status="failed", error=str(e) or e.__class__.__name__)
+    else:
+        await _finish_job(job.id, status="succeeded", result=result)
+
+
+async def run_worker(stop: asyncio.Event, concurrency: int | None = None) -> None:
+    """Claim and run jobs until ``stop`` is set, at most ``concurrency`` at once."""
+    limit = asyncio.Semaphore(max(1, concurrency or settings.JOB_WORKER_CONCURRENCY))
+    running: set[asyncio.Task] = set()
+
+    async def run(job: Job) -> None:
+        heartbeat = asyncio.create_task(_heartbeat(job.id))
+        try:
+            await run_job(job)
+        finally:
+            heartbeat.cancel()
+            limit.release()
+
+    try:
+        while not stop.is_set():
+            if not await _acquire_unless_stopped(limit, stop):
+                break
+            try:
+                job = await claim_job()
+            except Exception:
+                logger.exception("Could not claim a job")
+                job = None
+            if job is None:
+                limit.release()
+                _wakeup.clear()
+                wait_stop = asyncio.ensure_future(stop.wait())
+                wait_wakeup = asyncio.ensure_future(_wakeup.wait())
+                await asyncio.wait(
+                    {wait_stop, wait_wakeup},
+                    timeout=settings.JOB_POLL_INTERVAL_SECONDS,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                wait_stop.cancel()
+                wait_wakeup.cancel()
+                continue
+            task = asyncio.create_task(run(job))
+            running.add(task)
+            task.add_done_callback(running.discard)
+    finally:
+        # Give in-flight jobs a grace period; anything cut short is retried once stale
+        if running:
+            _, pending = await asyncio.wait(
+                running, timeout=settings.JOB_SHUTDOWN_GRACE_SECONDS
+            )
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*running, return_exceptions=True)
+
+
+# ── Handlers ─────────────────────────────────────────────────────────────
+
+
+def _remove_files(spooled: list) -> None:
+    for path, _, _, _ in spooled:
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+
+
+def _memory_id(job_id: uuid.UUID) -> uuid.UUID:
+    # Same on every attempt, so a retry finds the memory an earlier one committed
+    return uuid.uuid5(job_id, "memory")
+
+
+@job_handler("upload_memory")
+async def _upload_memory_job(job_id: uuid.UUID, payload: dict) -> dict:
+    from .upload_service import create_memory_from_files
+
+    spooled = [tuple(entry) for entry in payload["files"]]
+    try:
+        async with async_session() as session:
+            result = await create_memory_from_files(
+                session,
+                uuid.UUID(payload["user_id"]),
+                payload["object_label"],
+                payload.get("title"),
+                spooled,
+                {},
+                memory_id=_memory_id(job_id),
+            )
+    except asyncio.CancelledError:
+        # Worker shutting down: keep the files for the retry
+        raise
+    except Exception:
+        _remove_files(spooled)
+        raise
+    _remove_files(spooled)
+    return result
+
+
+@job_handler("generate_memory")
+async def _generate_memory_job(job_id: uuid.UUID, payload: dict) -> dict:
+    from .memory_service import generate_memory
+
+    async with async_session() as session:
+        memory = await generate_memory(
+            session,
+            user_id=uuid.UUID(payload["user_id"]),
+            object_label=payload["object_label"],
+            context_hint=payload.get("context_hint"),
+            time_period=payload.get("time_period"),
+            location=payload.get("location"),
+            people=payload.get("people"),
+            memory_id=_memory_id(job_id),
+        )
+        return {"memory_id": str(memory.id), "title": memory.title}
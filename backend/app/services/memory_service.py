@@ -2,15 +2,19 @@ from __future__ import annotations
 
 """Memory business logic — CRUD + AI generation + expansion."""
 
+import base64
 import json
+import re
 import uuid
 from datetime import datetime, timezone
+from typing import AsyncIterator
 
-from sqlalchemy import func, select
+from sqlalchemy import func, select, tuple_, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from ..ai import get_llm_provider
+from ..ai.context import ai_call_site
 from ..ai.prompts import (
     MEMORY_EXPAND_DEEPER,
     MEMORY_EXPAND_PEOPLE,
@@ -19,8 +23,11 @@ from ..ai.prompts import (
     MEMORY_GENERATION_PROMPT,
     MEMORY_GENERATION_SYSTEM,
 )
+from ..database import async_session
 from ..models.memory import Memory, MemoryEmotion, MemoryObject, MemoryPerson
 from ..models.object import RegisteredObject
+from ..utils.json_stream import JSONStringFieldStream
+from .anchor_cache import anchor_cache
 
 
 def _memory_load_options():
@@ -31,6 +38,40 @@ def _memory_load_options():
     ]
 
 
+SEARCH_HEADLINE_OPTIONS = "StartSel=<mark>, StopSel=</mark>, MaxFragments=2, MaxWords=25, MinWords=8"
+
+
+def encode_cursor(memory: Memory, rank: float | None = None) -> str:
+    """Opaque keyset token for the position just after ``memory``."""
+    data = {"c": memory.created_at.isoformat(), "i": str(memory.id)}
+    if rank is not None:
+        data["r"] = rank
+    raw = json.dumps(data)
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, uuid.UUID, float | None]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        rank = data.get("r")
+        return (
+            datetime.fromisoformat(data["c"]),
+            uuid.UUID(data["i"]),
+            float(rank) if rank is not None else None,
+        )
+    except (ValueError, KeyError, TypeError, AttributeError):
+        raise ValueError("Invalid cursor")
+
+
+def build_search_query(search: str) -> str | None:
+    """Turn free text into a prefix-matching tsquery: ``grand pa`` -> ``grand:* & pa:*``."""
+    terms = re.findall(r"\w+", search.lower())
+    if not terms:
+        return None
+    return " & ".join(f"{term}:*" for term in terms)
+
+
 async def list_memories(
     db: AsyncSession,
     user_id: uuid.UUID,
@@ -39,7 +80,20 @@ async def list_memories(
     object_label: str | None = None,
     emotion: str | None = None,
     search: str | None = None,
+    cursor: str | None = None,
+    include_total: bool = True,
 ):
+    """List a user's memories, newest first (best match first when searching).
+
+    Pages are addressed either by ``page`` (OFFSET) or, when ``cursor`` is given,
+    by keyset on ``(created_at, id)`` — prefixed with the search rank when
+    searching. An empty ``cursor`` starts keyset paging from the top.
+
+    Returns ``(memories, total, next_cursor, snippets)``; ``total`` is ``None``
+    when ``include_total`` is false, ``next_cursor`` is ``None`` on the last page
+    and ``snippets`` maps memory id to a highlighted narrative excerpt when
+    searching.
+    """
     query = (
         select(Memory)
         .where(Memory.user_id == user_id, Memory.is_deleted == False)
@@ -52,21 +106,63 @@ async def list_memories(
         )
     if emotion:
         query = query.join(MemoryEmotion).where(MemoryEmotion.emotion == emotion)
+
+    ts_query = None
     if search:
-        query = query.where(
-            Memory.title.ilike(f"%{search}%") | Memory.narrative_text.ilike(f"%{search}%")
-        )
+        tsquery_text = build_search_query(search)
+        if tsquery_text is None:
+            # Nothing searchable (e.g. only punctuation) matches nothing, rather
+            # than silently listing everything
+            return [], 0 if include_total else None, None, {}
+        ts_query = func.to_tsquery("english", tsquery_text)
+        query = query.where(Memory.search_vector.op("@@")(ts_query))
 
     # Count
-    count_query = select(func.count()).select_from(query.subquery())
-    total = (await db.execute(count_query)).scalar() or 0
-
-    # Paginate
-    query = query.offset((page - 1) * page_size).limit(page_size).order_by(Memory.created_at.desc())
+    total = None
+    if include_total:
+        count_query = select(func.count()).select_from(query.subquery())
+        total = (await db.execute(count_query)).scalar() or 0
+
+    # Order: rank first when searching, then newest, with id as a tie-breaker
+    keys = [Memory.created_at, Memory.id]
+    if ts_query is not None:
+        rank = func.ts_rank_cd(Memory.search_vector, ts_query)
+        headline = func.ts_headline(
+            "english", Memory.narrative_text, ts_query, SEARCH_HEADLINE_OPTIONS
+        )
+        query = query.add_columns(rank, headline)
+        keys.insert(0, rank)
+
+    # Paginate — one extra row tells us whether a next page exists
+    if cursor:
+        created_at, last_id, last_rank = decode_cursor(cursor)
+        values = [created_at, last_id]
+        if ts_query is not None:
+            if last_rank is None:
+                raise ValueError("Invalid cursor")
+            values.insert(0, last_rank)
+        query = query.where(tuple_(*keys) < tuple_(*values))
+    elif cursor is None:
+        query = query.offset((page - 1) * page_size)
+    query = query.limit(page_size + 1).order_by(*(key.desc() for key in keys))
     result = await db.execute(query)
-    memories = result.scalars().all()
 
-    return memories, total
+    snippets = {}
+    if ts_query is not None:
+        rows = result.all()
+        memories = [row[0] for row in rows]
+        ranks = [row[1] for row in rows]
+        snippets = {row[0].id: row[2] for row in rows}
+    else:
+        memories = list(result.scalars().all())
+        ranks = [None] * len(memories)
+
+    next_cursor = None
+    if len(memories) > page_size:
+        memories = memories[:page_size]
+        next_cursor = encode_cursor(memories[-1], ranks[page_size - 1])
+
+    return memories, total, next_cursor, snippets
 
 
 async def get_memory(db: AsyncSession, memory_id: uuid.UUID, user_id: uuid.UUID) -> Memory | None:
@@ -117,6 +213,8 @@ async def create_memory(
         await _link_object(db, memory.id, user_id, object_label)
 
     await db.commit()
+    if object_label:
+        anchor_cache.invalidate_label(object_label)
     await db.refresh(memory)
     return memory
 
@@ -136,6 +234,7 @@ async def update_memory(
         if value is not None and hasattr(memory, key):
             setattr(memory, key, value)
     await db.commit()
+    anchor_cache.invalidate_memory(memory_id)
     await db.refresh(memory)
     return memory
 
@@ -151,21 +250,18 @@ async def delete_memory(db: AsyncSession, memory_id: uuid.UUID, user_id: uuid.UU
         return False
     memory.is_deleted = True
     await db.commit()
+    anchor_cache.invalidate_memory(memory_id)
     return True
 
 
-async def generate_memory(
-    db: AsyncSession,
-    user_id: uuid.UUID,
+def _generation_prompt(
     object_label: str,
-    context_hint: str | None = None,
-    time_period: str | None = None,
-    location: str | None = None,
-    people: list[str] | None = None,
-) -> Memory:
-    llm = get_llm_provider()
-
-    prompt = MEMORY_GENERATION_PROMPT.format(
+    context_hint: str | None,
+    time_period: str | None,
+    location: str | None,
+    people: list[str] | None,
+) -> str:
+    return MEMORY_GENERATION_PROMPT.format(
         object_label=object_label,
         context=f"Context: {context_hint}" if context_hint else "",
         time_period=f"Time period: {time_period}" if time_period else "",
@@ -173,22 +269,38 @@ async def generate_memory(
         people=f"People: {', '.join(people)}" if people else "",
     )
 
-    raw = await llm.generate_text(prompt, system=MEMORY_GENERATION_SYSTEM)
 
-    # Parse JSON response
+def _parse_generation(raw: str, object_label: str) -> dict:
     try:
-        data = json.loads(raw)
+        return json.loads(raw)
     except json.JSONDecodeError:
         # Try to extract JSON from markdown code block
         if "```" in raw:
             json_str = raw.split("```")[1]
             if json_str.startswith("json"):
                 json_str = json_str[4:]
-            data = json.loads(json_str.strip())
-        else:
-            data = {"title": f"Memory of {object_label}", "narrative": raw}
+            try:
+                return json.loads(json_str.strip())
+            except json.JSONDecodeError:
+                pass
+        return {"title": f"Memory of {object_label}", "narrative": raw}
+
+
+async def _save_generated_memory(
+    db: AsyncSession,
+    user_id: uuid.UUID,
+    object_label: str,
+    raw: str,
+    model_name: str,
+    context_hint: str | None = None,
+    time_period: str | None = None,
+    location: str | None = None,
+    memory_id: uuid.UUID | None = None,
+) -> Memory:
+    data = _parse_generation(raw, object_label)
 
     memory = Memory(
+        id=memory_id or uuid.uuid4(),
         user_id=user_id,
         title=data.get("title", f"Memory of {object_label}"),
         narrative_text=data.get("narrative", raw),
@@ -197,7 +309,7 @@ async def generate_memory(
         time_period=time_period,
         location=location,
         is_ai_generated=True,
-        ai_model_used=llm.__class__.__name__,
+        ai_model_used=model_name,
     )
     db.add(memory)
     await db.flush()
@@ -222,12 +334,79 @@ async def generate_memory(
         ))
 
     await db.commit()
+    anchor_cache.invalidate_label(object_label)
     await db.refresh(memory)
     return memory
 
 
-async def expand_memory(
-    db: AsyncSession, memory_id: uuid.UUID, user_id: uuid.UUID, depth: str = "deeper"
+async def generate_memory(
+    db: AsyncSession,
+    user_id: uuid.UUID,
+    object_label: str,
+    context_hint: str | None = None,
+    time_period: str | None = None,
+    location: str | None = None,
+    people: list[str] | None = None,
+    memory_id: uuid.UUID | None = None,
+) -> Memory:
+    """Generate and save a memory.
+
+    With ``memory_id`` the call is idempotent: the memory is created under that
+    id, and if it already exists it is returned without generating again.
+    """
+    if memory_id is not None:
+        existing = await db.get(Memory, memory_id)
+        if existing is not None:
+            return existing
+    llm = get_llm_provider()
+    prompt = _generation_prompt(object_label, context_hint, time_period, location, people)
+    with ai_call_site("generate_memory"):
+        raw = await llm.generate_text(prompt, system=MEMORY_GENERATION_SYSTEM)
+    return await _save_generated_memory(
+        db, user_id, object_label, raw, llm.name,
+        context_hint=context_hint, time_period=time_period, location=location,
+        memory_id=memory_id,
+    )
+
+
+async def stream_generate_memory(
+    user_id: uuid.UUID,
+    object_label: str,
+    context_hint: str | None = None,
+    time_period: str | None = None,
+    location: str | None = None,
+    people: list[str] | None = None,
+) -> AsyncIterator[tuple[str, dict]]:
+    """Streaming ``generate_memory``: yields ``(event, data)`` pairs.
+
+    ``token`` events carry narrative text as the model writes it (decoded out of
+    the JSON response); once the completion ends the memory is saved in its own
+    session and a final ``done`` event carries its id and title. Nothing is saved
+    if the stream is abandoned part way.
+    """
+    llm = get_llm_provider()
+    prompt = _generation_prompt(object_label, context_hint, time_period, location, people)
+    narrative = JSONStringFieldStream("narrative")
+    with ai_call_site("generate_memory"):
+        async for token in llm.generate_text_stream(prompt, system=MEMORY_GENERATION_SYSTEM):
+            text = narrative.feed(token)
+            if text:
+                yield "token", {"text": text}
+
+    async with async_session() as session:
+        memory = await _save_generated_memory(
+            session, user_id, object_label, narrative.text, llm.name,
+            context_hint=context_hint, time_period=time_period, location=location,
+        )
+    yield "done", {
+        "memory_id": str(memory.id),
+        "title": memory.title,
+        "narrative_text": memory.narrative_text,
+    }
+
+
+async def _expansion_prompt(
+    db: AsyncSession, memory_id: uuid.UUID, user_id: uuid.UUID, depth: str
 ) -> str:
     result = await db.execute(
         select(Memory).where(
@@ -238,23 +417,65 @@ async def expand_memory(
     if not memory:
         raise ValueError("Memory not found")
 
-    llm = get_llm_provider()
-
     templates = {
         "deeper": MEMORY_EXPAND_DEEPER,
         "sensory": MEMORY_EXPAND_SENSORY,
         "people": MEMORY_EXPAND_PEOPLE,
     }
-    prompt = templates.get(depth, MEMORY_EXPAND_DEEPER).format(narrative=memory.narrative_text)
-    expansion = await llm.generate_text(prompt, system=MEMORY_EXPAND_SYSTEM)
+    return templates.get(depth, MEMORY_EXPAND_DEEPER).format(narrative=memory.narrative_text)
 
-    # Append expansion to the narrative
-    memory.narrative_text = f"{memory.narrative_text}\n\n{expansion}"
+
+async def _append_expansion(db: AsyncSession, memory_id: uuid.UUID, expansion: str) -> None:
+    # Append in SQL so a concurrent edit of the narrative isn't overwritten
+    await db.execute(
+        update(Memory)
+        .where(Memory.id == memory_id)
+        .values(narrative_text=Memory.narrative_text + "\n\n" + expansion)
+    )
     await db.commit()
+    anchor_cache.invalidate_memory(memory_id)
+
+
+async def expand_memory(
+    db: AsyncSession, memory_id: uuid.UUID, user_id: uuid.UUID, depth: str = "deeper"
+) -> str:
+    prompt = await _expansion_prompt(db, memory_id, user_id, depth)
+    llm = get_llm_provider()
+    with ai_call_site("expand_memory"):
+        expansion = await llm.generate_text(prompt, system=MEMORY_EXPAND_SYSTEM)
+
+    # Append expansion to the narrative
+    await _append_expansion(db, memory_id, expansion)
 
     return expansion
 
 
+async def stream_expand_memory(
+    db: AsyncSession, memory_id: uuid.UUID, user_id: uuid.UUID, depth: str = "deeper"
+) -> AsyncIterator[tuple[str, dict]]:
+    """Streaming ``expand_memory``.
+
+    Checks the memory up front (raising ``ValueError`` if it isn't the user's), then
+    returns an iterator of ``token`` events followed by ``done`` once the expansion
+    has been appended to the narrative.
+    """
+    prompt = await _expansion_prompt(db, memory_id, user_id, depth)
+
+    async def events() -> AsyncIterator[tuple[str, dict]]:
+        llm = get_llm_provider()
+        parts = []
+        with ai_call_site("expand_memory"):
+            async for token in llm.generate_text_stream(prompt, system=MEMORY_EXPAND_SYSTEM):
+                parts.append(token)
+                yield "token", {"text": token}
+        expansion = "".join(parts)
+        async with async_session() as session:
+            await _append_expansion(session, memory_id, expansion)
+        yield "done", {"expansion": expansion}
+
+    return events()
+
+
 async def _link_object(
     db: AsyncSession, memory_id: uuid.UUID, user_id: uuid.UUID, label: str
 ):
@@ -1,28 +1,152 @@
 from __future__ import annotations
 
-"""Supabase Storage service for file uploads."""
+"""File storage service with pluggable backends (Supabase Storage or local disk)."""
 
+import asyncio
+import shutil
 import uuid
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 from typing import Optional
 
-from supabase import create_client, Client
-
 from ..config import settings
 
 
-_client: Optional[Client] = None
+class StorageBackend(ABC):
+    @abstractmethod
+    async def upload(self, file_data: bytes | str, path: str, content_type: str) -> str:
+        """Store ``file_data`` (bytes or a local file path) at ``path``; return its public URL."""
+        ...
+
+    @abstractmethod
+    async def delete(self, file_path: str) -> bool:
+        """Delete by storage path or public URL. Returns False if it could not be removed."""
+        ...
+
+    async def aclose(self) -> None:
+        return None
+
+
+class SupabaseStorageBackend(StorageBackend):
+    """Supabase Storage via the synchronous supabase client.
+
+    The client blocks for the whole transfer, so every call runs on a small
+    dedicated thread pool instead of the event loop.
+    """
 
+    def __init__(self, url: str, service_key: str, bucket: str, max_workers: int = 4):
+        from supabase import create_client
 
-def get_storage_client() -> Client:
-    """Get or create Supabase client singleton."""
-    global _client
-    if _client is None:
-        if not settings.SUPABASE_URL or not settings.SUPABASE_SERVICE_KEY:
+        if not url or not service_key:
             raise ValueError(
                 "SUPABASE_URL and SUPABASE_SERVICE_KEY must be set in environment"
             )
-        _client = create_client(settings.SUPABASE_URL, settings.SUPABASE_SERVICE_KEY)
-    return _client
+        self.client = create_client(url, service_key)
+        self.bucket = bucket
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="storage"
+        )
+
+    async def _run(self, fn, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, fn, *args)
+
+    def _upload_sync(self, file_data: bytes | str, path: str, content_type: str) -> str:
+        bucket = self.client.storage.from_(self.bucket)
+        bucket.upload(
+            path=path,
+            file=file_data,
+            # Content-addressed paths may be written twice by concurrent uploads
+            file_options={"content-type": content_type, "upsert": "true"},
+        )
+        return bucket.get_public_url(path)
+
+    async def upload(self, file_data: bytes | str, path: str, content_type: str) -> str:
+        return await self._run(self._upload_sync, file_data, path, content_type)
+
+    async def delete(self, file_path: str) -> bool:
+        try:
+            # Extract path from full URL if needed
+            if file_path.startswith("http"):
+                # URL format: https://.../storage/v1/object/public/bucket/path
+                parts = file_path.split(f"/storage/v1/object/public/{self.bucket}/")
+                if len(parts) > 1:
+                    file_path = parts[1]
+            await self._run(self.client.storage.from_(self.bucket).remove, [file_path])
+            return True
+        except Exception:
+            return False
+
+    async def aclose(self) -> None:
+        self._executor.shutdown(wait=False)
+
+
+class LocalStorageBackend(StorageBackend):
+    """Files on local disk, served by the app under ``url_prefix``.
+
+    Used for tests and on-prem deployments without Supabase.
+    """
+
+    def __init__(self, root: str, url_prefix: str):
+        self.root = Path(root).resolve()
+        self.url_prefix = url_prefix.rstrip("/")
+
+    def _resolve(self, path: str) -> Path:
+        target = (self.root / path).resolve()
+        if not target.is_relative_to(self.root):
+            raise ValueError(f"Storage path escapes storage root: {path}")
+        return target
+
+    def _upload_sync(self, file_data: bytes | str, path: str) -> None:
+        target = self._resolve(path)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        if isinstance(file_data, bytes):
+            target.write_bytes(file_data)
+        else:
+            shutil.copyfile(file_data, target)
+
+    async def upload(self, file_data: bytes | str, path: str, content_type: str) -> str:
+        await asyncio.to_thread(self._upload_sync, file_data, path)
+        return f"{self.url_prefix}/{path}"
+
+    async def delete(self, file_path: str) -> bool:
+        if file_path.startswith(self.url_prefix + "/"):
+            file_path = file_path[len(self.url_prefix) + 1:]
+        try:
+            await asyncio.to_thread(self._resolve(file_path).unlink)
+            return True
+        except (OSError, ValueError):
+            return False
+
+
+_backend: Optional[StorageBackend] = None
+
+
+def get_storage_backend() -> StorageBackend:
+    """Get or create the configured storage backend singleton."""
+    global _backend
+    if _backend is None:
+        if settings.STORAGE_BACKEND == "local":
+            _backend = LocalStorageBackend(
+                root=settings.LOCAL_STORAGE_DIR,
+                url_prefix=settings.LOCAL_STORAGE_BASE_URL + settings.LOCAL_STORAGE_URL_PATH,
+            )
+        else:
+            _backend = SupabaseStorageBackend(
+                url=settings.SUPABASE_URL,
+                service_key=settings.SUPABASE_SERVICE_KEY,
+                bucket=settings.SUPABASE_STORAGE_BUCKET,
+                max_workers=settings.STORAGE_MAX_WORKERS,
+            )
+    return _backend
+
+
+async def close_storage_backend() -> None:
+    global _backend
+    if _backend is not None:
+        backend, _backend = _backend, None
+        await backend.aclose()
 
 
 def get_file_extension(filename: str) -> str:
@@ -61,51 +185,41 @@ def get_content_type(filename: str) -> str:
 
 
 async def upload_file(
-    file_data: bytes,
+    file_data: bytes | str,
     filename: str,
     folder: str = "uploads",
 ) -> str:
     """
-    Upload a file to Supabase Storage.
-    
+    Upload a file to the configured storage backend.
+
+    ``file_data`` is either the file's bytes or a path to read it from, so large
+    uploads can be sent from disk without loading them into memory.
+
     Returns the public URL of the uploaded file.
     """
-    client = get_storage_client()
-    bucket = settings.SUPABASE_STORAGE_BUCKET
-    
     # Generate unique filename to avoid collisions
     ext = get_file_extension(filename)
     unique_name = f"{folder}/{uuid.uuid4()}.{ext}" if ext else f"{folder}/{uuid.uuid4()}"
-    
-    content_type = get_content_type(filename)
-    
-    # Upload to Supabase Storage
-    client.storage.from_(bucket).upload(
-        path=unique_name,
-        file=file_data,
-        file_options={"content-type": content_type},
-    )
-    
-    # Get public URL
-    public_url = client.storage.from_(bucket).get_public_url(unique_name)
-    
-    return public_url
+
+    return await get_storage_backend().upload(file_data, unique_name, get_content_type(filename))
+
+
+async def upload_blob(file_data: bytes | str, sha256: str, filename: str) -> str:
+    """
+    Upload a file under a path derived from its SHA-256, so identical content
+    always lands on the same object.
+
+    Returns the public URL of the stored file.
+    """
+    ext = get_file_extension(filename)
+    path = f"blobs/{sha256[:2]}/{sha256}.{ext}" if ext else f"blobs/{sha256[:2]}/{sha256}"
+
+    return await get_storage_backend().upload(file_data, path, get_content_type(filename))
 
 
 async def delete_file(file_path: str) -> bool:
-    """Delete a file from Supabase Storage."""
+    """Delete a file from the configured storage backend."""
     try:
-        client = get_storage_client()
-        bucket = settings.SUPABASE_STORAGE_BUCKET
-        
-        # Extract path from full URL if needed
-        if file_path.startswith("http"):
-            # URL format: https://.../storage/v1/object/public/bucket/path
-            parts = file_path.split(f"/storage/v1/object/public/{bucket}/")
-            if len(parts) > 1:
-                file_path = parts[1]
-        
-        client.storage.from_(bucket).remove([file_path])
-        return True
+        return await get_storage_backend().delete(file_path)
     except Exception:
         return False
@@ -4,17 +4,19 @@ from __future__ import annotations
 
 import uuid
 from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator
 
 from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..ai import get_llm_provider
+from ..ai.context import ai_call_site
 from ..ai.prompts import COGNITIVE_REPORT_PROMPT, DAILY_PROMPT_SYSTEM, DAILY_PROMPT_TEMPLATE
 from ..models.memory import Memory
 from ..models.session import CognitiveExercise, MoodEntry
 
 
-async def get_daily_prompt(db: AsyncSession, user_id: uuid.UUID) -> dict:
+async def _daily_prompt(db: AsyncSession, user_id: uuid.UUID) -> str:
     # Gather context
     mood_result = await db.execute(
         select(MoodEntry)
@@ -41,12 +43,12 @@ async def get_daily_prompt(db: AsyncSession, user_id: uuid.UUID) -> dict:
     )
     topics = ", ".join(title for (title,) in recent_mems.all()) or "none yet"
 
-    llm = get_llm_provider()
-    prompt = DAILY_PROMPT_TEMPLATE.format(
+    return DAILY_PROMPT_TEMPLATE.format(
         mood=mood_str, memory_count=mem_count, recent_topics=topics
     )
-    text = await llm.generate_text(prompt, system=DAILY_PROMPT_SYSTEM)
 
+
+def _daily_prompt_response(text: str) -> dict:
     return {
         "prompt_text": text,
         "exercise_type": "memory_recall",
@@ -54,6 +56,36 @@ async def get_daily_prompt(db: AsyncSession, user_id: uuid.UUID) -> dict:
     }
 
 
+async def get_daily_prompt(db: AsyncSession, user_id: uuid.UUID) -> dict:
+    prompt = await _daily_prompt(db, user_id)
+    llm = get_llm_provider()
+    with ai_call_site("daily_prompt"):
+        text = await llm.generate_text(prompt, system=DAILY_PROMPT_SYSTEM)
+    return _daily_prompt_response(text)
+
+
+async def stream_daily_prompt(
+    db: AsyncSession, user_id: uuid.UUID
+) -> AsyncIterator[tuple[str, dict]]:
+    """Streaming ``get_daily_prompt``.
+
+    Reads the context with ``db`` up front, then returns an iterator of ``token``
+    events and a final ``done`` event with the full response.
+    """
+    prompt = await _daily_prompt(db, user_id)
+
+    async def events() -> AsyncIterator[tuple[str, dict]]:
+        llm = get_llm_provider()
+        parts = []
+        with ai_call_site("daily_prompt"):
+            async for token in llm.generate_text_stream(prompt, system=DAILY_PROMPT_SYSTEM):
+                parts.append(token)
+                yield "token", {"text": token}
+        yield "done", _daily_prompt_response("".join(parts))
+
+    return events()
+
+
 async def submit_exercise(
     db: AsyncSession,
     user_id: uuid.UUID,
@@ -126,7 +158,8 @@ async def get_cognitive_report(db: AsyncSession, user_id: uuid.UUID) -> dict:
         mood_entries=", ".join(mood_strs) or "none",
         exercise_types=", ".join(exercise_types) or "none",
     )
-    summary = await llm.generate_text(prompt)
+    with ai_call_site("cognitive_report"):
+        summary = await llm.generate_text(prompt)
 
     return {
         "summary": summary,
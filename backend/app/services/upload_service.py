@@ -0,0 +1,517 @@
+from __future__ import annotations
+
+"""Upload pipeline — turn spooled files into a memory with LLM generation.
+
+Spooled files are ``(path, filename, sha256, size)`` tuples; the caller owns the
+files on disk and removes them once the pipeline returns.
+"""
+
+import asyncio
+import codecs
+import json
+import time
+import uuid
+from typing import List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..ai import get_llm_provider, get_vision_provider
+from ..ai.context import ai_call_site
+from ..ai.prompts import (
+    AUDIO_MEMORY_PROMPT,
+    DOCUMENT_MEMORY_PROMPT,
+    FILE_MEMORY_SYSTEM,
+    IMAGE_MEMORY_PROMPT,
+    MULTI_FILE_MEMORY_PROMPT,
+)
+from ..config import settings
+from ..models.file import StoredFile
+from ..models.memory import Memory, MemoryEmotion, MemoryObject, MemoryPerson
+from ..models.object import RegisteredObject
+from ..utils.image import encode_base64_image, prepare_image_async
+from . import document_service
+from .anchor_cache import anchor_cache
+from .file_service import cached_vision_result, get_stored_files, record_stored_file
+from .storage_service import get_content_type, get_file_extension, upload_blob
+
+# Only this much document text is ever sent to the LLM.
+DOCUMENT_CHAR_BUDGET = 4000
+
+# Placeholder texts returned when extraction fails; these are never cached.
+EXTRACTION_ERROR_PREFIXES = ("[Could not", "[Unknown", "[.doc format")
+
+SUPPORTED_FILE_TYPES = {"image", "document", "audio"}
+
+
+class UploadValidationError(Exception):
+    """The uploaded files can't be used (a client error, unlike other failures)."""
+
+
+def _get_file_type(filename: str) -> str:
+    """Determine file type category from filename."""
+    ext = get_file_extension(filename)
+    image_exts = {"jpg", "jpeg", "png", "gif", "webp", "bmp"}
+    video_exts = {"mp4", "webm", "mov", "avi"}
+    audio_exts = {"mp3", "wav", "m4a", "ogg", "flac"}
+    doc_exts = {"pdf", "doc", "docx", "txt", "rtf"}
+    
+    if ext in image_exts:
+        return "image"
+    elif ext in video_exts:
+        return "video"
+    elif ext in audio_exts:
+        return "audio"
+    elif ext in doc_exts:
+        return "document"
+    return "unknown"
+
+
+def validate_upload_files(filenames: List[str]) -> None:
+    """Raise ``UploadValidationError`` unless at least one file is a supported type."""
+    if not any(_get_file_type(name) in SUPPORTED_FILE_TYPES for name in filenames):
+        raise UploadValidationError(
+            "No supported file types found. Please upload images, documents, or audio."
+        )
+
+
+async def _extract_text_from_pdf(path: str, max_chars: int) -> str:
+    """Extract text from PDF file."""
+    try:
+        return await document_service.extract_pdf(path, max_chars)
+    except asyncio.TimeoutError:
+        return "[Could not extract PDF text: timed out]"
+    except Exception as e:
+        return f"[Could not extract PDF text: {e}]"
+
+
+async def _extract_text_from_docx(path: str, max_chars: int) -> str:
+    """Extract text from DOCX file."""
+    try:
+        return await document_service.extract_docx(path, max_chars)
+    except asyncio.TimeoutError:
+        return "[Could not extract DOCX text: timed out]"
+    except Exception as e:
+        return f"[Could not extract DOCX text: {e}]"
+
+
+async def _extract_text_from_txt(path: str, max_chars: int) -> str:
+    """Extract text from plain text file."""
+    # Read no more than could survive truncation (UTF-8 is at most 4 bytes/char)
+    with open(path, "rb") as fh:
+        file_data = fh.read(max_chars * 4)
+    try:
+        # Incremental decode drops a multi-byte character cut off by the read limit
+        return codecs.getincrementaldecoder("utf-8")().decode(file_data)
+    except UnicodeDecodeError:
+        try:
+            return file_data.decode("latin-1")
+        except Exception:
+            return "[Could not decode text file]"
+
+
+async def _process_document(path: str, filename: str, max_chars: int) -> str:
+    """Extract up to ``max_chars`` of text from document based on file type."""
+    ext = get_file_extension(filename)
+    if ext == "pdf":
+        return await _extract_text_from_pdf(path, max_chars)
+    elif ext == "docx":
+        return await _extract_text_from_docx(path, max_chars)
+    elif ext in ("txt", "rtf"):
+        return await _extract_text_from_txt(path, max_chars)
+    elif ext == "doc":
+        return "[.doc format not supported - please convert to .docx]"
+    return "[Unknown document format]"
+
+
+async def _generate_memory_from_image(
+    image_data: bytes, object_label: str
+) -> tuple[dict, bool]:
+    """Use GPT-4o vision to analyze image and generate memory.
+
+    Returns ``(memory_data, parsed)`` as ``_parse_memory_json`` does.
+    """
+    vision = get_vision_provider()
+    
+    # Downscale and re-encode off the event loop, then convert to a data URI
+    image_data, mime_type = await prepare_image_async(image_data)
+    b64_image = encode_base64_image(image_data, mime_type)
+    
+    prompt = IMAGE_MEMORY_PROMPT.format(object_label=object_label)
+    
+    # Use vision to analyze and generate memory in one call
+    full_prompt = f"""{prompt}
+
+{FILE_MEMORY_SYSTEM}"""
+    
+    with ai_call_site("upload_image"):
+        raw_response = await vision.analyze_image(b64_image, full_prompt)
+    
+    return _parse_memory_json(raw_response, object_label)
+
+
+async def _generate_memory_from_document(
+    document_text: str, object_label: str
+) -> dict:
+    """Use GPT-4 to generate memory from document text."""
+    llm = get_llm_provider()
+    
+    # Truncate if too long
+    if len(document_text) > DOCUMENT_CHAR_BUDGET:
+        document_text = document_text[:DOCUMENT_CHAR_BUDGET] + "\n\n[... document truncated ...]"
+    
+    prompt = DOCUMENT_MEMORY_PROMPT.format(
+        object_label=object_label,
+        document_text=document_text,
+    )
+    
+    with ai_call_site("upload_document"):
+        raw_response = await llm.generate_text(prompt, system=FILE_MEMORY_SYSTEM)
+    
+    memory_data, _ = _parse_memory_json(raw_response, object_label)
+    return memory_data
+
+
+async def _generate_memory_from_audio(
+    transcription: str, object_label: str
+) -> dict:
+    """Use GPT-4 to generate memory from audio transcription."""
+    llm = get_llm_provider()
+    
+    prompt = AUDIO_MEMORY_PROMPT.format(
+        object_label=object_label,
+        transcription=transcription,
+    )
+    
+    with ai_call_site("upload_audio"):
+        raw_response = await llm.generate_text(prompt, system=FILE_MEMORY_SYSTEM)
+    
+    memory_data, _ = _parse_memory_json(raw_response, object_label)
+    return memory_data
+
+
+async def _transcribe_audio(path: str, filename: str) -> str:
+    """Transcribe audio using OpenAI Whisper."""
+    try:
+        from openai import AsyncOpenAI
+        
+        client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
+        
+        # Hand the SDK the spooled file rather than an in-memory copy
+        ext = get_file_extension(filename)
+        with open(path, "rb") as audio_file:
+            transcription = await client.audio.transcriptions.create(
+                model="whisper-1",
+                file=(f"audio.{ext}", audio_file),
+            )
+        
+        return transcription.text
+    except Exception as e:
+        return f"[Could not transcribe audio: {e}]"
+
+
+def _parse_memory_json(raw_response: str, object_label: str) -> tuple[dict, bool]:
+    """Parse LLM response into memory data dict.
+
+    Returns ``(memory_data, parsed)``; ``parsed`` is False when the response
+    wasn't JSON and the raw text was used as the narrative instead.
+    """
+    try:
+        data = json.loads(raw_response)
+    except json.JSONDecodeError:
+        data = None
+        # Try to extract JSON from markdown code block
+        if "```" in raw_response:
+            json_str = raw_response.split("```")[1]
+            if json_str.startswith("json"):
+                json_str = json_str[4:]
+            try:
+                data = json.loads(json_str.strip())
+            except json.JSONDecodeError:
+                pass
+    parsed = isinstance(data, dict)
+    if not parsed:
+        data = {
+            "title": f"Memory of {object_label}",
+            "narrative": raw_response,
+        }
+    
+    return {
+        "title": data.get("title", f"Memory of {object_label}"),
+        "narrative": data.get("narrative", raw_response),
+        "emotions": data.get("emotions", []),
+        "people": data.get("people", []),
+        "sensory_details": data.get("sensory_details"),
+    }, parsed
+
+
+async def _upload_spooled(
+    spooled: List[tuple[str, str, str, int]], known: dict[str, StoredFile]
+) -> List[str]:
+    """Store every spooled file, at most ``UPLOAD_CONCURRENCY`` at a time.
+
+    Content already in storage (or repeated within this request) is uploaded once.
+    """
+    limit = asyncio.Semaphore(max(1, settings.UPLOAD_CONCURRENCY))
+
+    async def upload_one(path: str, filename: str, sha256: str) -> str:
+        async with limit:
+            return await upload_blob(path, sha256, filename)
+
+    pending = {}
+    for path, filename, sha256, _ in spooled:
+        if sha256 not in known and sha256 not in pending:
+            pending[sha256] = upload_one(path, filename, sha256)
+    uploaded = dict(zip(pending, await asyncio.gather(*pending.values())))
+
+    return [
+        known[sha256].storage_url if sha256 in known else uploaded[sha256]
+        for _, _, sha256, _ in spooled
+    ]
+
+
+def _extraction_failed(text: str) -> bool:
+    return text.startswith(EXTRACTION_ERROR_PREFIXES)
+
+
+async def _generate_from_files(
+    images: list,
+    documents: list,
+    audios: list,
+    label: str,
+    timings: dict,
+    known: dict[str, StoredFile],
+) -> tuple[dict, dict[str, dict]]:
+    """Run extraction/transcription and the model call for the chosen file kind.
+
+    Returns ``(memory_data, derived)`` where ``derived`` maps content hashes to
+    newly computed results worth remembering (``extracted_text`` /
+    ``vision_result``). Results already in ``known`` are reused, not recomputed.
+    """
+    derived: dict[str, dict] = {}
+    if images:
+        # Use first image for vision-based generation
+        img_path, img_name, img_hash = images[0]
+        started = time.perf_counter()
+        memory_data = cached_vision_result(known.get(img_hash), label)
+        if memory_data is None:
+            with open(img_path, "rb") as fh:
+                img_data = fh.read()
+            memory_data, parsed = await _generate_memory_from_image(img_data, label)
+            # An unparseable answer is used once but not reused for later uploads
+            if parsed:
+                derived[img_hash] = {"vision_result": memory_data}
+        timings["generate"] = time.perf_counter() - started
+    elif documents:
+        # Extract and combine document text
+        started = time.perf_counter()
+        all_text = []
+        remaining = DOCUMENT_CHAR_BUDGET
+        for doc_path, doc_name, doc_hash in documents:
+            if remaining <= 0:
+                # The LLM never sees text past the budget, so don't parse it
+                break
+            stored = known.get(doc_hash)
+            if stored is not None and stored.extracted_text is not None:
+                text = stored.extracted_text
+            else:
+                # Always the full budget (plus one character, so truncation is
+                # still detected downstream) so the result can be reused anywhere
+                text = await _process_document(
+                    doc_path, doc_name or "doc", DOCUMENT_CHAR_BUDGET + 1
+                )
+                if not _extraction_failed(text):
+                    derived[doc_hash] = {"extracted_text": text}
+            all_text.append(text)
+            remaining -= len(text)
+        combined_text = "\n\n---\n\n".join(all_text)
+        timings["extract"] = time.perf_counter() - started
+        started = time.perf_counter()
+        memory_data = await _generate_memory_from_document(combined_text, label)
+        timings["generate"] = time.perf_counter() - started
+    else:
+        # Transcribe first audio and generate
+        aud_path, aud_name, aud_hash = audios[0]
+        started = time.perf_counter()
+        stored = known.get(aud_hash)
+        if stored is not None and stored.extracted_text is not None:
+            transcription = stored.extracted_text
+        else:
+            transcription = await _transcribe_audio(aud_path, aud_name or "audio.mp3")
+            if not _extraction_failed(transcription):
+                derived[aud_hash] = {"extracted_text": transcription}
+        timings["extract"] = time.perf_counter() - started
+        started = time.perf_counter()
+        memory_data = await _generate_memory_from_audio(transcription, label)
+        timings["generate"] = time.perf_counter() - started
+    return memory_data, derived
+
+
+async def _existing_memory_result(
+    db: AsyncSession, memory: Memory, label: str, spooled: List[tuple[str, str, str, int]]
+) -> dict:
+    """The result ``create_memory_from_files`` returned when it created ``memory``."""
+    stored = await get_stored_files(db, (sha256 for _, _, sha256, _ in spooled))
+    return {
+        "object_label": label,
+        "title": memory.title,
+        "memory_text": memory.narrative_text,
+        "audio_url": memory.audio_url,
+        "image_url": memory.image_url,
+        "file_urls": [
+            stored[sha256].storage_url if sha256 in stored else None
+            for _, _, sha256, _ in spooled
+        ],
+    }
+
+
+async def create_memory_from_files(
+    db: AsyncSession,
+    user_id: uuid.UUID,
+    label: str,
+    title: Optional[str],
+    spooled: List[tuple[str, str, str, int]],
+    timings: dict,
+    memory_id: Optional[uuid.UUID] = None,
+) -> dict:
+    """Generate, store and persist a memory from spooled upload files.
+
+    Stage durations are recorded into ``timings``. Raises ``UploadValidationError``
+    when none of the files is a supported type. With ``memory_id`` the call is
+    idempotent: the memory is created under that id, and if it already exists
+    its result is returned without redoing any work.
+    """
+    validate_upload_files([filename for _, filename, _, _ in spooled])
+
+    if memory_id is not None:
+        existing = await db.get(Memory, memory_id)
+        if existing is not None:
+            return await _existing_memory_result(db, existing, label, spooled)
+
+    # Categorize files
+    images = []
+    documents = []
+    audios = []
+    
+    for path, filename, sha256, _ in spooled:
+        file_type = _get_file_type(filename)
+        if file_type == "image":
+            images.append((path, filename, sha256))
+        elif file_type == "document":
+            documents.append((path, filename, sha256))
+        elif file_type == "audio":
+            audios.append((path, filename, sha256))
+    
+    # Content seen before skips its storage write and any cached AI work.
+    # Looked up once here: the session can't be shared with the tasks below.
+    started = time.perf_counter()
+    known = await get_stored_files(db, (sha256 for _, _, sha256, _ in spooled))
+    timings["dedupe"] = time.perf_counter() - started
+    
+    # Storage uploads run in the background while the AI work proceeds
+    async def timed_uploads() -> List[str]:
+        started = time.perf_counter()
+        urls = await _upload_spooled(spooled, known)
+        timings["storage"] = time.perf_counter() - started
+        return urls
+    
+    upload_task = asyncio.ensure_future(timed_uploads())
+    try:
+        memory_data, derived = await _generate_from_files(
+            images, documents, audios, label, timings, known
+        )
+        file_urls = await upload_task
+    except BaseException:
+        upload_task.cancel()
+        raise
+    
+    image_url: Optional[str] = None
+    audio_url: Optional[str] = None
+    for (_, filename, _, _), url in zip(spooled, file_urls):
+        file_type = _get_file_type(filename)
+        if file_type == "image" and not image_url:
+            image_url = url
+        elif file_type == "audio" and not audio_url:
+            audio_url = url
+    
+    # Use provided title or generated one
+    final_title = title.strip() if title and title.strip() else memory_data["title"]
+    
+    # Find or create registered object
+    started = time.perf_counter()
+    obj_result = await db.execute(
+        select(RegisteredObject).where(
+            RegisteredObject.label == label, RegisteredObject.user_id == user_id
+        )
+    )
+    obj = obj_result.scalar_one_or_none()
+    if obj is None:
+        obj = RegisteredObject(user_id=user_id, label=label, coco_label=label)
+        db.add(obj)
+        await db.flush()
+    
+    # Create memory record
+    memory = Memory(
+        id=memory_id or uuid.uuid4(),
+        user_id=user_id,
+        title=final_title,
+        narrative_text=memory_data["narrative"],
+        sensory_details=memory_data.get("sensory_details"),
+        image_url=image_url,
+        audio_url=audio_url,
+        is_ai_generated=True,
+        ai_model_used="gpt-4o",
+    )
+    db.add(memory)
+    await db.flush()
+    
+    # Link to object
+    link = MemoryObject(memory_id=memory.id, object_id=obj.id, is_primary=True)
+    db.add(link)
+    
+    # Add emotions
+    for em in memory_data.get("emotions", []):
+        if isinstance(em, dict) and em.get("emotion"):
+            db.add(MemoryEmotion(
+                memory_id=memory.id,
+                emotion=em.get("emotion", ""),
+                intensity=em.get("intensity", 0.5),
+            ))
+    
+    # Add people
+    for p in memory_data.get("people", []):
+        if isinstance(p, dict) and p.get("name"):
+            db.add(MemoryPerson(
+                memory_id=memory.id,
+                person_name=p.get("name", ""),
+                relationship_type=p.get("relationship"),
+            ))
+    
+    # Remember new content and anything derived from it
+    recorded = set()
+    for (_, filename, sha256, size), url in zip(spooled, file_urls):
+        if sha256 in recorded or (sha256 in known and sha256 not in derived):
+            continue
+        recorded.add(sha256)
+        await record_stored_file(
+            db,
+            sha256=sha256,
+            size=size,
+            content_type=get_content_type(filename),
+            storage_url=url,
+            label=label,
+            **derived.get(sha256, {}),
+        )
+    
+    await db.commit()
+    anchor_cache.invalidate_label(label)
+    timings["db"] = time.perf_counter() - started
+    
+    return {
+        "object_label": label,
+        "title": final_title,
+        "memory_text": memory_data["narrative"],
+        "audio_url": audio_url,
+        "image_url": image_url,
+        "file_urls": file_urls,
+    }
@@ -9,9 +9,11 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..ai import get_vision_provider
+from ..ai.context import ai_call_site
 from ..ai.prompts import OBJECT_IDENTIFY_PROMPT, SCENE_ANALYSIS_PROMPT, SCENE_DESCRIBE_PROMPT
 from ..models.memory import MemoryObject
 from ..models.object import RegisteredObject
+from ..utils.image import prepare_image_b64
 
 
 async def analyze_scene(
@@ -22,7 +24,8 @@ async def analyze_scene(
 ) -> dict:
     vision = get_vision_provider()
     prompt = custom_prompt or SCENE_ANALYSIS_PROMPT
-    raw = await vision.analyze_image(image_b64, prompt)
+    with ai_call_site("analyze_scene"):
+        raw = await vision.analyze_image(await prepare_image_b64(image_b64), prompt)
 
     try:
         data = json.loads(raw)
@@ -38,24 +41,26 @@ async def analyze_scene(
     # Cross-reference detected objects with user's registered objects
     detected_labels = [obj.get("label", "").lower() for obj in data.get("objects", [])]
     if detected_labels:
+        # One round trip for the whole scene: each registered label with its
+        # linked memory IDs (outer join, so objects without memories get [])
         result = await db.execute(
-            select(RegisteredObject).where(
+            select(RegisteredObject.label, MemoryObject.memory_id)
+            .outerjoin(MemoryObject, MemoryObject.object_id == RegisteredObject.id)
+            .where(
                 RegisteredObject.user_id == user_id,
-                RegisteredObject.label.in_(detected_labels),
+                RegisteredObject.label.in_(set(detected_labels)),
             )
         )
-        registered = {obj.label: obj for obj in result.scalars().all()}
+        memory_ids: dict[str, list[str]] = {}
+        for label, memory_id in result.all():
+            ids = memory_ids.setdefault(label, [])
+            if memory_id is not None:
+                ids.append(str(memory_id))
 
         for obj in data.get("objects", []):
             label = obj.get("label", "").lower()
-            if label in registered:
-                # Find memory IDs linked to this object
-                mem_result = await db.execute(
-                    select(MemoryObject.memory_id).where(
-                        MemoryObject.object_id == registered[label].id
-                    )
-                )
-                obj["memory_ids"] = [str(mid) for (mid,) in mem_result.all()]
+            if label in memory_ids:
+                obj["memory_ids"] = list(memory_ids[label])
 
     return {
         "objects": data.get("objects", []),
@@ -70,7 +75,8 @@ async def analyze_scene(
 
 async def identify_object(image_b64: str, bbox: list[float] | None = None) -> dict:
     vision = get_vision_provider()
-    raw = await vision.analyze_image(image_b64, OBJECT_IDENTIFY_PROMPT)
+    with ai_call_site("identify_object"):
+        raw = await vision.analyze_image(await prepare_image_b64(image_b64), OBJECT_IDENTIFY_PROMPT)
     try:
         return json.loads(raw)
     except json.JSONDecodeError:
@@ -84,7 +90,8 @@ async def identify_object(image_b64: str, bbox: list[float] | None = None) -> di
 
 async def describe_scene(image_b64: str) -> dict:
     vision = get_vision_provider()
-    raw = await vision.analyze_image(image_b64, SCENE_DESCRIBE_PROMPT)
+    with ai_call_site("describe_scene"):
+        raw = await vision.analyze_image(await prepare_image_b64(image_b64), SCENE_DESCRIBE_PROMPT)
 
     try:
         data = json.loads(raw)
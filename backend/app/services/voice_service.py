@@ -2,30 +2,79 @@ from __future__ import annotations
 
 """Voice service — TTS orchestration + audio caching."""
 
+import asyncio
 import hashlib
+import logging
+import re
 import uuid
 from typing import AsyncIterator
 
 from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..ai import get_tts_provider
+from ..ai.context import ai_call_site
+from ..ai.resilience import FallbackAudio
 from ..config import settings
+from ..database import async_session
 from ..models.memory import Memory
 from ..models.session import AudioCache
+from .audio_store import audio_key, read_audio, write_audio
+
+logger = logging.getLogger(__name__)
+
+# Chunks already played finish writing to the cache after the stream moves on;
+# their tasks are held here so they aren't garbage-collected mid-write
+_recording: set[asyncio.Task] = set()
 
 
 def _text_hash(text: str) -> str:
     return hashlib.sha256(text.encode()).hexdigest()
 
 
+def split_narrative(text: str, max_chars: int | None = None) -> list[str]:
+    """Split a narrative into sentence-packed chunks of at most ``max_chars``.
+
+    Chunks never cross a paragraph break. ``expand_memory`` appends each
+    expansion as a new paragraph, so the chunks (and cached audio) of the
+    earlier text stay the same after an expansion.
+    """
+    max_chars = max_chars or settings.TTS_CHUNK_MAX_CHARS
+    chunks: list[str] = []
+    for paragraph in re.split(r"\n\s*\n", text):
+        current = ""
+        for sentence in re.split(r"(?<=[.!?])\s+", paragraph.strip()):
+            sentence = " ".join(sentence.split())
+            if not sentence:
+                continue
+            # Hard-wrap a single overlong sentence on word boundaries
+            while len(sentence) > max_chars:
+                cut = sentence.rfind(" ", 0, max_chars)
+                cut = cut if cut > 0 else max_chars
+                if current:
+                    chunks.append(current)
+                    current = ""
+                chunks.append(sentence[:cut])
+                sentence = sentence[cut:].strip()
+            if current and len(current) + 1 + len(sentence) > max_chars:
+                chunks.append(current)
+                current = sentence
+            else:
+                current = f"{current} {sentence}" if current else sentence
+        if current:
+            chunks.append(current)
+    return chunks
+
+
 async def synthesize(
     text: str,
     voice_id: str | None = None,
     provider_name: str | None = None,
 ) -> bytes:
     tts = get_tts_provider()
-    return await tts.synthesize(text, voice_id=voice_id)
+    with ai_call_site("synthesize"):
+        return await tts.synthesize(text, voice_id=voice_id)
 
 
 async def synthesize_stream(
@@ -33,17 +82,22 @@ async def synthesize_stream(
     voice_id: str | None = None,
 ) -> AsyncIterator[bytes]:
     tts = get_tts_provider()
-    async for chunk in tts.synthesize_stream(text, voice_id=voice_id):
-        yield chunk
+    with ai_call_site("synthesize"):
+        async for chunk in tts.synthesize_stream(text, voice_id=voice_id):
+            yield chunk
 
 
-async def synthesize_memory(
+async def plan_memory_audio(
     db: AsyncSession,
     memory_id: uuid.UUID,
     user_id: uuid.UUID,
     voice_id: str | None = None,
-) -> bytes:
-    # Fetch memory
+) -> dict:
+    """Split a memory's narrative into chunks and resolve which are already cached.
+
+    All database reads happen here, inside the request, so that
+    ``stream_memory_audio`` can run after the request session has closed.
+    """
     result = await db.execute(
         select(Memory).where(Memory.id == memory_id, Memory.user_id == user_id)
     )
@@ -52,38 +106,134 @@ async def synthesize_memory(
         raise ValueError("Memory not found")
 
     vid = voice_id or settings.ELEVENLABS_VOICE_ID
-    text_h = _text_hash(memory.narrative_text)
-
-    # Check cache
-    cache_result = await db.execute(
-        select(AudioCache).where(
-            AudioCache.memory_id == memory_id,
-            AudioCache.text_hash == text_h,
-            AudioCache.voice_id == vid,
+    provider = settings.TTS_PROVIDER
+    chunks = [
+        {"text": text, "text_hash": _text_hash(text), "key": None}
+        for text in split_narrative(memory.narrative_text)
+    ]
+
+    # Check cache — keyed on content, so unchanged sentences are never re-synthesised
+    if chunks:
+        cache_result = await db.execute(
+            select(AudioCache.text_hash, AudioCache.audio_url).where(
+                AudioCache.text_hash.in_({c["text_hash"] for c in chunks}),
+                AudioCache.provider == provider,
+                AudioCache.voice_id == vid,
+            )
         )
-    )
-    cached = cache_result.scalar_one_or_none()
-    if cached:
-        # In a real app, this would return the cached audio file/URL
-        # For now, re-synthesize
-        pass
+        cached = dict(cache_result.all())
+        for chunk in chunks:
+            chunk["key"] = cached.get(chunk["text_hash"])
+
+    return {"memory_id": memory.id, "provider": provider, "voice_id": vid, "chunks": chunks}
+
+
+async def _record_chunk(plan: dict, chunk: dict, audio: bytes) -> None:
+    key = audio_key(chunk["text_hash"], plan["provider"], plan["voice_id"])
+    await write_audio(key, audio)
+    async with async_session() as session:
+        await session.execute(
+            insert(AudioCache)
+            .values(
+                memory_id=plan["memory_id"],
+                text_hash=chunk["text_hash"],
+                provider=plan["provider"],
+                voice_id=plan["voice_id"],
+                audio_url=key,
+                duration_ms=None,
+            )
+            .on_conflict_do_update(
+                index_elements=["text_hash", "provider", "voice_id"],
+                set_={"audio_url": key},
+            )
+        )
+        await session.commit()
+    chunk["key"] = key
 
+
+async def _synthesize_chunk(plan: dict, chunk: dict, queue: asyncio.Queue) -> None:
+    """Stream one chunk from the provider into ``queue``, teeing it into the cache.
+
+    Puts audio parts, then ``None`` at the end — or the exception if synthesis
+    failed, so the consumer can re-raise it in order.
+    """
     tts = get_tts_provider()
-    audio = await tts.synthesize(memory.narrative_text, voice_id=vid)
-
-    # Cache for next time
-    cache_entry = AudioCache(
-        memory_id=memory_id,
-        text_hash=text_h,
-        provider=settings.TTS_PROVIDER,
-        voice_id=vid,
-        audio_url="cached",  # Placeholder — would store to S3/local in production
-        duration_ms=None,
-    )
-    db.add(cache_entry)
-    await db.commit()
+    parts: list[bytes] = []
+    try:
+        with ai_call_site("narration"):
+            async for part in tts.synthesize_stream(chunk["text"], voice_id=plan["voice_id"]):
+                parts.append(part)
+                queue.put_nowait(part)
+    except Exception as e:
+        queue.put_nowait(e)
+        return
+    queue.put_nowait(None)
+
+    # Audio from a fallback provider is in another voice; don't cache it as this one
+    if any(isinstance(part, FallbackAudio) for part in parts):
+        return
+
+    # Cache for next time, once the listener already has the audio
+    await _record_chunk(plan, chunk, b"".join(parts))
+
+
+def _recorded(task: asyncio.Task) -> None:
+    _recording.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning("Could not cache narration audio", exc_info=task.exception())
+
+
+async def stream_memory_audio(plan: dict) -> AsyncIterator[bytes]:
+    """Yield a memory's audio in narrative order as it becomes available.
+
+    Cached chunks are read from the audio store; missing ones are streamed from
+    the provider concurrently, at most ``TTS_PIPELINE_CONCURRENCY`` ahead of the
+    chunk being played. The chunk being played is forwarded part by part, so
+    playback starts with the provider's first bytes.
+    """
+    chunks = plan["chunks"]
+    window = max(1, settings.TTS_PIPELINE_CONCURRENCY)
+    tasks: dict[int, tuple[asyncio.Task, asyncio.Queue]] = {}
+
+    def schedule(start: int, stop: int) -> None:
+        for i in range(start, min(stop, len(chunks))):
+            if i not in tasks and chunks[i]["key"] is None:
+                queue: asyncio.Queue = asyncio.Queue()
+                task = asyncio.create_task(_synthesize_chunk(plan, chunks[i], queue))
+                tasks[i] = (task, queue)
+
+    try:
+        for i, chunk in enumerate(chunks):
+            schedule(i, i + window)
+            if chunk["key"] is not None:
+                audio = await read_audio(chunk["key"])
+                if audio is not None:
+                    yield audio
+                    continue
+                # Row outlived its file; fall back to synthesising
+                chunk["key"] = None
+                schedule(i, i + 1)
+            _, queue = tasks[i]
+            while (part := await queue.get()) is not None:
+                if isinstance(part, Exception):
+                    raise part
+                yield part
+            task, _ = tasks.pop(i)
+            _recording.add(task)
+            task.add_done_callback(_recorded)
+    finally:
+        # Abandon look-ahead work if the listener went away; chunks that were
+        # already played still finish writing to the cache.
+        for task, _ in tasks.values():
+            task.cancel()
+
 
-    return audio
+def cached_audio_keys(plan: dict) -> list[str] | None:
+    """Store keys for every chunk if the whole narrative is cached, else ``None``."""
+    keys = [chunk["key"] for chunk in plan["chunks"]]
+    if not keys or any(key is None for key in keys):
+        return None
+    return keys
 
 
 def get_voice_profiles() -> list[dict]:
@@ -0,0 +1,37 @@
+"""Document text extraction, run inside worker processes.
+
+These functions are executed in a child process per document, so they must stay
+top-level, picklable and free of app state. Each one stops reading as soon as
+``max_chars`` of text have been collected.
+"""
+
+
+def extract_pdf_text(path: str, max_pages: int, max_chars: int) -> str:
+    from pypdf import PdfReader
+
+    reader = PdfReader(path)
+    text_parts = []
+    collected = 0
+    for i, page in enumerate(reader.pages):
+        if i >= max_pages or collected >= max_chars:
+            break
+        text = page.extract_text()
+        if text:
+            text_parts.append(text)
+            collected += len(text)
+    return "\n\n".join(text_parts)
+
+
+def extract_docx_text(path: str, max_chars: int) -> str:
+    from docx import Document
+
+    doc = Document(path)
+    paragraphs = []
+    collected = 0
+    for p in doc.paragraphs:
+        if collected >= max_chars:
+            break
+        if p.text.strip():
+            paragraphs.append(p.text)
+            collected += len(p.text)
+    return "\n\n".join(paragraphs)
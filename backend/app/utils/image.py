@@ -1,5 +1,23 @@
+import asyncio
 import base64
+import binascii
 import io
+from typing import Tuple
+
+from ..config import settings
+
+# Leading bytes of the formats vision providers accept
+_SIGNATURES = (
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+)
+
+# Formats sent as-is when no resize or rotation is needed
+_PASSTHROUGH_FORMATS = {"JPEG", "PNG", "GIF", "WEBP"}
+
+_EXIF_ORIENTATION = 0x0112
 
 
 def decode_base64_image(data: str) -> bytes:
@@ -13,3 +31,90 @@ def encode_base64_image(image_bytes: bytes, mime_type: str = "image/jpeg") -> st
     """Encode bytes to a data URI string."""
     b64 = base64.b64encode(image_bytes).decode("utf-8")
     return f"data:{mime_type};base64,{b64}"
+
+
+def detect_mime_type(image_bytes: bytes, default: str = "image/jpeg") -> str:
+    """Identify the image format from its magic bytes."""
+    for signature, mime_type in _SIGNATURES:
+        if image_bytes.startswith(signature):
+            return mime_type
+    if image_bytes[:4] == b"RIFF" and image_bytes[8:12] == b"WEBP":
+        return "image/webp"
+    return default
+
+
+def split_data_uri(data: str) -> Tuple[str, str]:
+    """Split an image string into ``(mime_type, bare base64)``.
+
+    The MIME type comes from the data URI header when present, otherwise from
+    the decoded magic bytes (the default type if the data isn't valid base64).
+    """
+    if data.startswith("data:") and "," in data:
+        header, b64 = data.split(",", 1)
+        mime_type = header[5:].split(";", 1)[0]
+        if mime_type:
+            return mime_type, b64
+        data = b64
+    # 16 base64 characters decode to the 12 bytes the signatures need
+    try:
+        head = base64.b64decode(data[:16] + "=" * (-len(data[:16]) % 4), validate=False)
+    except (binascii.Error, ValueError):
+        # Not valid base64; the provider will reject the payload itself
+        head = b""
+    return detect_mime_type(head), data
+
+
+def prepare_image(
+    image_bytes: bytes, max_side: int, quality: int = 85
+) -> Tuple[bytes, str]:
+    """Normalize an image for a vision model; returns ``(bytes, mime_type)``.
+
+    Applies the EXIF orientation, scales the longest side down to ``max_side`` and
+    re-encodes (JPEG, or PNG when there is transparency). Images that are already
+    small and upright are passed through untouched. Without Pillow, or for data
+    Pillow can't decode, the original bytes are returned with their detected type.
+    """
+    mime_type = detect_mime_type(image_bytes)
+    try:
+        from PIL import Image, ImageOps
+    except ImportError:
+        return image_bytes, mime_type
+
+    try:
+        with Image.open(io.BytesIO(image_bytes)) as img:
+            # exif_transpose always returns a copy, so look at the tag itself
+            rotated = img.getexif().get(_EXIF_ORIENTATION, 1) not in (1, None)
+            if (
+                max(img.size) <= max_side
+                and not rotated
+                and img.format in _PASSTHROUGH_FORMATS
+            ):
+                return image_bytes, mime_type
+            upright = ImageOps.exif_transpose(img) if rotated else img.copy()
+            upright.thumbnail((max_side, max_side), Image.LANCZOS)
+
+            out = io.BytesIO()
+            if upright.mode in ("RGBA", "LA") or "transparency" in upright.info:
+                upright.save(out, format="PNG", optimize=True)
+                return out.getvalue(), "image/png"
+            upright.convert("RGB").save(out, format="JPEG", quality=quality, optimize=True)
+            return out.getvalue(), "image/jpeg"
+    except Exception:
+        return image_bytes, mime_type
+
+
+async def prepare_image_async(image_bytes: bytes) -> Tuple[bytes, str]:
+    """``prepare_image`` with the configured limits, off the event loop."""
+    return await asyncio.to_thread(
+        prepare_image,
+        image_bytes,
+        settings.VISION_MAX_IMAGE_SIDE,
+        settings.VISION_JPEG_QUALITY,
+    )
+
+
+async def prepare_image_b64(image_b64: str) -> str:
+    """Preprocess a base64 image (bare or data URI); returns a data URI."""
+    image_bytes = await asyncio.to_thread(decode_base64_image, image_b64)
+    prepared, mime_type = await prepare_image_async(image_bytes)
+    return encode_base64_image(prepared, mime_type)
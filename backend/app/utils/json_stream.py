@@ -0,0 +1,56 @@
+import re
+
+_ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+
+
+class JSONStringFieldStream:
+    """Decode one string field out of JSON text that is still arriving.
+
+    Feed it the chunks of a streamed model response; each call returns the newly
+    decoded part of ``field``'s value, so the value can be shown while the rest of
+    the object is still being generated. Everything fed is kept in ``text``.
+    """
+
+    def __init__(self, field: str):
+        self._pattern = re.compile(r'"%s"\s*:\s*"' % re.escape(field))
+        self._pos: int | None = None
+        self.text = ""
+        self.done = False
+
+    def feed(self, chunk: str) -> str:
+        self.text += chunk
+        if self.done:
+            return ""
+        if self._pos is None:
+            match = self._pattern.search(self.text)
+            if match is None:
+                return ""
+            self._pos = match.end()
+
+        text, i, out = self.text, self._pos, []
+        while i < len(text):
+            c = text[i]
+            if c == '"':
+                self.done = True
+                i += 1
+                break
+            if c != "\\":
+                out.append(c)
+                i += 1
+                continue
+            # Escape sequence: wait until it has fully arrived
+            if i + 1 >= len(text):
+                break
+            if text[i + 1] == "u":
+                if i + 6 > len(text):
+                    break
+                try:
+                    out.append(chr(int(text[i + 2:i + 6], 16)))
+                except ValueError:
+                    out.append(text[i:i + 6])
+                i += 6
+            else:
+                out.append(_ESCAPES.get(text[i + 1], text[i + 1]))
+                i += 2
+        self._pos = i
+        return "".join(out)
@@ -0,0 +1,55 @@
+import json
+import logging
+from typing import Any, AsyncIterator, Optional, Tuple
+
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+
+from ..ai.errors import AIDeadlineExceeded, AIUnavailable
+
+logger = logging.getLogger(__name__)
+
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    # Stop nginx-style proxies from buffering the stream
+    "X-Accel-Buffering": "no",
+}
+
+
+def format_sse(data: Any, event: Optional[str] = None) -> str:
+    """Encode one Server-Sent Event; ``data`` is sent as JSON."""
+    payload = json.dumps(data, default=str)
+    lines = [f"event: {event}"] if event else []
+    lines.append(f"data: {payload}")
+    return "\n".join(lines) + "\n\n"
+
+
+async def sse_events(events: AsyncIterator[Tuple[str, Any]]) -> AsyncIterator[str]:
+    """Format ``(event, data)`` pairs as SSE, ending with an ``error`` event on failure.
+
+    Headers are already sent once streaming starts, so a failure part way can
+    only be reported in-band.
+    """
+    try:
+        async for event, data in events:
+            yield format_sse(data, event=event)
+    except Exception as e:
+        logger.exception("SSE stream failed")
+        yield format_sse({"detail": _error_detail(e)}, event="error")
+
+
+def _error_detail(exc: Exception) -> str:
+    # Same details the JSON endpoints return; anything else may carry internals
+    if isinstance(exc, HTTPException):
+        return str(exc.detail)
+    if isinstance(exc, AIUnavailable):
+        return f"The {exc.capability} service is temporarily unavailable"
+    if isinstance(exc, AIDeadlineExceeded):
+        return f"The {exc.capability} service took too long to respond"
+    return "Internal server error"
+
+
+def sse_response(events: AsyncIterator[Tuple[str, Any]]) -> StreamingResponse:
+    return StreamingResponse(
+        sse_events(events), media_type="text/event-stream", headers=SSE_HEADERS
+    )
@@ -0,0 +1,39 @@
+"""Standalone background job worker: ``python -m app.worker``.
+
+Runs the same queue as the API's in-process worker, so AI-heavy jobs can be
+moved off the web processes (set ``JOB_WORKER_INPROCESS=false`` there).
+"""
+
+import asyncio
+import logging
+import signal
+
+from .ai import close_providers
+from .config import settings
+from .database import engine
+from .services.document_service import shutdown_extraction_pool
+from .services.job_service import run_worker
+from .services.storage_service import close_storage_backend
+
+
+async def main() -> None:
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    logging.getLogger(__name__).info(
+        "Job worker started (concurrency %d)", settings.JOB_WORKER_CONCURRENCY
+    )
+    try:
+        await run_worker(stop)
+    finally:
+        await close_providers()
+        await close_storage_backend()
+        shutdown_extraction_pool()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
@@ -0,0 +1,9 @@
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.ext.compiler import compiles
+
+
+@compiles(UUID, "sqlite")
+def _uuid_on_sqlite(type_, compiler, **kw):
+    # Lets the Postgres models create tables in the in-memory SQLite used by
+    # query-shape tests; values are stored as 32-char hex
+    return "CHAR(32)"
@@ -0,0 +1,57 @@
+from typing import AsyncIterator
+
+import pytest
+
+import app.ai as ai
+from app.ai.base import LLMProvider
+from app.ai.cache import CachingLLMProvider, MemoryCacheBackend
+from app.ai.context import ai_call_site
+from app.config import settings
+
+
+class FakeLLM(LLMProvider):
+    def __init__(self, answer: str):
+        self.answer = answer
+        self.calls = 0
+
+    async def generate_text(self, prompt: str, system: str | None = None, **kwargs) -> str:
+        self.calls += 1
+        return self.answer
+
+    async def generate_text_stream(
+        self, prompt: str, system: str | None = None, **kwargs
+    ) -> AsyncIterator[str]:
+        yield await self.generate_text(prompt, system=system, **kwargs)
+
+
+async def test_cache_key_includes_provider_and_model():
+    backend = MemoryCacheBackend(max_entries=16)
+    options = {"backend": backend, "ttls": {"site": 60.0}, "default_ttl": 0.0}
+    old = CachingLLMProvider(FakeLLM("old"), identity=("openai", "gpt-4"), **options)
+    new = CachingLLMProvider(FakeLLM("new"), identity=("openai", "gpt-4o"), **options)
+
+    with ai_call_site("site"):
+        assert await old.generate_text("hello") == "old"
+        assert await new.generate_text("hello") == "new"
+        assert await old.generate_text("hello") == "old"
+    assert old.inner.calls == 1
+    assert new.inner.calls == 1
+
+
+def _caching_layer(provider):
+    while not isinstance(provider, CachingLLMProvider):
+        provider = provider.inner
+    return provider
+
+
+@pytest.mark.parametrize("name", ["openai", "anthropic"])
+async def test_registry_keys_cache_by_configured_primary(monkeypatch, name):
+    monkeypatch.setattr(settings, "LLM_PROVIDER", name)
+    monkeypatch.setattr(settings, "AI_CACHE_ENABLED", True)
+    await ai.close_providers()
+    try:
+        caching = _caching_layer(ai.get_llm_provider())
+        primary = ai._make_llm(name)
+        assert caching.identity == (name, primary.model)
+    finally:
+        await ai.close_providers()
@@ -0,0 +1,66 @@
+import asyncio
+from typing import AsyncIterator
+
+import pytest
+
+from app.ai.base import TTSProvider
+from app.ai.context import ai_call_site
+from app.ai.deadlines import DeadlineTTSProvider, latency
+from app.ai.errors import AIDeadlineExceeded
+from app.config import settings
+
+
+class FakeTTS(TTSProvider):
+    def __init__(self, name: str, first_chunk_delay: float, chunks: int = 3, gap: float = 0.0):
+        self.name = name
+        self.first_chunk_delay = first_chunk_delay
+        self.chunks = chunks
+        self.gap = gap
+        self.closed = False
+
+    async def synthesize(self, text: str, voice_id: str | None = None, **kwargs) -> bytes:
+        return b"".join([part async for part in self.synthesize_stream(text, voice_id)])
+
+    async def synthesize_stream(
+        self, text: str, voice_id: str | None = None, **kwargs
+    ) -> AsyncIterator[bytes]:
+        try:
+            await asyncio.sleep(self.first_chunk_delay)
+            for i in range(self.chunks):
+                if i:
+                    await asyncio.sleep(self.gap)
+                yield f"{self.name}{i}".encode()
+        finally:
+            self.closed = True
+
+
+async def test_narration_stream_is_hedged_on_first_chunk(monkeypatch):
+    monkeypatch.setattr(settings, "AI_HEDGE_SITES", ["narration"])
+    monkeypatch.setattr(settings, "AI_HEDGE_MIN_SAMPLES", 1)
+    monkeypatch.setattr(settings, "AI_HEDGE_MIN_DELAY_SECONDS", 0.05)
+    latency.record("tts:narration:first_chunk", 0.01)
+
+    slow, fast = FakeTTS("slow", first_chunk_delay=5), FakeTTS("fast", first_chunk_delay=0)
+    tts = DeadlineTTSProvider(slow, hedge=fast)
+    with ai_call_site("narration"):
+        parts = [part async for part in tts.synthesize_stream("Once upon a time")]
+
+    assert parts == [b"fast0", b"fast1", b"fast2"]
+    assert slow.closed
+    assert latency.hedges_won["tts:narration:first_chunk"] >= 1
+
+
+async def test_stream_is_bounded_overall_not_just_per_chunk(monkeypatch):
+    monkeypatch.setitem(settings.AI_DEADLINES, "narration", 1.0)
+    monkeypatch.setitem(settings.AI_STREAM_DEADLINES, "narration", 0.3)
+
+    # Every chunk arrives well within the per-chunk budget, but it never ends
+    endless = FakeTTS("endless", first_chunk_delay=0, chunks=10_000, gap=0.05)
+    tts = DeadlineTTSProvider(endless)
+    received = []
+    with ai_call_site("narration"), pytest.raises(AIDeadlineExceeded):
+        async for part in tts.synthesize_stream("..."):
+            received.append(part)
+
+    assert 2 < len(received) < 20
+    assert endless.closed
@@ -0,0 +1,62 @@
+import httpx
+from fastapi import FastAPI
+
+from app.ai.errors import AIUnavailable
+from app.ai.limiter import AdaptiveLimiter, LimitedLLMProvider, LimitedTTSProvider
+from app.ai.resilience import Candidate, ResilientLLMProvider
+from app.main import ai_unavailable_handler
+
+from .test_ai_cache import FakeLLM
+
+
+def _saturated_limiter(name: str) -> AdaptiveLimiter:
+    limiter = AdaptiveLimiter(
+        name, max_concurrency=1, min_concurrency=1, tokens_per_minute=0, max_queue=0, max_wait=1.0
+    )
+    limiter._admit(0, "standard")  # the only slot is taken and nothing may queue
+    return limiter
+
+
+async def test_saturated_limiter_returns_503_with_retry_after():
+    limiter = _saturated_limiter("saturated-vendor")
+    llm = ResilientLLMProvider(
+        [Candidate("saturated-vendor", LimitedLLMProvider(FakeLLM("hi"), limiter), primary=True)]
+    )
+    app = FastAPI()
+    app.add_exception_handler(AIUnavailable, ai_unavailable_handler)
+
+    @app.get("/generate")
+    async def generate():
+        return {"text": await llm.generate_text("hello")}
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.get("/generate")
+
+    assert response.status_code == 503
+    assert int(response.headers["Retry-After"]) >= 1
+    assert limiter.counters["rejected"] == 1
+
+
+
+class FakeTTS:
+    async def synthesize(self, text: str, voice_id: str | None = None, **kwargs) -> bytes:
+        return text.encode()
+
+    async def synthesize_stream(self, text: str, voice_id: str | None = None, **kwargs):
+        yield text.encode()
+
+
+async def test_tts_does_not_spend_the_vendor_token_budget():
+    limiter = AdaptiveLimiter(
+        "shared-vendor", max_concurrency=4, min_concurrency=1, tokens_per_minute=1000,
+        max_queue=0, max_wait=1.0,
+    )
+    tts = LimitedTTSProvider(FakeTTS(), limiter)
+    before = limiter.tokens
+
+    await tts.synthesize("x" * 5000)
+    assert [part async for part in tts.synthesize_stream("y" * 5000)] == [b"y" * 5000]
+
+    assert limiter.tokens >= before
+    assert limiter.in_flight == 0
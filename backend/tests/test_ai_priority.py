@@ -0,0 +1,55 @@
+import asyncio
+
+from app.ai.context import ai_priority
+from app.ai.limiter import AdaptiveLimiter
+from app.ai.singleflight import SingleFlightLLMProvider
+
+from .test_ai_cache import FakeLLM
+
+
+class SlowLLM(FakeLLM):
+    async def generate_text(self, prompt: str, system: str | None = None, **kwargs) -> str:
+        self.calls += 1
+        await asyncio.sleep(0.05)
+        return self.answer
+
+
+async def _generate(llm, priority: str) -> str:
+    with ai_priority(priority):
+        return await llm.generate_text("weekly report")
+
+
+async def test_identical_calls_coalesce_only_within_a_priority_class():
+    inner = SlowLLM("text")
+    llm = SingleFlightLLMProvider(inner)
+
+    await asyncio.gather(_generate(llm, "batch"), _generate(llm, "batch"))
+    assert inner.calls == 1
+
+    await asyncio.gather(_generate(llm, "batch"), _generate(llm, "interactive"))
+    assert inner.calls == 3
+
+
+async def test_queued_calls_are_admitted_by_priority_class():
+    limiter = AdaptiveLimiter(
+        "priorities", max_concurrency=1, min_concurrency=1, tokens_per_minute=0,
+        max_queue=10, max_wait=5.0,
+    )
+    order = []
+
+    async def call(name: str, priority: str):
+        with ai_priority(priority):
+            async with limiter.slot():
+                order.append(name)
+                await asyncio.sleep(0.01)
+
+    running = asyncio.create_task(call("running", "standard"))
+    await asyncio.sleep(0)
+    queued = [
+        asyncio.create_task(call("batch", "batch")),
+        asyncio.create_task(call("standard", "standard")),
+        asyncio.create_task(call("interactive", "interactive")),
+    ]
+    await asyncio.gather(running, *queued)
+
+    assert order == ["running", "interactive", "standard", "batch"]
@@ -0,0 +1,54 @@
+import asyncio
+import time
+
+import pytest
+
+from app.config import settings
+from app.services import document_service
+
+
+def _parse_forever() -> str:
+    time.sleep(60)
+    return "never"
+
+
+def _parse_slowly() -> str:
+    time.sleep(1.5)
+    return "slow"
+
+
+def _parse_quickly() -> str:
+    return "text"
+
+
+def _parse_badly() -> str:
+    raise ValueError("not a PDF")
+
+
+async def test_timed_out_extraction_kills_only_its_process(monkeypatch):
+    monkeypatch.setattr(document_service, "_slots", asyncio.Semaphore(2))
+    monkeypatch.setattr(settings, "EXTRACTION_TIMEOUT_SECONDS", 0.5)
+    hostile = asyncio.ensure_future(document_service._run(_parse_forever))
+    await asyncio.sleep(0.2)
+    monkeypatch.setattr(settings, "EXTRACTION_TIMEOUT_SECONDS", 30.0)
+    slow = asyncio.ensure_future(document_service._run(_parse_slowly))
+    await asyncio.sleep(0.2)
+    processes = set(document_service._running)
+    assert len(processes) == 2
+
+    with pytest.raises(asyncio.TimeoutError):
+        await hostile
+    # The other document is still parsing in its own process and finishes
+    assert not slow.done()
+    assert await slow == "slow"
+    for process in processes:
+        assert not process.is_alive()
+    assert not document_service._running
+
+
+async def test_extraction_errors_are_raised_in_the_caller(monkeypatch):
+    monkeypatch.setattr(document_service, "_slots", asyncio.Semaphore(2))
+
+    with pytest.raises(ValueError, match="not a PDF"):
+        await document_service._run(_parse_badly)
+    assert await document_service._run(_parse_quickly) == "text"
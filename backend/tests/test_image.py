@@ -0,0 +1,67 @@
+import io
+
+from PIL import Image
+
+from app.utils.image import prepare_image, split_data_uri
+
+
+def _encode(img: Image.Image, fmt: str, **kwargs) -> bytes:
+    out = io.BytesIO()
+    img.save(out, format=fmt, **kwargs)
+    return out.getvalue()
+
+
+def _open(data: bytes) -> Image.Image:
+    return Image.open(io.BytesIO(data))
+
+
+def test_small_upright_images_pass_through_untouched():
+    png = _encode(Image.new("RGB", (100, 100), "red"), "PNG")
+    jpeg = _encode(Image.new("RGB", (100, 100), "blue"), "JPEG")
+
+    assert prepare_image(png, max_side=512) == (png, "image/png")
+    assert prepare_image(jpeg, max_side=512) == (jpeg, "image/jpeg")
+
+
+def test_exif_orientation_is_applied():
+    exif = Image.Exif()
+    exif[0x0112] = 6  # stored sideways: rotate 90° clockwise for display
+    jpeg = _encode(Image.new("RGB", (200, 100), "green"), "JPEG", exif=exif)
+
+    data, mime_type = prepare_image(jpeg, max_side=512)
+
+    assert mime_type == "image/jpeg"
+    assert _open(data).size == (100, 200)
+
+
+def test_large_images_are_downscaled():
+    jpeg = _encode(Image.new("RGB", (2000, 1000), "white"), "JPEG")
+
+    data, mime_type = prepare_image(jpeg, max_side=500)
+
+    assert mime_type == "image/jpeg"
+    assert _open(data).size == (500, 250)
+
+
+def test_transparent_images_stay_png():
+    png = _encode(Image.new("RGBA", (1000, 1000), (0, 0, 0, 0)), "PNG")
+
+    data, mime_type = prepare_image(png, max_side=100)
+
+    assert mime_type == "image/png"
+    assert _open(data).mode == "RGBA"
+    assert _open(data).size == (100, 100)
+
+
+def test_undecodable_data_is_returned_as_is():
+    assert prepare_image(b"not an image", max_side=100) == (b"not an image", "image/jpeg")
+
+
+def test_split_data_uri_sniffs_bare_base64():
+    assert split_data_uri("iVBORw0KGgoAAAANSUhEUg==") == ("image/png", "iVBORw0KGgoAAAANSUhEUg==")
+    assert split_data_uri("data:image/webp;base64,AAAA") == ("image/webp", "AAAA")
+
+
+def test_split_data_uri_tolerates_malformed_base64():
+    assert split_data_uri("ab!c") == ("image/jpeg", "ab!c")
+    assert split_data_uri("a") == ("image/jpeg", "a")
@@ -0,0 +1,95 @@
+import asyncio
+import uuid
+from types import SimpleNamespace
+
+from app.models.memory import Memory
+from app.services import job_service, memory_service
+
+
+async def test_worker_claims_nothing_after_stop_while_slots_are_busy(monkeypatch):
+    claimed = []
+    finish = asyncio.Event()
+
+    async def claim_job():
+        job = SimpleNamespace(id=uuid.uuid4(), kind="test")
+        claimed.append(job)
+        return job
+
+    async def run_job(job):
+        await finish.wait()
+
+    monkeypatch.setattr(job_service, "claim_job", claim_job)
+    monkeypatch.setattr(job_service, "run_job", run_job)
+
+    stop = asyncio.Event()
+    worker = asyncio.create_task(job_service.run_worker(stop, concurrency=1))
+    await asyncio.sleep(0.05)
+    assert len(claimed) == 1
+
+    # The only slot is busy: shutting down must not wait for it to claim again
+    stop.set()
+    await asyncio.sleep(0.05)
+    finish.set()
+    await asyncio.wait_for(worker, timeout=1)
+
+    assert len(claimed) == 1
+
+
+async def test_worker_stops_promptly_when_idle(monkeypatch):
+    async def claim_job():
+        return None
+
+    monkeypatch.setattr(job_service, "claim_job", claim_job)
+
+    stop = asyncio.Event()
+    worker = asyncio.create_task(job_service.run_worker(stop, concurrency=1))
+    await asyncio.sleep(0.01)
+    stop.set()
+    await asyncio.wait_for(worker, timeout=1)
+
+
+class FakeSession:
+    """Stands in for ``async_session()``; ``get`` sees memories "committed" so far."""
+
+    def __init__(self, memories: dict):
+        self.memories = memories
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def get(self, model, ident):
+        return self.memories.get(ident)
+
+
+async def test_retried_generate_job_does_not_create_a_second_memory(monkeypatch):
+    memories = {}
+    generated = []
+
+    class FakeLLM:
+        name = "fake"
+
+        async def generate_text(self, prompt, **kwargs):
+            generated.append(prompt)
+            return '{"title": "The chair", "narrative": "Grandpa read here."}'
+
+    async def save(db, user_id, object_label, raw, model_name, memory_id=None, **kwargs):
+        memories[memory_id] = Memory(id=memory_id, title="The chair")
+        return memories[memory_id]
+
+    monkeypatch.setattr(job_service, "async_session", lambda: FakeSession(memories))
+    monkeypatch.setattr(memory_service, "get_llm_provider", lambda: FakeLLM())
+    monkeypatch.setattr(memory_service, "_save_generated_memory", save)
+
+    job_id = uuid.uuid4()
+    payload = {"user_id": str(uuid.uuid4()), "object_label": "chair"}
+    handler = job_service._handlers["generate_memory"]
+    first = await handler(job_id, payload)
+    # The worker died after the memory was committed; the job is claimed again
+    second = await handler(job_id, payload)
+
+    assert first == second
+    assert len(memories) == 1
+    assert len(generated) == 1
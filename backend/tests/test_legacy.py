@@ -0,0 +1,47 @@
+import uuid
+
+from app.models.memory import Memory
+from app.models.object import RegisteredObject
+from app.models.user import User
+from app.routers import legacy
+from app.services.anchor_cache import MISSING, anchor_cache
+
+
+class _Result:
+    def __init__(self, value):
+        self.value = value
+
+    def scalar_one_or_none(self):
+        return self.value
+
+
+class FakeSession:
+    """Answers the upsert's lookups (user, object, linked memory) in order."""
+
+    def __init__(self, *values):
+        self.values = list(values)
+
+    async def execute(self, statement):
+        return _Result(self.values.pop(0))
+
+    async def commit(self):
+        pass
+
+
+async def test_update_invalidates_every_label_of_the_memory():
+    anchor_cache.clear()
+    user = User(id=uuid.uuid4())
+    obj = RegisteredObject(id=uuid.uuid4(), user_id=user.id, label="chair")
+    memory = Memory(id=uuid.uuid4(), user_id=user.id, title="Old", narrative_text="old")
+    for label in ("chair", "armchair"):
+        anchor = {"object_label": label, "title": "Old", "memory_text": "old", "audio_url": None}
+        anchor_cache.set(None, label, anchor, memory_id=memory.id)
+
+    await legacy.create_or_update_memory(
+        legacy.LegacyMemoryAnchor(object_label="Chair", title="New", memory_text="new"),
+        db=FakeSession(user, obj, memory),
+    )
+
+    assert anchor_cache.get(None, "chair") is MISSING
+    assert anchor_cache.get(None, "armchair") is MISSING
+    anchor_cache.clear()
@@ -0,0 +1,20 @@
+import uuid
+
+import pytest
+
+from app.services.memory_service import build_search_query, list_memories
+
+
+def test_build_search_query_prefix_matches_every_term():
+    assert build_search_query("Grand pa!") == "grand:* & pa:*"
+    assert build_search_query("!!!") is None
+
+
+@pytest.mark.parametrize("include_total", [True, False])
+async def test_search_without_terms_matches_nothing(include_total):
+    # Returns before any query, so no database is needed
+    memories, total, next_cursor, snippets = await list_memories(
+        None, uuid.uuid4(), search="!!!", include_total=include_total
+    )
+    assert memories == [] and next_cursor is None and snippets == {}
+    assert total == (0 if include_total else None)
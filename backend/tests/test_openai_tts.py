@@ -0,0 +1,41 @@
+import asyncio
+
+import httpx
+from openai import AsyncOpenAI
+
+from app.ai.openai_provider import OpenAITTSProvider
+
+FIRST_CHUNK = b"ID3" + b"\x00" * 1021
+
+
+async def test_synthesize_stream_yields_before_body_completes():
+    finish = asyncio.Event()
+
+    async def body():
+        yield FIRST_CHUNK
+        await finish.wait()  # the rest of the audio is still being generated
+        yield b"\xff" * 2048
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        assert request.url.path == "/v1/audio/speech"
+        return httpx.Response(200, headers={"content-type": "audio/mpeg"}, content=body())
+
+    provider = OpenAITTSProvider(api_key="test")
+    provider.client = AsyncOpenAI(
+        api_key="test",
+        base_url="http://tts.test/v1",
+        http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+    )
+    stream = provider.synthesize_stream("Hello there")
+    try:
+        first = await asyncio.wait_for(stream.__anext__(), timeout=2)
+        assert first == FIRST_CHUNK
+        assert not finish.is_set()
+
+        finish.set()
+        rest = b"".join([chunk async for chunk in stream])
+        assert rest == b"\xff" * 2048
+    finally:
+        finish.set()
+        await stream.aclose()
+        await provider.aclose()
@@ -0,0 +1,106 @@
+"""Opt-in Postgres suite: no hot-path service query may plan a sequential scan.
+
+Not part of the default run (``pytest.ini`` deselects the ``postgres`` marker),
+since it needs a real database. To run it, migrate and seed a Postgres database
+(``alembic upgrade head && python seed.py``) and point TEST_DATABASE_URL at it:
+
+    TEST_DATABASE_URL=postgresql+asyncpg://... pytest -m postgres
+
+Each service query's SQL is captured and EXPLAINed with sequential scans
+disabled. On tiny seed tables the planner would pick a seq scan anyway, so
+`enable_seqscan = off` asks the real question: is there an index that can serve
+this query at all?
+"""
+
+import json
+import os
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.routers.legacy import _list_query
+from app.services import memory_service, toolkit_service
+from seed import DEFAULT_USER_ID
+
+DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+
+pytestmark = pytest.mark.postgres
+
+LARGE_TABLES = {
+    "memories",
+    "memory_objects",
+    "memory_emotions",
+    "memory_people",
+    "mood_entries",
+    "cognitive_exercises",
+}
+
+SERVICE_QUERIES = {
+    "list_memories": lambda db: memory_service.list_memories(db, DEFAULT_USER_ID),
+    "list_memories_keyset": lambda db: memory_service.list_memories(
+        db, DEFAULT_USER_ID, include_total=False, cursor=""
+    ),
+    "list_memories_by_object": lambda db: memory_service.list_memories(
+        db, DEFAULT_USER_ID, object_label="chair"
+    ),
+    "list_memories_by_emotion": lambda db: memory_service.list_memories(
+        db, DEFAULT_USER_ID, emotion="joy"
+    ),
+    "list_memories_search": lambda db: memory_service.list_memories(
+        db, DEFAULT_USER_ID, search="grandpa"
+    ),
+    "get_memory_by_object": lambda db: memory_service.get_memory_by_object(
+        db, "chair", DEFAULT_USER_ID
+    ),
+    "mood_history": lambda db: toolkit_service.get_mood_history(db, DEFAULT_USER_ID),
+    "engagement_report": lambda db: toolkit_service.get_engagement_report(db, DEFAULT_USER_ID),
+    "legacy_list": lambda db: db.execute(_list_query()),
+}
+
+
+@pytest.fixture
+async def engine():
+    if not DATABASE_URL:
+        pytest.fail("TEST_DATABASE_URL must name a migrated, seeded Postgres database")
+    engine = create_async_engine(DATABASE_URL)
+    yield engine
+    await engine.dispose()
+
+
+def _seq_scans(plan: dict) -> list[str]:
+    found = []
+    if plan.get("Node Type") == "Seq Scan" and plan.get("Relation Name") in LARGE_TABLES:
+        found.append(plan["Relation Name"])
+    for child in plan.get("Plans", []):
+        found.extend(_seq_scans(child))
+    return found
+
+
+@pytest.mark.parametrize("name", SERVICE_QUERIES)
+async def test_service_query_uses_indexes(engine, name):
+    captured = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            captured.append((statement, parameters))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", capture)
+    try:
+        async with async_sessionmaker(engine, expire_on_commit=False)() as db:
+            await SERVICE_QUERIES[name](db)
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", capture)
+    assert captured
+
+    async with engine.connect() as conn:
+        await conn.exec_driver_sql("SET enable_seqscan = off")
+        for statement, parameters in captured:
+            result = await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters)
+            plan = result.scalar()
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            scans = _seq_scans(plan[0]["Plan"])
+            assert not scans, (
+                f"Seq Scan on {', '.join(sorted(set(scans)))}: {' '.join(statement.split())}"
+            )
@@ -0,0 +1,37 @@
+import json
+
+from fastapi import HTTPException
+
+from app.ai.errors import AIUnavailable
+from app.services.memory_service import _parse_generation
+from app.utils.sse import sse_events
+
+
+async def _error_of(exc: Exception) -> dict:
+    async def events():
+        yield "delta", {"text": "Once"}
+        raise exc
+
+    frames = [frame async for frame in sse_events(events())]
+    event, data = frames[-1].strip().split("\n")
+    assert event == "event: error"
+    return json.loads(data.removeprefix("data: "))
+
+
+async def test_unexpected_errors_are_not_leaked_to_the_client():
+    error = await _error_of(RuntimeError("connection to db.internal:5432 refused"))
+    assert error == {"detail": "Internal server error"}
+
+
+async def test_known_errors_keep_their_detail():
+    assert await _error_of(HTTPException(status_code=404, detail="Memory not found")) == {
+        "detail": "Memory not found"
+    }
+    assert await _error_of(AIUnavailable("llm")) == {
+        "detail": "The llm service is temporarily unavailable"
+    }
+
+
+def test_unparseable_fenced_generation_falls_back_to_raw_text():
+    raw = "Here you go:\n```json\n{not json}\n```"
+    assert _parse_generation(raw, "chair") == {"title": "Memory of chair", "narrative": raw}
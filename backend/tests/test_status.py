@@ -0,0 +1,11 @@
+import httpx
+
+from app.main import app
+
+
+async def test_ai_status_requires_authentication():
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.get("/api/v1/ai/status")
+
+    assert response.status_code == 401
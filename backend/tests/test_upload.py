@@ -0,0 +1,64 @@
+import uuid
+
+import httpx
+import pytest
+
+from app.main import app
+from app.services import job_service, upload_service
+from app.services.upload_service import UploadValidationError, create_memory_from_files
+
+
+@pytest.mark.parametrize("async_mode", [False, True])
+async def test_unsupported_files_are_rejected_before_any_work(monkeypatch, async_mode):
+    enqueued = []
+
+    async def enqueue_job(*args, **kwargs):
+        enqueued.append(args)
+
+    monkeypatch.setattr(job_service, "enqueue_job", enqueue_job)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.post(
+            "/upload/memory",
+            params={"async_mode": str(async_mode).lower()},
+            data={"object_label": "chair"},
+            files={"files": ("setup.exe", b"MZ\x90\x00", "application/octet-stream")},
+        )
+
+    assert response.status_code == 400
+    assert "No supported file types" in response.json()["detail"]
+    assert enqueued == []
+
+
+async def test_service_raises_validation_error_for_unsupported_files():
+    with pytest.raises(UploadValidationError):
+        await create_memory_from_files(
+            None, uuid.uuid4(), "chair", None, [("/tmp/x.exe", "x.exe", "0" * 64, 4)], {}
+        )
+
+
+class FakeVision:
+    def __init__(self, answer: str):
+        self.answer = answer
+
+    async def analyze_image(self, image_b64: str, prompt: str, **kwargs) -> str:
+        return self.answer
+
+
+@pytest.mark.parametrize(
+    ("answer", "cached"),
+    [('{"title": "Grandpa\'s chair", "narrative": "He read here."}', True),
+     ("Sorry, I can't help with that.", False)],
+)
+async def test_only_parsed_vision_results_are_cached(monkeypatch, tmp_path, answer, cached):
+    monkeypatch.setattr(upload_service, "get_vision_provider", lambda: FakeVision(answer))
+    image = tmp_path / "chair.jpg"
+    image.write_bytes(b"\xff\xd8\xff not really a jpeg")
+
+    memory_data, derived = await upload_service._generate_from_files(
+        [(str(image), "chair.jpg", "a" * 64)], [], [], "chair", {}, {}
+    )
+
+    assert memory_data["narrative"] in answer
+    assert ("a" * 64 in derived) is cached
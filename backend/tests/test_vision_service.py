@@ -0,0 +1,94 @@
+import json
+import uuid
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.models.base import Base
+from app.models.memory import MemoryObject
+from app.models.object import RegisteredObject
+from app.services import vision_service
+
+LABELS = ["chair", "lamp", "clock", "vase", "radio", "piano", "rug", "mirror"]
+
+
+class FakeVision:
+    def __init__(self, labels: list[str]):
+        self.labels = labels
+
+    async def analyze_image(self, image_b64: str, prompt: str, **kwargs) -> str:
+        return json.dumps({
+            "objects": [{"label": label.title(), "confidence": 0.9} for label in self.labels],
+            "scene_description": "a living room",
+        })
+
+
+@pytest.fixture
+async def session():
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(
+            Base.metadata.create_all,
+            tables=[RegisteredObject.__table__, MemoryObject.__table__],
+        )
+    async with async_sessionmaker(engine, expire_on_commit=False)() as db:
+        yield db
+    await engine.dispose()
+
+
+async def _seed(db, user_id: uuid.UUID) -> dict[str, list[uuid.UUID]]:
+    linked = {}
+    for i, label in enumerate(LABELS):
+        obj = RegisteredObject(user_id=user_id, label=label)
+        db.add(obj)
+        await db.flush()
+        # Every other object has memories; the rest are registered but unlinked
+        linked[label] = [uuid.uuid4() for _ in range(i % 2 * 2)]
+        for memory_id in linked[label]:
+            db.add(MemoryObject(memory_id=memory_id, object_id=obj.id))
+    await db.commit()
+    return linked
+
+
+async def _analyze(monkeypatch, db, user_id, labels) -> tuple[dict, int]:
+    async def passthrough(image_b64):
+        return image_b64
+
+    monkeypatch.setattr(vision_service, "get_vision_provider", lambda: FakeVision(labels))
+    monkeypatch.setattr(vision_service, "prepare_image_b64", passthrough)
+
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    sync_engine = db.bind.sync_engine
+    event.listen(sync_engine, "before_cursor_execute", count)
+    try:
+        result = await vision_service.analyze_scene(db, user_id, "aW1hZ2U=")
+    finally:
+        event.remove(sync_engine, "before_cursor_execute", count)
+    return result, len(statements)
+
+
+async def test_analyze_scene_query_count_is_constant(monkeypatch, session):
+    user_id = uuid.uuid4()
+    await _seed(session, user_id)
+
+    _, one = await _analyze(monkeypatch, session, user_id, LABELS[:1])
+    _, many = await _analyze(monkeypatch, session, user_id, LABELS + ["window", "door"])
+
+    assert one == many == 1
+
+
+async def test_analyze_scene_attaches_linked_memory_ids(monkeypatch, session):
+    user_id = uuid.uuid4()
+    linked = await _seed(session, user_id)
+
+    result, _ = await _analyze(monkeypatch, session, user_id, ["lamp", "chair", "window"])
+    by_label = {obj["label"]: obj for obj in result["objects"]}
+
+    assert sorted(by_label["Lamp"]["memory_ids"]) == sorted(str(m) for m in linked["lamp"])
+    assert by_label["Chair"]["memory_ids"] == []
+    assert "memory_ids" not in by_label["Window"]
@@ -0,0 +1,36 @@
+import asyncio
+import logging
+
+from app.services import voice_service
+
+
+class FakeTTS:
+    async def synthesize_stream(self, text: str, voice_id: str | None = None, **kwargs):
+        yield text.encode()
+
+
+async def test_cache_write_errors_after_playback_are_logged(monkeypatch, caplog):
+    async def record_chunk(plan, chunk, audio):
+        await asyncio.sleep(0.01)
+        raise OSError("disk full")
+
+    monkeypatch.setattr(voice_service, "get_tts_provider", lambda: FakeTTS())
+    monkeypatch.setattr(voice_service, "_record_chunk", record_chunk)
+    plan = {
+        "memory_id": None,
+        "provider": "fake",
+        "voice_id": "v",
+        "chunks": [{"text": f"Part {i}.", "text_hash": str(i), "key": None} for i in range(3)],
+    }
+
+    audio = [part async for part in voice_service.stream_memory_audio(plan)]
+    assert audio == [b"Part 0.", b"Part 1.", b"Part 2."]
+    # The playback has finished, but the cache writes are still tracked
+    assert voice_service._recording
+
+    with caplog.at_level(logging.WARNING, logger=voice_service.__name__):
+        while voice_service._recording:
+            await asyncio.sleep(0.01)
+    warnings = [r for r in caplog.records if r.getMessage() == "Could not cache narration audio"]
+    assert len(warnings) == 3
+    assert all(isinstance(r.exc_info[1], OSError) for r in warnings)